@@ -3,10 +3,12 @@ AI Client - Interface to LLM APIs (OpenAI compatible).
 Supports OpenAI, DeepSeek, Claude, and other OpenAI-compatible providers.
 """
 import os
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Optional, Callable, Tuple
 from openai import OpenAI
 from PyQt6.QtCore import QObject, pyqtSignal, QThread
 from dotenv import load_dotenv
+from ai.token_budget import assemble_messages
+from config.constants import AppConstants
 
 # Load environment variables
 # Try to load from project root
@@ -150,6 +152,11 @@ class AIClient(QObject):
 
 开始工作吧！根据用户的问题，一步步给出专业的指导。"""
 
+    # User message carrying terminal output
+    CONTEXT_TEMPLATE = "当前终端屏幕内容：\n```\n{context}\n```\n\n用户问题：{question}"
+    # Follow-up carrying only output produced since the previous request
+    DELTA_TEMPLATE = "自上次请求以来的新终端输出：\n```\n{context}\n```\n\n用户问题：{question}"
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -163,6 +170,15 @@ class AIClient(QObject):
         # Conversation history
         self.conversation_history: List[Dict] = []
 
+        # History message that carried the last full terminal snapshot;
+        # follow-ups may send deltas while it is still in the request window.
+        # Only that snapshot and its deltas keep their terminal output in the
+        # history (with the bare question to restore once superseded).
+        self._snapshot_message: Optional[Dict] = None
+        self._context_messages: List[Tuple[Dict, str]] = []
+        self._request_kind: Optional[str] = None  # 'snapshot' or 'delta' for the last built request
+        self._request_question = ""
+
     def _load_config(self, profile_name: Optional[str] = None):
         """
         Load configuration from AIProfileManager, ConfigManager or environment variables.
@@ -197,6 +213,7 @@ class AIClient(QObject):
                 self.model = ai_profile.model
                 self.timeout = 10
                 self.max_history = 10
+                self.context_tokens = ai_profile.context_tokens
                 self._profile_name = ai_profile.name
                 # 从 ConfigManager 读取 temperature, max_tokens, system_prompt
                 try:
@@ -241,6 +258,7 @@ class AIClient(QObject):
                     self.system_prompt = self.DEFAULT_SYSTEM_PROMPT
                 else:
                     self.system_prompt = ai_settings.system_prompt
+                self.context_tokens = AppConstants.AI_DEFAULT_CONTEXT_TOKENS
                 self._profile_name = None
                 source = "ConfigManager" if ai_settings.api_key else "environment (.env)"
             except Exception as e2:
@@ -254,6 +272,7 @@ class AIClient(QObject):
                 self.temperature = 0.7
                 self.max_tokens = 2000
                 self.system_prompt = self.DEFAULT_SYSTEM_PROMPT
+                self.context_tokens = AppConstants.AI_DEFAULT_CONTEXT_TOKENS
                 self._profile_name = None
                 source = "environment (.env)"
 
@@ -348,7 +367,7 @@ class AIClient(QObject):
                 model=self.model,
                 messages=messages,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens
+                max_tokens=self._completion_tokens()
             )
 
             # Extract response text
@@ -395,7 +414,7 @@ class AIClient(QObject):
                 model=self.model,
                 messages=messages,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens,
+                max_tokens=self._completion_tokens(),
                 stream=True
             )
 
@@ -413,7 +432,7 @@ class AIClient(QObject):
         except Exception as e:
             raise Exception(f"API streaming call failed: {str(e)}")
 
-    def ask_async(self, user_message: str, terminal_context: str = ""):
+    def ask_async(self, user_message: str, terminal_context: str = "", context_delta: Optional[str] = None):
         """
         Send question to AI asynchronously (non-blocking).
         默认使用流式调用。
@@ -421,23 +440,25 @@ class AIClient(QObject):
         Args:
             user_message: User's question
             terminal_context: Recent terminal output for context
+            context_delta: Output since the previous request (None if unknown)
         """
         # 默认使用流式调用
-        return self.ask_async_stream(user_message, terminal_context)
+        return self.ask_async_stream(user_message, terminal_context, context_delta)
 
-    def ask_async_stream(self, user_message: str, terminal_context: str = ""):
+    def ask_async_stream(self, user_message: str, terminal_context: str = "", context_delta: Optional[str] = None):
         """
         流式异步发送问题到 AI，实时显示响应。
 
         Args:
             user_message: User's question
             terminal_context: Recent terminal output for context
+            context_delta: Output since the previous request (None if unknown)
         """
         # Build messages
-        messages = self._build_messages(user_message, terminal_context)
+        messages = self._build_messages(user_message, terminal_context, context_delta)
 
         # Add to conversation history
-        self.conversation_history.append({"role": "user", "content": user_message})
+        self._add_request_to_history(messages)
 
         # 发出流式开始信号
         self.stream_started.emit()
@@ -472,7 +493,7 @@ class AIClient(QObject):
             AI response text
         """
         messages = self._build_messages(user_message, terminal_context)
-        self.conversation_history.append({"role": "user", "content": user_message})
+        self._add_request_to_history(messages)
 
         response = self._call_api(messages)
 
@@ -481,48 +502,87 @@ class AIClient(QObject):
 
         return response
 
-    def _build_messages(self, user_message: str, terminal_context: str) -> List[Dict]:
+    def _completion_tokens(self) -> int:
+        """
+        Tokens reserved for the reply: max_tokens, reduced when it would
+        leave less than AI_MIN_PROMPT_TOKENS of the context window for the
+        request (max_tokens at or near the profile's window).
+        """
+        context_tokens = getattr(self, 'context_tokens', AppConstants.AI_DEFAULT_CONTEXT_TOKENS)
+        room = context_tokens - AppConstants.AI_TOKEN_SAFETY_MARGIN - AppConstants.AI_MIN_PROMPT_TOKENS
+        return max(1, min(self.max_tokens, room))
+
+    def _add_request_to_history(self, messages: List[Dict]):
+        """
+        Keep the request's user message in the history. A new snapshot
+        keeps its terminal output (later turns send only deltas against
+        it) and earlier snapshots and deltas go back to the bare question,
+        so old terminal output is not resent.
+        """
+        message = messages[-1]
+        if self._request_kind == 'snapshot':
+            self._strip_context_messages()
+            self._snapshot_message = message
+        self.conversation_history.append(message)
+        if self._request_kind is not None:
+            self._context_messages.append((message, self._request_question))
+
+    def _strip_context_messages(self):
+        """Replace history messages carrying terminal output with their bare question."""
+        bare = {id(message): question for message, question in self._context_messages}
+        self.conversation_history = [
+            {"role": message["role"], "content": bare[id(message)]} if id(message) in bare else message
+            for message in self.conversation_history
+        ]
+        self._context_messages = []
+        self._snapshot_message = None
+
+    def _build_messages(self, user_message: str, terminal_context: str,
+                        context_delta: Optional[str] = None) -> List[Dict]:
         """
         Build message list for API call.
 
+        The request is assembled within the profile's context window minus
+        the completion reserve (max_tokens): system prompt first, then the
+        question with the terminal context, then as much recent history as
+        fits (at most max_history turns).
+
+        A context delta is used instead of the full terminal context when
+        the message with the last full snapshot still fits in the request;
+        otherwise the full context is sent and becomes the new snapshot.
+
         Args:
             user_message: User's question
             terminal_context: Recent terminal output
+            context_delta: Output since the previous request (None if unknown)
 
         Returns:
             List of message dictionaries
         """
-        messages = []
-
         # System prompt - 使用配置的系统提示词，如果没有则使用默认值
         system_prompt = getattr(self, 'system_prompt', self.DEFAULT_SYSTEM_PROMPT)
-        messages.append({
-            "role": "system",
-            "content": system_prompt
-        })
-
-        # Add conversation history (excluding the last user message which will be added below)
-        # This maintains context of the ongoing conversation
-        # Keep only recent history to save tokens (configurable via max_history)
-        if len(self.conversation_history) >= 2:
-            # Use max_history from config (default 10 messages = 5 turns)
-            history_limit = getattr(self, 'max_history', 10) * 2  # Convert to message count
-            recent_history = self.conversation_history[-history_limit:] if len(self.conversation_history) > history_limit else self.conversation_history[:-1]
-            messages.extend(recent_history)
-
-        # Add terminal context if available
-        if terminal_context:
-            context_msg = f"当前终端屏幕内容：\n```\n{terminal_context}\n```\n\n用户问题：{user_message}"
-            messages.append({
-                "role": "user",
-                "content": context_msg
-            })
-        else:
-            messages.append({
-                "role": "user",
-                "content": user_message
-            })
 
+        budget = (getattr(self, 'context_tokens', AppConstants.AI_DEFAULT_CONTEXT_TOKENS)
+                  - self._completion_tokens() - AppConstants.AI_TOKEN_SAFETY_MARGIN)
+        max_history_messages = getattr(self, 'max_history', 10) * 2
+        self._request_question = user_message
+
+        # conversation_history does not contain user_message yet
+        if context_delta is not None and self._snapshot_message is not None:
+            messages = assemble_messages(
+                system_prompt, self.conversation_history, user_message, context_delta,
+                budget, self.DELTA_TEMPLATE, max_history_messages=max_history_messages,
+            )
+            if any(message is self._snapshot_message for message in messages):
+                self._request_kind = 'delta' if messages[-1]["content"] != user_message else None
+                return messages
+            print("[DEBUG] Terminal snapshot left the request window, sending full context")
+
+        messages = assemble_messages(
+            system_prompt, self.conversation_history, user_message, terminal_context,
+            budget, self.CONTEXT_TEMPLATE, max_history_messages=max_history_messages,
+        )
+        self._request_kind = 'snapshot' if messages[-1]["content"] != user_message else None
         return messages
 
     def _on_response_received(self, response: str):
@@ -537,7 +597,10 @@ class AIClient(QObject):
         """Handle error from worker thread."""
         # Remove last user message from history since it failed
         if self.conversation_history and self.conversation_history[-1]["role"] == "user":
-            self.conversation_history.pop()
+            failed = self.conversation_history.pop()
+            self._context_messages = [item for item in self._context_messages if item[0] is not failed]
+            if failed is self._snapshot_message:
+                self._snapshot_message = None
 
         # Emit error signal
         self.error_occurred.emit(error_msg)
@@ -545,6 +608,8 @@ class AIClient(QObject):
     def clear_history(self):
         """Clear conversation history."""
         self.conversation_history = []
+        self._snapshot_message = None
+        self._context_messages = []
 
     def set_config(self, api_key: str, api_base: str = None, model: str = None):
         """
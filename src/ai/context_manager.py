@@ -2,33 +2,88 @@
 Terminal Context Manager - Manages terminal output buffer for AI context.
 Implements sliding window to limit token usage.
 """
+import re
+import time
 from collections import deque
-from typing import List
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import List, Optional, Tuple
+from config.constants import AppConstants
+from ai.output_compactor import OutputCompactor, CompactedLine, visible_text
+
+
+@dataclass
+class ContextSegment:
+    """One command in the terminal context and where its output starts."""
+    command: str
+    start: int  # Absolute line number of the command line (prompt + echo)
+    timestamp: float = field(default_factory=time.time)
 
 
 class TerminalContext:
     """
     Manages terminal output history for AI context.
     Uses a sliding window approach to manage memory usage.
+
+    Lines are kept in a ring (deque) bounded by both line count and
+    characters, with a running character total that is updated on every
+    append and eviction. Context and tail extraction walk the ring from
+    the newest line backwards and stop as soon as they have enough, so an
+    AI call only touches the lines it returns.
+
+    The buffer holds the stream exactly: the last line is the one still
+    being written and the next append continues it. Completed lines are
+    scanned once for command lines (the echo of a command announced with
+    mark_command, or a "user@host:~$ command" prompt line), which index
+    the buffer into ContextSegments; a segment's output runs up to the
+    next command line.
+
+    Completed lines also feed an OutputCompactor, which keeps a compacted
+    view (repeated and near-duplicate lines, progress-bar redraws and
+    repeated blocks collapsed) mapped back to raw line numbers; the AI is
+    given that view.
+
+    high_water_mark() records how far the output went at an AI request;
+    get_delta() then returns only what was written after it, or None when
+    that position has rolled out of the window (send a full snapshot).
     """
 
-    def __init__(self, max_lines: int = 500, max_chars: int = 3000):
+    _COMMAND_LINE_RE = re.compile(AppConstants.SHELL_COMMAND_LINE_PATTERN)
+    _PROMPT_RE = re.compile(AppConstants.SHELL_PROMPT_PATTERN)
+
+    def __init__(self, max_lines: int = 500, max_chars: int = 3000, max_buffer_chars: int = 64000):
         """
         Initialize terminal context manager.
 
         Args:
             max_lines: Maximum number of lines to keep in buffer
             max_chars: Maximum number of characters to return for context
+            max_buffer_chars: Maximum number of characters to keep in buffer
         """
         self.max_lines = max_lines
         self.max_chars = max_chars
+        self.max_buffer_chars = max_buffer_chars
 
-        # Use deque for efficient popleft operations
-        self.buffer: deque = deque(maxlen=max_lines)
+        # Ring of lines; eviction is done here so the totals stay exact
+        self.buffer: deque = deque()
 
-        # Track total characters for optimization
+        # Sum of len(line) + 1 over the buffer (each line plus its newline)
         self._total_chars = 0
 
+        # Absolute line number of buffer[0] (increases as lines are evicted)
+        self._first_line = 0
+
+        # Command segments, oldest first, and commands awaiting their echo
+        # as (command, last line number the echo may appear on)
+        self.segments: deque = deque()
+        self._expected: deque = deque(maxlen=16)
+
+        # Compacted view of the completed lines
+        self.compactor = OutputCompactor()
+
+        # Incremented by clear() so older high-water marks become invalid
+        self._generation = 0
+
     def append(self, text: str):
         """
         Append text to buffer.
@@ -39,18 +94,278 @@ class TerminalContext:
         if not text:
             return
 
-        # Split into lines and add to buffer
-        lines = text.split('\n')
+        # Split into lines and add to buffer; the first piece continues
+        # the unfinished last line
+        buffer = self.buffer
+        total = self._total_chars
+        pieces = text.split('\n')
+        if buffer:
+            last = buffer.pop()
+            total -= len(last) + 1
+            pieces[0] = last + pieces[0]
+        number = self._first_line + len(buffer)
+        for line in pieces:
+            buffer.append(line)
+            total += len(line) + 1  # +1 for newline
+        # Every piece but the last is a completed line
+        for offset, line in enumerate(pieces[:-1]):
+            boundary = self._scan_line(number + offset, line)
+            self.compactor.add(number + offset, line, boundary)
+
+        # Evict the oldest lines; the newest line is always kept
+        while len(buffer) > 1 and (len(buffer) > self.max_lines or total > self.max_buffer_chars):
+            total -= len(buffer.popleft()) + 1
+            self._first_line += 1
+        self._total_chars = total
+        self.compactor.evict(self._first_line)
+
+        # Forget segments whose output was evicted entirely
+        segments = self.segments
+        while len(segments) > 1 and segments[1].start <= self._first_line:
+            segments.popleft()
+
+    def mark_command(self, command: str):
+        """
+        Announce a command that is about to be sent, so its echo in the
+        output starts a new segment. The echo must be a whole line (the
+        command, optionally after a prompt) within CONTEXT_ECHO_WINDOW_LINES
+        lines; echoes that never match (wrapped or tab-completed commands)
+        expire instead of blocking later commands.
+
+        Args:
+            command: Command text as sent
+        """
+        command = command.strip()
+        if command:
+            deadline = self._first_line + len(self.buffer) + AppConstants.CONTEXT_ECHO_WINDOW_LINES
+            self._expected.append((command, deadline))
+
+    def _is_echo(self, text: str, command: str) -> bool:
+        """True if a line is the command alone or the command after a prompt."""
+        if not text.endswith(command):
+            return False
+        prefix = text[:-len(command)]
+        return not prefix.strip() or (prefix[-1:].isspace() and self._PROMPT_RE.search(prefix) is not None)
+
+    def _scan_line(self, number: int, line: str) -> bool:
+        """Start a segment if a completed line is a command line; True if it did."""
+        text = line.rstrip('\r').rstrip()
+        expected = self._expected
+        while expected and expected[0][1] < number:
+            expected.popleft()
+        if not text:
+            return False
+        for index, (command, _) in enumerate(expected):
+            if self._is_echo(text, command):
+                # Commands queued before it were not echoed as sent
+                for _ in range(index + 1):
+                    expected.popleft()
+                self.segments.append(ContextSegment(command, number))
+                return True
+        match = self._COMMAND_LINE_RE.match(text)
+        if match:
+            self.segments.append(ContextSegment(match.group(1), number))
+            return True
+        return False
+
+    def last_segment(self) -> Optional[ContextSegment]:
+        """
+        Get the most recent command segment.
+
+        Returns:
+            ContextSegment, or None if no command line was seen
+        """
+        return self.segments[-1] if self.segments else None
+
+    def segment_lines(self, segment: ContextSegment, compact: bool = False) -> List[str]:
+        """
+        Lines of a segment: the command line and its output, without the
+        prompt that ended it.
+
+        Args:
+            segment: Segment from self.segments
+            compact: Return the compacted view instead of the raw lines
+
+        Returns:
+            List of lines (empty if the segment was evicted)
+        """
+        index = self.segments.index(segment)
+        end = self.segments[index + 1].start if index + 1 < len(self.segments) else None
+        if compact:
+            lines = self.compactor.render(self.compactor.select(segment.start, end))
+            if end is None:
+                lines.extend(self._open_line())
+            return lines
+        start = max(segment.start, self._first_line) - self._first_line
+        if end is None:
+            lines = list(islice(self.buffer, start, None))
+            if lines and not self._open_line():
+                lines.pop()
+        else:
+            lines = list(islice(self.buffer, start, max(start, end - self._first_line)))
+        return [line.rstrip('\r') for line in lines]
+
+    def _open_line(self) -> List[str]:
+        """
+        The unfinished last line as a one-item list, or [] if it is empty
+        or the next prompt (the command is done).
+        """
+        line = self.buffer[-1].rstrip('\r') if self.buffer else ''
+        if not line.strip() or self._PROMPT_RE.search(line):
+            return []
+        return [line]
+
+    def raw_lines(self, entry: CompactedLine) -> List[str]:
+        """
+        Raw lines behind a compacted entry (the part still buffered).
+
+        Args:
+            entry: Entry from the compacted view
+
+        Returns:
+            List of raw lines
+        """
+        start = max(entry.first, self._first_line) - self._first_line
+        return list(islice(self.buffer, start, max(start, entry.last + 1 - self._first_line)))
+
+    def get_command_output(self, max_chars: int = None, compact: bool = True) -> str:
+        """
+        Get the last command with its output, trimmed from the middle so
+        the start and the end of a huge output both survive.
+
+        Args:
+            max_chars: Character limit (defaults to max_chars)
+            compact: Use the compacted view of the output
+
+        Returns:
+            Command line and output, or "" if no command was seen
+        """
+        segment = self.last_segment()
+        if segment is None:
+            return ""
+        return self.trim_lines(self.segment_lines(segment, compact), max_chars or self.max_chars)
+
+    @staticmethod
+    def trim_lines(lines: List[str], max_chars: int, head_ratio: float = 1 / 3) -> str:
+        """
+        Join lines, keeping whole lines from the head and the tail within
+        max_chars and replacing the middle with an omission marker.
+
+        Args:
+            lines: Lines to join
+            max_chars: Character limit
+            head_ratio: Share of the limit spent on the first lines
+
+        Returns:
+            Joined (and possibly trimmed) text
+        """
+        text = '\n'.join(lines)
+        if len(text) <= max_chars:
+            return text
+
+        head, used = [], 0
+        head_budget = int(max_chars * head_ratio)
         for line in lines:
-            self.buffer.append(line)
-            self._total_chars += len(line) + 1  # +1 for newline
+            if used + len(line) + 1 > head_budget:
+                break
+            head.append(line)
+            used += len(line) + 1
+
+        tail, used = [], 0
+        tail_budget = max_chars - head_budget
+        for line in reversed(lines[len(head):]):
+            if used + len(line) + 1 > tail_budget:
+                if not tail:
+                    tail.append(line[-tail_budget:])  # One huge line: keep its end
+                break
+            tail.append(line)
+            used += len(line) + 1
+        tail.reverse()
+
+        omitted = len(lines) - len(head) - len(tail)
+        return '\n'.join(head + [f"... [{omitted} lines omitted] ..."] + tail)
+
+    def high_water_mark(self) -> Tuple[int, int, int]:
+        """
+        Position of the end of the output buffered so far.
+
+        Returns:
+            Opaque mark for get_delta
+        """
+        if not self.buffer:
+            return (self._generation, self._first_line, 0)
+        return (self._generation, self._first_line + len(self.buffer) - 1, len(self.buffer[-1]))
+
+    def get_delta(self, mark: Optional[Tuple[int, int, int]], compact: bool = True) -> Optional[str]:
+        """
+        Get the output written since a high-water mark, trimmed from the
+        middle to max_chars.
+
+        Args:
+            mark: Result of high_water_mark() (None for no mark)
+            compact: Compact repetitive output in the delta
 
-    def get_context(self, last_n_lines: int = None) -> str:
+        Returns:
+            New output ("" if there is none), or None if the mark is no
+            longer in the buffer and a full snapshot is needed
+        """
+        if mark is None:
+            return None
+        generation, line, column = mark
+        index = line - self._first_line
+        if generation != self._generation or index < 0 or (self.buffer and index >= len(self.buffer)):
+            return None
+        if not self.buffer:
+            return ""
+
+        raw = list(islice(self.buffer, index, None))
+        if len(raw) == 1 and not raw[0][column:].strip():
+            return ""
+        # A line completed after the mark is sent whole (the prompt in front
+        # of a command); one that ended at the mark is skipped
+        if not raw[0][column:].strip('\r'):
+            raw.pop(0)
+        if compact:
+            compactor = OutputCompactor()
+            for number, text in enumerate(raw[:-1]):
+                compactor.add(number, text)
+            lines = compactor.render(compactor.entries)
+            open_line = visible_text(raw[-1])
+            if open_line:
+                lines.append(open_line)
+        else:
+            lines = [text.rstrip('\r') for text in raw]
+        return self.trim_lines(lines, self.max_chars)
+
+    def _tail_lines(self, max_lines: int, min_chars: int) -> List[str]:
+        """
+        Newest lines, oldest first, walking backwards until max_lines lines
+        were taken or their joined length reaches min_chars.
+
+        Args:
+            max_lines: Maximum number of lines to take
+            min_chars: Stop once the joined lines are at least this long
+
+        Returns:
+            List of lines
+        """
+        lines = []
+        length = -1  # No newline before the first line
+        for line in reversed(self.buffer):
+            if len(lines) >= max_lines or length >= min_chars:
+                break
+            lines.append(line)
+            length += len(line) + 1
+        lines.reverse()
+        return lines
+
+    def get_context(self, last_n_lines: int = None, compact: bool = False) -> str:
         """
         Get recent terminal context.
 
         Args:
             last_n_lines: Number of recent lines to return (None for all)
+            compact: Use the compacted view (repetitive output collapsed)
 
         Returns:
             String containing recent terminal output
@@ -58,13 +373,15 @@ class TerminalContext:
         if not self.buffer:
             return ""
 
-        # Get lines
-        if last_n_lines:
-            lines = list(self.buffer)[-last_n_lines:]
+        if compact:
+            lines = self.compactor.render(self.compactor.tail(self.max_chars + 1))
+            open_line = visible_text(self.buffer[-1])
+            if open_line:
+                lines.append(open_line)
+            context = '\n'.join(lines[-last_n_lines:] if last_n_lines else lines)
         else:
-            lines = list(self.buffer)
-
-        context = '\n'.join(lines)
+            # Only walk back as far as the character limit needs
+            context = '\n'.join(self._tail_lines(last_n_lines or len(self.buffer), self.max_chars + 1))
 
         # Truncate if too long
         if len(context) > self.max_chars:
@@ -99,10 +416,10 @@ class TerminalContext:
         Returns:
             String containing the last N characters
         """
-        if not self.buffer:
+        if not self.buffer or char_count <= 0:
             return ""
 
-        context = '\n'.join(self.buffer)
+        context = '\n'.join(self._tail_lines(len(self.buffer), char_count))
 
         if len(context) <= char_count:
             return context
@@ -114,15 +431,20 @@ class TerminalContext:
         """Clear the buffer."""
         self.buffer.clear()
         self._total_chars = 0
+        self._first_line = 0
+        self.segments.clear()
+        self._expected.clear()
+        self.compactor.clear()
+        self._generation += 1
 
     def size(self) -> int:
         """
         Get current buffer size in characters.
 
         Returns:
-            Number of characters in buffer
+            Number of characters in buffer (length of the newline-joined text)
         """
-        return self._total_chars
+        return max(0, self._total_chars - 1)
 
     def line_count(self) -> int:
         """
@@ -143,4 +465,4 @@ class TerminalContext:
 
     def __repr__(self) -> str:
         """Return debug representation."""
-        return f"TerminalContext(lines={len(self.buffer)}, chars={self._total_chars})"
+        return f"TerminalContext(lines={len(self.buffer)}, chars={self.size()})"
@@ -0,0 +1,210 @@
+"""
+Streaming compaction of repetitive terminal output for AI context.
+"""
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+from config.constants import AppConstants
+
+# Numbers, hex addresses and ids differ between otherwise identical lines
+_VARIABLE_RE = re.compile(r'\d[0-9a-fA-Fx]*')
+
+
+def visible_text(line: str) -> str:
+    """
+    Text a line shows after carriage returns: progress bars redraw the
+    same line with \\r, and only the last update stays visible.
+
+    Args:
+        line: Raw line (may contain \\r)
+
+    Returns:
+        The last non-empty \\r-separated part
+    """
+    if '\r' not in line:
+        return line
+    for part in reversed(line.split('\r')):
+        if part.strip():
+            return part
+    return ''
+
+
+def line_key(text: str) -> str:
+    """Key under which near-duplicate lines compare equal."""
+    return ' '.join(_VARIABLE_RE.sub('#', text).split())
+
+
+@dataclass
+class CompactedLine:
+    """One line of the compacted view and the raw lines it stands for."""
+    text: str            # First occurrence (visible text)
+    key: str
+    first: int           # Absolute number of the first raw line
+    last: int            # Absolute number of the last raw line covered
+    count: int = 1       # Consecutive raw lines merged into this entry
+    last_text: str = ""  # Last merged line (near duplicates)
+    exact: bool = True   # All merged lines were identical
+    block: int = 0       # > 0: starts a block of this many entries ...
+    repeats: int = 0     # ... that was repeated this many more times
+    member: bool = False  # Part of a repeated block (no longer merged into)
+    boundary: bool = False  # Command line; never merged across
+
+    def render(self) -> List[str]:
+        """Lines shown for this entry (without block markers)."""
+        if self.count == 1:
+            return [self.text]
+        if self.exact:
+            return [f"{self.text} [repeated {self.count} times]"]
+        if self.count == 2:
+            return [self.text, self.last_text]
+        return [self.text, f"... [{self.count - 2} similar lines] ...", self.last_text]
+
+
+class OutputCompactor:
+    """
+    Incremental compacted view of completed terminal lines.
+
+    Each line is reduced to its visible text (carriage-return updates
+    collapse to the final state) and merged into the previous entry when
+    it is identical or differs only in numbers. Repeated blocks of up to
+    max_period entries, such as a stack trace logged in a loop, collapse
+    into the first copy plus a repeat marker. Every entry keeps the range
+    of raw line numbers it stands for, so the raw lines can be recovered.
+    """
+
+    def __init__(self, max_period: int = AppConstants.CONTEXT_COMPACT_MAX_PERIOD):
+        """
+        Args:
+            max_period: Longest repeated block (in entries) to detect
+        """
+        self.max_period = max_period
+        self.entries: deque = deque()
+
+    def add(self, number: int, line: str, boundary: bool = False):
+        """
+        Add a completed line.
+
+        Args:
+            number: Absolute raw line number
+            line: Raw line
+            boundary: Line starts a new command (no merging across it)
+        """
+        text = visible_text(line).rstrip()
+        key = line_key(text)
+        entries = self.entries
+        if entries and not boundary:
+            previous = entries[-1]
+            if previous.key == key and not (previous.member or previous.boundary):
+                previous.count += 1
+                previous.last = number
+                previous.last_text = text
+                previous.exact = previous.exact and text == previous.text
+                return
+        entries.append(CompactedLine(text, key, number, number, last_text=text, boundary=boundary))
+        if not boundary:
+            self._collapse_block()
+
+    def _collapse_block(self):
+        """Fold the newest entries into the block before them if they repeat it."""
+        entries = self.entries
+        n = len(entries)
+        newest = entries[-1].key
+        for period in range(2, min(self.max_period, n // 2) + 1):
+            if entries[n - 1 - period].key != newest:
+                continue
+            first = [entries[i] for i in range(n - 2 * period, n - period)]
+            second = [entries[i] for i in range(n - period, n)]
+            if any(e.key != f.key for e, f in zip(first, second)):
+                continue
+            if any(e.member or e.boundary or e.block for e in second):
+                continue
+            header = first[0]
+            if header.block == period and all(e.member and not e.block for e in first[1:]):
+                header.repeats += 1
+            elif not any(e.member or e.boundary or e.block for e in first):
+                header.block = period
+                header.repeats = 1
+                for entry in first:
+                    entry.member = True
+            else:
+                continue
+            header.last = second[-1].last
+            for _ in range(period):
+                entries.pop()
+            return
+
+    def evict(self, first_line: int):
+        """Drop entries whose raw lines were all evicted."""
+        entries = self.entries
+        while entries and entries[0].last < first_line:
+            entries.popleft()
+
+    def clear(self):
+        """Remove all entries."""
+        self.entries.clear()
+
+    def select(self, start: int, end: Optional[int] = None) -> List[CompactedLine]:
+        """
+        Entries starting within a raw line range, oldest first.
+
+        Args:
+            start: First absolute raw line number
+            end: End (exclusive), None for no limit
+
+        Returns:
+            List of CompactedLine
+        """
+        selected = []
+        for entry in reversed(self.entries):
+            if entry.first < start:
+                break
+            if end is None or entry.first < end:
+                selected.append(entry)
+        selected.reverse()
+        return selected
+
+    def tail(self, min_chars: int) -> List[CompactedLine]:
+        """
+        Newest entries, oldest first, until their text reaches min_chars.
+
+        Args:
+            min_chars: Characters wanted
+
+        Returns:
+            List of CompactedLine
+        """
+        selected = []
+        length = 0
+        for entry in reversed(self.entries):
+            if length >= min_chars:
+                break
+            selected.append(entry)
+            length += sum(len(text) + 1 for text in entry.render())
+        selected.reverse()
+        return selected
+
+    @staticmethod
+    def render(entries: Iterable[CompactedLine]) -> List[str]:
+        """
+        Lines of the compacted view for entries, with block markers.
+
+        Args:
+            entries: Consecutive entries, oldest first
+
+        Returns:
+            List of lines
+        """
+        lines = []
+        block_left = 0
+        marker = None
+        for entry in entries:
+            if entry.block:
+                block_left = entry.block
+                marker = f"[previous {entry.block} lines repeated {entry.repeats} more times]"
+            lines.extend(entry.render())
+            if block_left:
+                block_left -= 1
+                if not block_left:
+                    lines.append(marker)
+        return lines
@@ -0,0 +1,155 @@
+"""
+Token estimation and token-budgeted message assembly for AI requests.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, List
+from ai.context_manager import TerminalContext
+
+
+# Tokens a chat message costs beyond its content (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# CJK characters are mostly one token each, some two; round up so the
+# estimate errs on the side of fitting
+CJK_TOKENS_PER_CHAR = 1.1
+
+_CJK_RE = re.compile(
+    r'[\u2e80-\u2fff\u3000-\u303f\u3040-\u30ff\u3100-\u31ff\u3400-\u4dbf'
+    r'\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]'
+)
+# Letter runs, digit runs, whitespace runs/newlines and ASCII punctuation
+_ASCII_TOKEN_RE = re.compile(r'[A-Za-z]+|\d+|\s{2,}|\n|[!-/:-@\[-`{-~]')
+
+
+@lru_cache(maxsize=4096)
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text without a tokenizer.
+
+    Follows how BPE tokenizers split text: an English word is usually one
+    token (long words a few), digits go in groups of three, punctuation and
+    runs of whitespace are tokens of their own, and CJK and other non-ASCII
+    characters cost about a token each. Results are cached per string, so
+    history messages are only measured once.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for match in _ASCII_TOKEN_RE.findall(text):
+        first = match[0]
+        if first.isalpha():
+            tokens += (len(match) + 6) // 7
+        elif first.isdigit():
+            tokens += (len(match) + 2) // 3
+        else:
+            tokens += 1
+    non_ascii = len(text) - len(text.encode('ascii', 'ignore'))
+    if non_ascii:
+        cjk = len(_CJK_RE.findall(text))
+        tokens += int(cjk * CJK_TOKENS_PER_CHAR + 0.999) + (non_ascii - cjk)
+    return tokens
+
+
+def message_tokens(message: Dict) -> int:
+    """
+    Estimated token cost of one chat message.
+
+    Args:
+        message: {"role": ..., "content": ...}
+
+    Returns:
+        Estimated token count including the per-message overhead
+    """
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def fit_text(text: str, max_tokens: int) -> str:
+    """
+    Trim text to a token budget, keeping whole lines from its start and
+    end (see TerminalContext.trim_lines).
+
+    Args:
+        text: Text to trim
+        max_tokens: Token budget
+
+    Returns:
+        Text within the budget ("" if nothing fits)
+    """
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    lines = text.split('\n')
+    max_chars = int(len(text) * max_tokens / tokens)
+    while max_chars > 0:
+        trimmed = TerminalContext.trim_lines(lines, max_chars)
+        if estimate_tokens(trimmed) <= max_tokens:
+            return trimmed
+        max_chars = int(max_chars * 0.9)
+    return ""
+
+
+def assemble_messages(system_prompt: str, history: List[Dict], user_message: str,
+                      terminal_context: str, budget: int, context_template: str,
+                      max_history_messages: int = None) -> List[Dict]:
+    """
+    Build the message list for a request within a token budget.
+
+    The budget is filled in priority order: system prompt, the user
+    message with the terminal context (trimmed from the middle if it does
+    not fit), then history from the most recent turn backwards until the
+    next message would not fit. If the system prompt and the question
+    alone exceed the budget, the system prompt is trimmed to at most half
+    of it and the question to the rest.
+
+    Args:
+        system_prompt: System prompt
+        history: Earlier messages, oldest first (without user_message)
+        user_message: Current question
+        terminal_context: Terminal output for the question ("" for none)
+        budget: Tokens available for the request (context window minus
+            the completion reserve)
+        context_template: Format string with {context} and {question}
+        max_history_messages: Optional cap on history messages
+
+    Returns:
+        List of message dictionaries
+    """
+    question_tokens = estimate_tokens(user_message) + MESSAGE_OVERHEAD_TOKENS
+    system_allowed = max(budget // 2, budget - question_tokens)
+    system = {"role": "system", "content": fit_text(system_prompt, system_allowed - MESSAGE_OVERHEAD_TOKENS)}
+    remaining = budget - message_tokens(system)
+    user_message = fit_text(user_message, remaining - MESSAGE_OVERHEAD_TOKENS)
+
+    content = user_message
+    if terminal_context:
+        frame = context_template.format(context="", question=user_message)
+        allowed = remaining - estimate_tokens(frame) - MESSAGE_OVERHEAD_TOKENS
+        context = fit_text(terminal_context, allowed)
+        if context:
+            content = context_template.format(context=context, question=user_message)
+    question = {"role": "user", "content": content}
+    remaining -= message_tokens(question)
+
+    included = []
+    candidates = history[-max_history_messages:] if max_history_messages else history
+    for message in reversed(candidates):
+        cost = message_tokens(message)
+        if cost > remaining:
+            break
+        included.append(message)
+        remaining -= cost
+    included.reverse()
+    # Do not start with a reply whose question was cut off
+    if included and included[0]["role"] == "assistant":
+        included.pop(0)
+
+    return [system] + included + [question]
@@ -9,22 +9,61 @@ class AppConstants:
 
     # AI Feedback Timing
     AI_FEEDBACK_DELAY_MS = 1000
+    AI_DEFAULT_CONTEXT_TOKENS = 8192   # Context window when the profile does not set one
+    AI_TOKEN_SAFETY_MARGIN = 256       # Headroom for estimation error
+    AI_MIN_PROMPT_TOKENS = 1024        # Prompt room kept when max_tokens nearly fills the window
 
     # SSH Connection
     SSH_DEFAULT_PORT = 22
     SSH_TIMEOUT_SECONDS = 10
+    SSH_CONNECT_MAX_WORKERS = 8
+    SSH_PROBE_TIMEOUT_SEC = 15
+    SSH_PROBE_MAX_WORKERS = 4
+    SSH_RECONNECT_BASE_DELAY_SEC = 1.0
+    SSH_RECONNECT_MAX_DELAY_SEC = 60.0
     SSH_CHANNEL_RECV_SIZE = 4096
-    SSH_READ_THREAD_SLEEP_SEC = 0.01
-    SSH_INIT_DELAY_SEC = 0.2
+    SSH_CHANNEL_RECV_MAX_SIZE = 65536
+    SSH_OUTPUT_FRAME_MS = 16
+    SSH_OUTPUT_BATCH_MAX_BYTES = 262144
+    SSH_TERM_TYPE = 'xterm-256color'
+    SSH_DEFAULT_COLS = 80
+    SSH_DEFAULT_ROWS = 24
+    SSH_PROMPT_TIMEOUT_SEC = 3.0
+    SHELL_PROMPT_PATTERN = r'[$#>%]\s*$'
+    # Prompt followed by a command: user@host:~$ cmd, [user@host dir]# cmd, user@host ~ % cmd
+    SHELL_COMMAND_LINE_PATTERN = r'^(?:\[[^\]]+\]|[\w.-]+@[\w.-]+(?::\S*|\s\S+)?)\s?[$#%>]\s+(\S.*)$'
+    SSH_EXEC_TIMEOUT_SEC = 300
+    SSH_SEND_CHUNK_SIZE = 32768
+    SSH_SEND_TIMEOUT_SEC = 30
+
+    # Broadcast
+    BROADCAST_TIMEOUT_SEC = 60
+    BROADCAST_MAX_PARALLEL = 16
+    BROADCAST_PER_HOST_LIMIT = 2
+    SSH_EXEC_POLL_SEC = 0.25
+    SSH_EXEC_MAX_OUTPUT_CHARS = 1024 * 1024  # Kept per stream in ExecResult; live output is not capped
     THREAD_JOIN_TIMEOUT_SECONDS = 2
 
     # Terminal
     TERMINAL_MAX_LINES = 500
     TERMINAL_MAX_CHARS = 3000
+    TERMINAL_MAX_BUFFER_CHARS = 64000  # Context ring limit (TERMINAL_MAX_CHARS is the per-call limit)
+    CONTEXT_COMPACT_MAX_PERIOD = 8     # Longest repeated block of lines collapsed for the AI
+    CONTEXT_ECHO_WINDOW_LINES = 10     # Lines within which a sent command must be echoed
     DEFAULT_TERMINAL_FONT_FAMILY = 'Consolas'
     DEFAULT_TERMINAL_FONT_SIZE = 14
     DEFAULT_TERMINAL_BACKGROUND = '#1e1e1e'
     DEFAULT_TERMINAL_TEXT_COLOR = '#00ff00'
+    # Terminal output is drawn at most once per frame
+    RENDER_FRAME_MS = 16
+    # Scrollback lines inserted per step when a tab catches up after being hidden
+    BACKLOG_CHUNK_LINES = 500
+    # Scrollback is trimmed once it exceeds max_lines by this many lines
+    SCROLLBACK_TRIM_BATCH = 256
+    # Lines per compressed chunk in the scrollback archive
+    SCROLLBACK_ARCHIVE_CHUNK_LINES = 2000
+    # Maximum matches listed by the scrollback search dialog
+    SCROLLBACK_SEARCH_LIMIT = 500
 
     # Messages
     MSG_CONNECTING = "Connecting to {host}..."
@@ -20,6 +20,8 @@ class AISettings:
     max_tokens: int = 2000
     # 使用占位符作为默认值，实际加载时会使用 AIClient.DEFAULT_SYSTEM_PROMPT
     system_prompt: str = ""
+    # Run AI-suggested commands on a separate exec channel (exit code, no debounce)
+    use_exec_channel: bool = False
 
     def to_dict(self) -> dict:
         return {
@@ -30,7 +32,8 @@ class AISettings:
             'max_history': self.max_history,
             'temperature': self.temperature,
             'max_tokens': self.max_tokens,
-            'system_prompt': self.system_prompt
+            'system_prompt': self.system_prompt,
+            'use_exec_channel': self.use_exec_channel
         }
 
     @classmethod
@@ -48,6 +51,12 @@ class TerminalSettings:
     cursor_blink: bool = True
     scroll_on_output: bool = True
     max_lines: int = 500
+    # Keep lines trimmed from the scrollback in a compressed, searchable archive
+    archive_scrollback: bool = False
+    archive_max_lines: int = 100000
+    # Output renderer: 'text' (QTextEdit, char formats), 'html' (QTextEdit, insertHtml)
+    # or 'painted' (custom painted view)
+    renderer: str = "text"
 
     def to_dict(self) -> dict:
         return {
@@ -57,7 +66,10 @@ class TerminalSettings:
             'text_color': self.text_color,
             'cursor_blink': self.cursor_blink,
             'scroll_on_output': self.scroll_on_output,
-            'max_lines': self.max_lines
+            'max_lines': self.max_lines,
+            'archive_scrollback': self.archive_scrollback,
+            'archive_max_lines': self.archive_max_lines,
+            'renderer': self.renderer
         }
 
     @classmethod
@@ -98,12 +110,18 @@ class ConnectionSettings:
     timeout: int = 10
     auto_save_history: bool = True
     max_history_count: int = 10
+    keepalive_interval: int = 30  # seconds, 0 disables keepalive and probing
+    auto_reconnect: bool = True
+    reconnect_max_attempts: int = 8
 
     def to_dict(self) -> dict:
         return {
             'timeout': self.timeout,
             'auto_save_history': self.auto_save_history,
-            'max_history_count': self.max_history_count
+            'max_history_count': self.max_history_count,
+            'keepalive_interval': self.keepalive_interval,
+            'auto_reconnect': self.auto_reconnect,
+            'reconnect_max_attempts': self.reconnect_max_attempts
         }
 
     @classmethod
@@ -8,7 +8,7 @@ from views.main_window import MainWindow
 from views.password_dialog import PasswordDialog
 from ai.ai_client import AIClient
 from ai.context_manager import TerminalContext
-from utils.ansi_filter import ansi_to_html, strip_ansi
+from utils.ansi_filter import strip_ansi
 from config.constants import AppConstants
 import re
 
@@ -39,7 +39,8 @@ class AppController(QObject):
         self.ai_client = AIClient()
         self.terminal_context = TerminalContext(
             max_lines=AppConstants.TERMINAL_MAX_LINES,
-            max_chars=AppConstants.TERMINAL_MAX_CHARS
+            max_chars=AppConstants.TERMINAL_MAX_CHARS,
+            max_buffer_chars=AppConstants.TERMINAL_MAX_BUFFER_CHARS
         )
 
         # Create main window
@@ -212,9 +213,8 @@ class AppController(QObject):
             self.main_window.chat_widget.append_system_message(f"[ERROR] {traceback.format_exc()}")
 
     def _display_data(self, data: str) -> None:
-        """Display data to terminal with HTML formatting."""
-        html_data = ansi_to_html(data)
-        self.main_window.terminal_widget.append_output_html(html_data)
+        """Feed output to the terminal widget's screen model."""
+        self.main_window.terminal_widget.feed_output(data)
 
     def _update_context(self, data: str) -> None:
         """Update terminal context manager."""
@@ -2,16 +2,16 @@
 Single session controller.
 Manages one SSH session with its terminal and AI chat.
 """
-from PyQt6.QtCore import QObject, pyqtSlot, QTimer
+from PyQt6.QtCore import Qt, QObject, pyqtSlot, QTimer
 from typing import Optional
 from models.ssh_handler import SSHHandler
+from models.output_processor import OutputProcessor
 from ai.ai_client import AIClient
 from ai.context_manager import TerminalContext
 from views.terminal_widget import TerminalWidget
 from views.chat_widget import AIChatWidget
-from utils.ansi_filter import ansi_to_html, strip_ansi
+from config.config_manager import ConfigManager
 from config.constants import AppConstants
-import re
 
 
 class SessionController(QObject):
@@ -49,19 +49,18 @@ class SessionController(QObject):
         # Context Manager
         self.terminal_context = TerminalContext(
             max_lines=AppConstants.TERMINAL_MAX_LINES,
-            max_chars=AppConstants.TERMINAL_MAX_CHARS
+            max_chars=AppConstants.TERMINAL_MAX_CHARS,
+            max_buffer_chars=AppConstants.TERMINAL_MAX_BUFFER_CHARS
         )
 
         # AI Feedback state
         self._waiting_for_ai_feedback = False
         self._ai_feedback_timer: Optional[QTimer] = None
         self._waiting_for_password = False
+        self._exec_pending = False  # AI command running on an exec channel
 
-        # Password prompt patterns
-        self._password_prompt_patterns = [
-            re.compile(pattern, re.IGNORECASE)
-            for pattern in AppConstants.PASSWORD_PATTERNS
-        ]
+        # Output worker (created in initialize); it also matches password prompts
+        self._output_processor: Optional[OutputProcessor] = None
 
         # AI signal handlers (will be set in initialize)
         self._ai_response_handler = None
@@ -71,18 +70,53 @@ class SessionController(QObject):
         self._is_streaming = False
         self._stream_buffer = ""
 
+        # Terminal output already sent to the AI: high-water mark of the last
+        # answered request, and of the request in flight
+        self._context_mark = None
+        self._pending_mark = None
+
     def initialize(self, ssh_handler: SSHHandler):
         """Initialize session with SSH handler."""
         self.ssh_handler = ssh_handler
 
-        # Connect SSH signals
-        self.ssh_handler.data_received.connect(self._on_data_received)
+        # Output is processed on a per-session worker thread: the reader
+        # thread queues it directly and only results reach the GUI thread
+        self._output_processor = OutputProcessor(self.terminal_widget.screen, AppConstants.PASSWORD_PATTERNS)
+        self.terminal_widget.attach_processor(self._output_processor)
+        self._output_processor.processed.connect(self._on_output_processed)
+        self._output_processor.start()
+
+        # Connect SSH signals. Output and everything that must be drawn
+        # before it (progress, screen reset, connected banner) go straight
+        # into the processor queue, in the order the handler emits them
+        self.ssh_handler.data_received.connect(
+            self._output_processor.submit, Qt.ConnectionType.DirectConnection
+        )
         self.ssh_handler.connection_lost.connect(self._on_connection_lost)
+        self.ssh_handler.connection_established.connect(
+            self._on_connection_output, Qt.ConnectionType.DirectConnection
+        )
         self.ssh_handler.connection_established.connect(self._on_connection_established)
+        self.ssh_handler.connect_progress.connect(
+            self._on_connect_progress, Qt.ConnectionType.DirectConnection
+        )
+        self.ssh_handler.connect_finished.connect(self._on_connect_finished)
+        self.ssh_handler.reconnecting.connect(self._on_reconnecting)
+
+        self.ssh_handler.shell_ready.connect(self._on_shell_ready)
+        self.ssh_handler.exec_output.connect(self._on_exec_output)
+        self.ssh_handler.exec_finished.connect(self._on_exec_finished)
+        self.ssh_handler.send_progress.connect(self.terminal_widget.set_send_progress)
+        self.ssh_handler.send_failed.connect(self._on_send_failed)
 
         # Connect terminal signals
         self.terminal_widget.command_sent.connect(self._handle_command_sent)
 
+        # Keep the remote PTY the same size as the terminal view
+        if self.terminal_widget.isVisible():
+            self.ssh_handler.set_terminal_size(*self.terminal_widget.terminal_size())
+        self.terminal_widget.terminal_resized.connect(self.ssh_handler.set_terminal_size)
+
         # Note: AI chat signals are now connected in MultiTerminalWindow
         # to ensure proper signal routing for each session's AI client
 
@@ -103,7 +137,8 @@ class SessionController(QObject):
 
     def connect_to_server(self, conn_info: dict) -> bool:
         """
-        Connect to SSH server.
+        Start connecting to SSH server in the background.
+        The GUI stays responsive; the outcome arrives via _on_connect_finished.
 
         Args:
             conn_info: Dictionary with host, port, username, password
@@ -112,8 +147,6 @@ class SessionController(QObject):
             bool: True if connection initiated successfully
         """
         print(f"[DEBUG SessionController:{self.session_id}] connect_to_server called")
-        print(f"[DEBUG SessionController:{self.session_id}] self.ssh_handler = {self.ssh_handler}")
-        print(f"[DEBUG SessionController:{self.session_id}] conn_info = {conn_info}")
 
         if not self.ssh_handler:
             print("[DEBUG] self.ssh_handler is None, returning False")
@@ -129,17 +162,18 @@ class SessionController(QObject):
             username = conn_info.get('username', '')
             password = conn_info.get('password', '')
 
-            print(f"[DEBUG] Calling ssh_handler.connect(host={host}, port={port}, username={username})")
+            print(f"[DEBUG] Calling ssh_handler.connect_async(host={host}, port={port}, username={username})")
 
-            success, message = self.ssh_handler.connect(
+            started = self.ssh_handler.connect_async(
                 host=host,
                 port=port,
                 username=username,
                 password=password,
                 timeout=AppConstants.SSH_TIMEOUT_SECONDS
             )
-            print(f"[DEBUG] ssh_handler.connect returned: success={success}, message={message}")
-            return success
+            if started:
+                self.terminal_widget.append_output(AppConstants.MSG_CONNECTING.format(host=host) + "\n")
+            return started
         except Exception as e:
             import traceback
             print(f"[DEBUG] Exception during connect: {e}")
@@ -158,42 +192,28 @@ class SessionController(QObject):
         """Reconnect to server using stored connection info."""
         return self.connect_to_server(conn_info)
 
-    def _display_data(self, data: str) -> None:
-        """Display data to terminal with HTML formatting."""
-        html_data = ansi_to_html(data)
-        self.terminal_widget.append_output_html(html_data)
-
-    def _update_context(self, data: str) -> None:
-        """Update terminal context manager."""
-        clean_data = strip_ansi(data)
-        self.terminal_context.append(clean_data)
-
-    def _check_password_prompt(self, data: str) -> None:
+    def _on_password_prompt_detected(self) -> None:
         """
-        检查是否包含密码提示
+        检测到密码提示 (matched on the output worker thread)
 
         v1.6.1: 当检测到密码提示时，取消等待AI反馈，等待用户输入密码
         """
         if self._waiting_for_password:
             return
 
-        clean_data = strip_ansi(data)
-        for pattern in self._password_prompt_patterns:
-            if pattern.search(clean_data):
-                # 取消等待AI反馈，因为终端正在等待密码输入
-                if self._waiting_for_ai_feedback:
-                    self._waiting_for_ai_feedback = False
-                    if self._ai_feedback_timer:
-                        self._ai_feedback_timer.stop()
-                        self._ai_feedback_timer = None
-                    print(f"[DEBUG SessionController:{self.session_id}] Password prompt detected, canceling AI feedback wait")
+        # 取消等待AI反馈，因为终端正在等待密码输入
+        if self._waiting_for_ai_feedback:
+            self._waiting_for_ai_feedback = False
+            if self._ai_feedback_timer:
+                self._ai_feedback_timer.stop()
+                self._ai_feedback_timer = None
+            print(f"[DEBUG SessionController:{self.session_id}] Password prompt detected, canceling AI feedback wait")
 
-                self._handle_password_prompt()
-                break
+        self._handle_password_prompt()
 
     def _trigger_ai_feedback_if_needed(self) -> None:
         """Trigger AI feedback if waiting for command output."""
-        if not self._waiting_for_ai_feedback:
+        if not self._waiting_for_ai_feedback or self._exec_pending:
             return
 
         if self._ai_feedback_timer:
@@ -209,27 +229,77 @@ class SessionController(QObject):
         error_msg = f"[ERROR] {location}: {str(error)}"
         self.chat_widget.append_system_message(error_msg)
 
-    @pyqtSlot(str)
-    def _on_data_received(self, data):
-        """Handle data received from SSH server."""
+    @pyqtSlot(object)
+    def _on_output_processed(self, result):
+        """Apply a batch processed on the output worker thread."""
         try:
-            self._display_data(data)
-            self._update_context(data)
-            self._check_password_prompt(data)
+            self.terminal_widget.queue_update(result.update)
+            if result.text:
+                self.terminal_context.append(result.text)
+            # Exec results queued behind their output (see _on_exec_finished)
+            for exec_result in result.markers:
+                self._send_feedback_to_ai(exec_result)
+            if not result.remote:
+                return
+            if result.password_prompt:
+                self._on_password_prompt_detected()
             self._trigger_ai_feedback_if_needed()
         except Exception as e:
-            self._handle_error("_on_data_received", e)
+            self._handle_error("_on_output_processed", e)
+
+    @pyqtSlot()
+    def _on_connection_output(self):
+        """
+        Start a fresh screen with the connected banner (connecting thread).
+        Queued before the server's first output, so the login banner and
+        prompt are not wiped by the reset.
+        """
+        self.terminal_widget.reset_screen()
+        self.terminal_widget.append_output(
+            "\n=== Connected to SSH server ===\n"
+            "You can now enter commands.\n"
+            "Ask AI for help anytime!\n\n"
+        )
 
     @pyqtSlot()
     def _on_connection_established(self):
         """Handle successful connection."""
         if self.ssh_handler:
+            self.terminal_widget.set_connection_status(True)
+
+    @pyqtSlot(str)
+    def _on_connect_progress(self, message):
+        """Show connection setup progress (connecting thread, queued to the processor)."""
+        self.terminal_widget.append_output(f"{message}\n")
+
+    @pyqtSlot(float)
+    def _on_shell_ready(self, seconds):
+        """Record time from connect to the first shell prompt."""
+        print(f"[DEBUG SessionController:{self.session_id}] time to first prompt: {seconds * 1000:.0f} ms")
+
+    @pyqtSlot(bool, str)
+    def _on_connect_finished(self, success, message):
+        """Handle the outcome of a background connection attempt."""
+        print(f"[DEBUG SessionController:{self.session_id}] connect finished: success={success}, message={message}")
+        if not success:
             self.terminal_widget.append_output(
-                "\n=== Connected to SSH server ===\n"
-                "You can now enter commands.\n"
-                "Ask AI for help anytime!\n\n"
+                f"\n=== {AppConstants.MSG_CONNECTION_FAILED}: {message} ===\n"
+                "You can try connecting again using the Connect button.\n"
             )
-            self.terminal_widget.set_connection_status(True)
+            self.terminal_widget.set_connection_status(False)
+
+    @pyqtSlot(int, float)
+    def _on_reconnecting(self, attempt, delay):
+        """Show that the supervisor will reconnect this session."""
+        self.terminal_widget.append_output(
+            f"=== Reconnecting in {delay:.1f}s (attempt {attempt}) ===\n"
+        )
+
+    @pyqtSlot(str)
+    def _on_send_failed(self, message):
+        """Report data that could not be written to the server."""
+        self.terminal_widget.set_send_progress(0, 0)
+        self.terminal_widget.append_output(f"Error: {message}\n")
 
     @pyqtSlot(str)
     def _on_connection_lost(self, reason):
@@ -251,6 +321,7 @@ class SessionController(QObject):
 
         if self.ssh_handler and self.ssh_handler.is_connected:
             # Send command to server
+            self.terminal_context.mark_command(command)
             success, message = self.ssh_handler.send_command(command)
             if not success:
                 self.terminal_widget.append_output(f"Error: {message}\n")
@@ -265,16 +336,22 @@ class SessionController(QObject):
         # Show thinking indicator
         self.chat_widget.show_thinking()
 
-        # Get terminal context (unless in privacy mode)
+        # Get terminal context (unless in privacy mode); follow-ups send only
+        # the output since the last answered request when the AI still has
+        # the earlier snapshot
         context = ""
+        delta = None
         if not self.chat_widget.privacy_mode:
-            context = self.terminal_context.get_context()
-            print(f"[DEBUG Session:{self.session_id}] Privacy Mode OFF - sending context ({len(context)} chars)", flush=True)
+            context = self.terminal_context.get_context(compact=True)
+            delta = self.terminal_context.get_delta(self._context_mark)
+            self._pending_mark = self.terminal_context.high_water_mark()
+            print(f"[DEBUG Session:{self.session_id}] Privacy Mode OFF - sending context ({len(context)} chars, delta: {None if delta is None else len(delta)})", flush=True)
         else:
+            self._pending_mark = None
             print(f"[DEBUG Session:{self.session_id}] Privacy Mode ON - NOT sending context", flush=True)
 
         # Ask AI asynchronously
-        self.ai_client.ask_async(message, context)
+        self.ai_client.ask_async(message, context, context_delta=delta)
 
     def on_chat_message(self, message: str):
         """Public method to handle chat message from MultiTerminalWindow."""
@@ -297,22 +374,60 @@ class SessionController(QObject):
                 self._ai_feedback_timer.stop()
                 self._ai_feedback_timer = None
 
-            # Send command directly to SSH handler
-            if self.ssh_handler and self.ssh_handler.is_connected:
-                success, message = self.ssh_handler.send_command(command)
-                if not success:
-                    self.terminal_widget.append_output(f"Error: {message}\n")
-                    self._waiting_for_ai_feedback = False
-            else:
+            if not (self.ssh_handler and self.ssh_handler.is_connected):
                 self.terminal_widget.append_output(
                     "Not connected to server. Please connect first.\n"
                 )
                 self._waiting_for_ai_feedback = False
+                return
+
+            # Exec channel: exact completion and exit code, feedback without delay
+            if ConfigManager.get_instance().settings.ai.use_exec_channel:
+                if self.ssh_handler.exec_command_async(command):
+                    self._exec_pending = True
+                    self.terminal_context.mark_command(command)
+                    self._output_processor.submit_local(f"$ {command}\r\n", context=True)
+                    return
+                print(f"[DEBUG SessionController:{self.session_id}] Exec channel busy, using shell")
+
+            # Send command directly to SSH handler
+            self.terminal_context.mark_command(command)
+            success, message = self.ssh_handler.send_command(command)
+            if not success:
+                self.terminal_widget.append_output(f"Error: {message}\n")
+                self._waiting_for_ai_feedback = False
         except Exception as e:
             self.chat_widget.append_system_message(f"[ERROR] {str(e)}")
             import traceback
             self.chat_widget.append_system_message(f"[ERROR] {traceback.format_exc()}")
 
+    @pyqtSlot(str, str)
+    def _on_exec_output(self, stream, text):
+        """Mirror exec channel output into the terminal view and AI context."""
+        try:
+            display = text.replace('\r\n', '\n').replace('\n', '\r\n')
+            if stream == 'stderr':
+                display = f"\x1b[31m{display}\x1b[0m"
+            # Drawn and projected to plain text for the context in one parse
+            self._output_processor.submit_local(display, context=True)
+        except Exception as e:
+            self._handle_error("_on_exec_output", e)
+
+    @pyqtSlot(object)
+    def _on_exec_finished(self, result):
+        """Report exec completion and hand the result to the AI once its output is in the context."""
+        self._exec_pending = False
+        if result.error:
+            status = f"error: {result.error}"
+        elif result.timed_out:
+            status = "timed out"
+        else:
+            status = f"exit code {result.exit_code}"
+        summary = f"[{status}, {result.duration:.2f}s]"
+        # Output is still queued on the worker; feedback follows it in order
+        self._output_processor.submit_local(f"\r\n{summary}\r\n", context=True)
+        self._output_processor.submit_marker(result)
+
     def on_command_execute(self, command: str):
         """Public method to handle command execution from MultiTerminalWindow."""
         self._handle_command_execution(command)
@@ -344,8 +459,13 @@ class SessionController(QObject):
         # Reset flag
         self._waiting_for_password = False
 
-    def _send_feedback_to_ai(self):
-        """Send terminal output back to AI for analysis."""
+    def _send_feedback_to_ai(self, result=None):
+        """
+        Send terminal output back to AI for analysis.
+
+        Args:
+            result: ExecResult when the command ran on an exec channel
+        """
         try:
             if not self._waiting_for_ai_feedback:
                 return
@@ -357,17 +477,27 @@ class SessionController(QObject):
             # Show indicator in chat
             self.chat_widget.append_system_message(AppConstants.MSG_ANALYZING_OUTPUT)
 
-            # Get recent terminal context
-            context = self.terminal_context.get_context()
+            # Compacted output of the last command (head and tail of huge
+            # outputs), or the recent tail if no command line was recognised.
+            # While the AI still has the last snapshot everything since the
+            # last answered request goes as a delta instead, so output of
+            # commands run by hand in between is not skipped
+            context = (self.terminal_context.get_command_output()
+                       or self.terminal_context.get_context(compact=True))
+            delta = self.terminal_context.get_delta(self._context_mark)
+            self._pending_mark = self.terminal_context.high_water_mark()
 
             # Send feedback to AI
-            feedback_message = "以上是命令执行结果，请分析并继续下一步"
+            if result is not None and not result.error and not result.timed_out:
+                feedback_message = f"以上是命令执行结果（退出码 {result.exit_code}），请分析并继续下一步"
+            else:
+                feedback_message = "以上是命令执行结果，请分析并继续下一步"
 
             # Show thinking indicator
             self.chat_widget.show_thinking()
 
             # Ask AI to analyze and continue
-            self.ai_client.ask_async(feedback_message, context)
+            self.ai_client.ask_async(feedback_message, context, context_delta=delta)
         except Exception as e:
             self.chat_widget.append_system_message(f"[ERROR] {str(e)}")
             import traceback
@@ -378,6 +508,7 @@ class SessionController(QObject):
         """
         Handle AI response received (非流式模式，向后兼容).
         """
+        self._commit_context_mark()
         self.chat_widget.append_ai_response(response)
 
     @pyqtSlot()
@@ -397,6 +528,7 @@ class SessionController(QObject):
     @pyqtSlot(str)
     def _on_stream_finished(self, full_response: str):
         """处理流式响应完成。"""
+        self._commit_context_mark()
         if self._is_streaming:
             self._is_streaming = False
             self.chat_widget.finish_streaming_response(full_response)
@@ -405,8 +537,16 @@ class SessionController(QObject):
     @pyqtSlot(str)
     def _on_ai_error(self, error_msg):
         """Handle AI error."""
+        # The request was dropped from the history; keep the previous mark
+        self._pending_mark = None
         self.chat_widget.show_error(error_msg)
 
+    def _commit_context_mark(self):
+        """The AI has seen the output up to the answered request's mark."""
+        if self._pending_mark is not None:
+            self._context_mark = self._pending_mark
+            self._pending_mark = None
+
     def on_ai_profile_changed(self, profile_name: str):
         """
         处理 AI profile 切换请求
@@ -462,9 +602,21 @@ class SessionController(QObject):
 
         # Close SSH connection
         if self.ssh_handler:
+            # Detach the direct connections into the processor first, so no
+            # thread of the handler queues output while it is stopped
+            if self._output_processor:
+                try:
+                    self.ssh_handler.data_received.disconnect(self._output_processor.submit)
+                    self.ssh_handler.connection_established.disconnect(self._on_connection_output)
+                    self.ssh_handler.connect_progress.disconnect(self._on_connect_progress)
+                except (TypeError, RuntimeError):
+                    pass
             self.ssh_handler.close()
             self.ssh_handler = None
 
+        if self._output_processor:
+            self._output_processor.stop()
+
         # Clear terminal context
         if self.terminal_context:
             self.terminal_context.clear()
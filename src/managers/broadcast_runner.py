@@ -0,0 +1,193 @@
+"""
+Broadcast command runner.
+Runs one command on many hosts concurrently and collects the results.
+"""
+import difflib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from PyQt6.QtCore import QObject, pyqtSignal
+from models.connection_profile import ConnectionProfile
+from models.exec_channel import ExecResult, run_exec
+from models.transport_registry import TransportRegistry
+from config.constants import AppConstants
+
+
+class BroadcastRunner(QObject):
+    """
+    Fan a command out to a set of profiles over exec channels.
+
+    Transports come from the shared TransportRegistry, so hosts that already
+    have an open tab run the command without a new handshake. At most
+    max_parallel hosts run at once, and at most per_host_limit commands run
+    against the same host address (several profiles may point at one host).
+    Results are keyed by target_labels(), which stays unique when profiles
+    share a name.
+    """
+
+    # Signals
+    host_started = pyqtSignal(str)            # target label
+    host_finished = pyqtSignal(str, object)   # target label, ExecResult
+    finished = pyqtSignal()
+
+    def __init__(self, transport_registry: TransportRegistry, parent=None):
+        super().__init__(parent)
+        self._registry = transport_registry
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._slots_lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._remaining = 0
+        self._remaining_lock = threading.Lock()
+        self.results: Dict[str, ExecResult] = {}
+
+    def start(self, profiles: List[ConnectionProfile], command: str,
+              timeout: float = AppConstants.BROADCAST_TIMEOUT_SEC,
+              max_parallel: int = AppConstants.BROADCAST_MAX_PARALLEL,
+              per_host_limit: int = AppConstants.BROADCAST_PER_HOST_LIMIT) -> None:
+        """
+        Start running a command on every profile.
+
+        Args:
+            profiles: Target profiles
+            command: Command line to execute
+            timeout: Per-host command timeout in seconds
+            max_parallel: Maximum hosts running at the same time
+            per_host_limit: Maximum concurrent commands per host address
+        """
+        self.results = {}
+        self._cancelled.clear()
+        self._host_slots = {}
+        self._remaining = len(profiles)
+        if not profiles:
+            self.finished.emit()
+            return
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_parallel), thread_name_prefix="ssh-broadcast"
+        )
+        for label, profile in zip(target_labels(profiles), profiles):
+            self._executor.submit(self._run_host, label, profile, command, timeout, per_host_limit)
+        self._executor.shutdown(wait=False)
+
+    def cancel(self) -> None:
+        """Skip hosts that have not started yet; running commands finish or time out."""
+        self._cancelled.set()
+
+    def _host_slot(self, host: str, limit: int) -> threading.BoundedSemaphore:
+        with self._slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(max(1, limit))
+            return slot
+
+    def _run_host(self, label: str, profile: ConnectionProfile, command: str, timeout: float,
+                  per_host_limit: int):
+        """Run the command on one profile (pool thread)."""
+        try:
+            with self._host_slot(profile.host, per_host_limit):
+                if self._cancelled.is_set():
+                    result = ExecResult(command=command, error="Cancelled")
+                else:
+                    self.host_started.emit(label)
+                    result = self._exec_on_profile(profile, command, timeout)
+        except Exception as e:
+            result = ExecResult(command=command, error=str(e))
+
+        self.results[label] = result
+        self.host_finished.emit(label, result)
+        with self._remaining_lock:
+            self._remaining -= 1
+            done = self._remaining == 0
+        if done:
+            self.finished.emit()
+
+    def _exec_on_profile(self, profile: ConnectionProfile, command: str, timeout: float) -> ExecResult:
+        """Acquire a transport for a profile, run the command and release it."""
+        try:
+            transport = self._registry.acquire(
+                profile.host, profile.port, profile.username, profile.password,
+                AppConstants.SSH_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            return ExecResult(command=command, error=f"Connection failed: {str(e) or e.__class__.__name__}")
+
+        try:
+            return run_exec(transport, command, timeout)
+        finally:
+            self._registry.release(TransportRegistry.make_key(profile.host, profile.port, profile.username))
+
+
+def target_labels(profiles: List[ConnectionProfile]) -> List[str]:
+    """
+    Unique display label for each target: the profile name, qualified with
+    user@host:port (and a counter if needed) when several targets share it.
+
+    Args:
+        profiles: Target profiles
+
+    Returns:
+        Labels in the order of profiles
+    """
+    counts: Dict[str, int] = {}
+    for profile in profiles:
+        counts[profile.name] = counts.get(profile.name, 0) + 1
+
+    labels = []
+    seen = set()
+    for profile in profiles:
+        label = profile.name
+        if counts[label] > 1:
+            label = f"{profile.name} ({profile.username}@{profile.host}:{profile.port})"
+        unique = label
+        n = 2
+        while unique in seen:
+            unique = f"{label} #{n}"
+            n += 1
+        seen.add(unique)
+        labels.append(unique)
+    return labels
+
+
+def group_outputs(results: Dict[str, ExecResult]) -> List[Tuple[str, List[str]]]:
+    """
+    Group hosts that produced identical output.
+
+    Args:
+        results: Mapping of target label to ExecResult
+
+    Returns:
+        List of (output, target labels), largest group first
+    """
+    groups: Dict[str, List[str]] = {}
+    for name, result in results.items():
+        groups.setdefault(result_text(result), []).append(name)
+    return sorted(groups.items(), key=lambda item: (-len(item[1]), item[1][0]))
+
+
+def diff_outputs(baseline_name: str, baseline: ExecResult, other_name: str, other: ExecResult) -> str:
+    """
+    Unified diff of one host's output against a baseline host.
+
+    Returns:
+        Diff text, empty when the outputs are identical
+    """
+    return ''.join(difflib.unified_diff(
+        result_text(baseline).splitlines(keepends=True),
+        result_text(other).splitlines(keepends=True),
+        fromfile=baseline_name, tofile=other_name
+    ))
+
+
+def result_text(result: ExecResult) -> str:
+    """Output shown for a result: stdout, then stderr, or the error."""
+    if result.error:
+        return f"[{result.error}]\n"
+    text = result.stdout
+    if result.stderr:
+        text += result.stderr
+    if result.truncated:
+        text += "[output truncated]\n"
+    if result.timed_out:
+        text += "[timed out]\n"
+    return text
@@ -2,9 +2,12 @@
 Connection pool manager.
 Manages multiple SSH connections lifecycle.
 """
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from PyQt6.QtCore import QObject, pyqtSignal
 from models.ssh_handler import SSHHandler
+from models.transport_registry import TransportRegistry
+from managers.connection_supervisor import ConnectionSupervisor
+from managers.broadcast_runner import BroadcastRunner
 from models.connection_profile import ConnectionProfile
 from config.constants import AppConstants
 
@@ -13,6 +16,10 @@ class ConnectionManager(QObject):
     """
     Connection pool manager for managing multiple SSH connections.
     Provides connection lifecycle management, status tracking, and signal notifications.
+
+    All handlers created or registered here share one TransportRegistry, so
+    several tabs to the same user@host:port ride on a single SSH connection,
+    and are watched by a ConnectionSupervisor for keepalive and reconnects.
     """
 
     # Signals
@@ -32,10 +39,15 @@ class ConnectionManager(QObject):
         self._connections: Dict[str, SSHHandler] = {}
         self._connection_info: Dict[str, dict] = {}
         self._next_conn_id = 1
+        self.transport_registry = TransportRegistry()
+        self.supervisor = ConnectionSupervisor(self)
+        self._connecting = set()  # conn_ids whose first connect_async() is pending
 
     def create_connection(self, profile: ConnectionProfile) -> str:
         """
         Create a new SSH connection from a profile.
+        Blocks until the connection is established; GUI code should prefer
+        create_connection_async().
 
         Args:
             profile: ConnectionProfile with connection details
@@ -50,7 +62,7 @@ class ConnectionManager(QObject):
         self._next_conn_id += 1
 
         # Create SSH handler
-        ssh_handler = SSHHandler()
+        ssh_handler = SSHHandler(transport_registry=self.transport_registry)
         ssh_handler.set_connection_id(conn_id)
 
         # Connect status change signal
@@ -69,19 +81,133 @@ class ConnectionManager(QObject):
 
         if success:
             self._connections[conn_id] = ssh_handler
-            self._connection_info[conn_id] = {
-                'name': profile.name,
-                'host': profile.host,
-                'port': profile.port,
-                'username': profile.username,
-                'group': profile.group,
-                'tags': profile.tags
-            }
+            self._connection_info[conn_id] = self._profile_info(profile)
+            self.supervisor.watch(conn_id, ssh_handler)
             self.connection_added.emit(conn_id)
             return conn_id
         else:
             raise ConnectionError(f"Connection failed: {message}")
 
+    def create_connection_async(self, profile: ConnectionProfile) -> str:
+        """
+        Start connecting a profile on the worker pool without blocking.
+
+        The connection is registered immediately with CONNECTING status so
+        callers can bind a tab to it. On failure connection_error is emitted
+        and the connection is removed again.
+
+        Args:
+            profile: ConnectionProfile with connection details
+
+        Returns:
+            str: Connection ID (e.g., "conn_1", "conn_2")
+        """
+        conn_id = f"conn_{self._next_conn_id}"
+        self._next_conn_id += 1
+
+        ssh_handler = SSHHandler(transport_registry=self.transport_registry)
+        ssh_handler.set_connection_id(conn_id)
+        ssh_handler.status_changed.connect(
+            lambda status, cid=conn_id: self.connection_status_changed.emit(cid, status)
+        )
+        ssh_handler.connect_finished.connect(
+            lambda success, message, cid=conn_id: self._on_connect_finished(cid, success, message)
+        )
+
+        self._connections[conn_id] = ssh_handler
+        self._connection_info[conn_id] = self._profile_info(profile)
+        self._connecting.add(conn_id)
+        self.supervisor.watch(conn_id, ssh_handler)
+        self.connection_added.emit(conn_id)
+
+        ssh_handler.connect_async(
+            host=profile.host,
+            port=profile.port,
+            username=profile.username,
+            password=profile.password,
+            timeout=AppConstants.SSH_TIMEOUT_SECONDS
+        )
+        return conn_id
+
+    def register_handler(self, ssh_handler: SSHHandler, conn_info: dict) -> str:
+        """
+        Track a handler created elsewhere (e.g. by a terminal tab).
+        The handler should have been constructed with this manager's
+        transport_registry so it can share connections.
+
+        Args:
+            ssh_handler: Handler to track
+            conn_info: Dictionary with name, host, port, username, group, tags
+
+        Returns:
+            str: Connection ID assigned to the handler
+        """
+        conn_id = f"conn_{self._next_conn_id}"
+        self._next_conn_id += 1
+
+        ssh_handler.set_connection_id(conn_id)
+        ssh_handler.status_changed.connect(
+            lambda status, cid=conn_id: self.connection_status_changed.emit(cid, status)
+        )
+
+        self._connections[conn_id] = ssh_handler
+        self._connection_info[conn_id] = {
+            'name': conn_info.get('name', conn_info.get('host', '')),
+            'host': conn_info.get('host', ''),
+            'port': conn_info.get('port', AppConstants.SSH_DEFAULT_PORT),
+            'username': conn_info.get('username', ''),
+            'group': conn_info.get('group'),
+            'tags': conn_info.get('tags', [])
+        }
+        self.supervisor.watch(conn_id, ssh_handler)
+        self.connection_added.emit(conn_id)
+        return conn_id
+
+    def connect_many(self, profiles: List[ConnectionProfile]) -> List[str]:
+        """
+        Connect several profiles in parallel.
+
+        Args:
+            profiles: Profiles to connect
+
+        Returns:
+            List of connection IDs in the same order as profiles
+        """
+        return [self.create_connection_async(profile) for profile in profiles]
+
+    def create_broadcast(self) -> BroadcastRunner:
+        """
+        Create a runner that sends one command to many profiles concurrently.
+        Connect to its signals, then call start(); hosts with an open tab
+        reuse that tab's SSH connection.
+
+        Returns:
+            BroadcastRunner bound to this manager's transports
+        """
+        return BroadcastRunner(self.transport_registry, self)
+
+    def _on_connect_finished(self, conn_id: str, success: bool, message: str) -> None:
+        """Handle the outcome of the first background connection attempt."""
+        if conn_id not in self._connecting:
+            return
+        self._connecting.discard(conn_id)
+        if success or conn_id not in self._connections:
+            return
+        self.connection_error.emit(conn_id, message)
+        self.remove_connection(conn_id)
+
+    @staticmethod
+    def _profile_info(profile: ConnectionProfile) -> dict:
+        """Build connection metadata from a profile."""
+        return {
+            'name': profile.name,
+            'host': profile.host,
+            'port': profile.port,
+            'username': profile.username,
+            'group': profile.group,
+            'tags': profile.tags
+        }
+
     def get_connection(self, conn_id: str) -> Optional[SSHHandler]:
         """
         Get a specific connection by ID.
@@ -114,6 +240,8 @@ class ConnectionManager(QObject):
             conn_id: Connection ID to remove
         """
         if conn_id in self._connections:
+            self.supervisor.unwatch(conn_id)
+            self._connecting.discard(conn_id)
             handler = self._connections[conn_id]
             handler.close()
             del self._connections[conn_id]
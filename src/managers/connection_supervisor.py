@@ -0,0 +1,218 @@
+"""
+Connection supervisor.
+Keeps SSH sessions alive, detects dead peers and reconnects with backoff.
+"""
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from models.connection_handler import ConnectionHandler, ConnectionStatus
+from config.config_manager import ConfigManager
+from config.constants import AppConstants
+
+
+class ConnectionSupervisor(QObject):
+    """
+    Watches a set of connections for ConnectionManager.
+
+    - Enables transport-level keepalives so NAT mappings stay open.
+    - Periodically measures round-trip time with a global request; a probe
+      that gets no answer within SSH_PROBE_TIMEOUT_SEC marks the peer dead
+      and closes the transport, so its channels report the drop. Probes
+      block, so they run on a small executor of their own and never delay
+      connects queued on ConnectWorkerPool.
+    - Reconnects dropped sessions with exponential backoff and jitter. The
+      same handler object is reused, so the tab's SessionController stays
+      attached to it. Tabs sharing a transport reconnect through a single
+      handshake in TransportRegistry.
+    """
+
+    # Signals
+    rtt_measured = pyqtSignal(str, float)      # conn_id, round-trip time in ms
+    reconnected = pyqtSignal(str)              # conn_id
+    reconnect_failed = pyqtSignal(str, str)    # conn_id, last error
+
+    # Internal: probe results arrive from probe threads
+    _probe_finished = pyqtSignal(object, float)  # transport, rtt seconds (-1 on failure)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._handlers: Dict[str, ConnectionHandler] = {}
+        self._attempts: Dict[str, int] = {}
+        self._retry_timers: Dict[str, QTimer] = {}
+        self._rtt: Dict[str, float] = {}
+        self._probes: Dict[object, float] = {}  # transport -> probe start time
+        self._probe_executor = ThreadPoolExecutor(
+            max_workers=AppConstants.SSH_PROBE_MAX_WORKERS,
+            thread_name_prefix="ssh-probe"
+        )
+
+        self._probe_timer = QTimer(self)
+        self._probe_timer.timeout.connect(self._probe_all)
+        self._probe_finished.connect(self._on_probe_finished)
+
+    def watch(self, conn_id: str, handler: ConnectionHandler) -> None:
+        """
+        Start supervising a connection.
+
+        Args:
+            conn_id: Connection ID
+            handler: Handler to supervise
+        """
+        self._handlers[conn_id] = handler
+        handler.connection_lost.connect(lambda reason, cid=conn_id: self._on_connection_lost(cid, reason))
+        handler.connection_established.connect(lambda cid=conn_id: self._on_connection_established(cid))
+        handler.connect_finished.connect(
+            lambda success, message, cid=conn_id: self._on_connect_finished(cid, success, message)
+        )
+        self._ensure_probe_timer()
+
+    def unwatch(self, conn_id: str) -> None:
+        """
+        Stop supervising a connection (before it is closed on purpose).
+
+        Args:
+            conn_id: Connection ID
+        """
+        self._handlers.pop(conn_id, None)
+        self._attempts.pop(conn_id, None)
+        self._rtt.pop(conn_id, None)
+        self._cancel_retry(conn_id)
+        if not self._handlers:
+            self._probe_timer.stop()
+
+    def get_rtt(self, conn_id: str) -> Optional[float]:
+        """Last measured round-trip time in ms, if any."""
+        return self._rtt.get(conn_id)
+
+    def _settings(self):
+        return ConfigManager.get_instance().settings.connection
+
+    def _ensure_probe_timer(self):
+        """(Re)start the probe timer with the configured interval."""
+        interval = self._settings().keepalive_interval
+        if interval <= 0:
+            self._probe_timer.stop()
+        elif not self._probe_timer.isActive() or self._probe_timer.interval() != interval * 1000:
+            self._probe_timer.start(interval * 1000)
+
+    # ---------- Keepalive and dead-peer detection ----------
+
+    def _on_connection_established(self, conn_id: str):
+        """Enable keepalives on the (possibly shared) transport."""
+        handler = self._handlers.get(conn_id)
+        transport = getattr(handler, 'transport', None)
+        interval = self._settings().keepalive_interval
+        if transport is not None and interval > 0:
+            transport.set_keepalive(interval)
+
+    def _probe_all(self):
+        """Probe every distinct live transport once."""
+        self._ensure_probe_timer()
+        now = time.monotonic()
+        transports = {}
+        for handler in self._handlers.values():
+            transport = getattr(handler, 'transport', None)
+            if handler.is_connected and transport is not None:
+                transports[id(transport)] = transport
+
+        for transport in transports.values():
+            started = self._probes.get(transport)
+            if started is not None:
+                # Previous probe still unanswered
+                if now - started > AppConstants.SSH_PROBE_TIMEOUT_SEC:
+                    print(f"[DEBUG ConnectionSupervisor] Peer not responding, closing transport {transport}")
+                    self._probes.pop(transport, None)
+                    transport.close()
+                continue
+            self._probes[transport] = now
+            self._probe_executor.submit(self._probe, transport)
+
+    def _probe(self, transport):
+        """Send a keepalive request and wait for the reply (probe thread)."""
+        started = time.monotonic()
+        # Time out from when the probe was sent, not from when it was queued
+        # behind probes to other peers
+        self._probes[transport] = started
+        try:
+            transport.global_request('keepalive@openssh.com', wait=True)
+            rtt = time.monotonic() - started if transport.is_active() else -1.0
+        except Exception:
+            rtt = -1.0
+        self._probe_finished.emit(transport, rtt)
+
+    def _on_probe_finished(self, transport, rtt: float):
+        """Record RTT for every connection on the probed transport."""
+        self._probes.pop(transport, None)
+        if rtt < 0:
+            return
+        for conn_id, handler in self._handlers.items():
+            if getattr(handler, 'transport', None) is transport:
+                self._rtt[conn_id] = rtt * 1000.0
+                self.rtt_measured.emit(conn_id, rtt * 1000.0)
+
+    # ---------- Reconnect with backoff ----------
+
+    def _on_connection_lost(self, conn_id: str, reason: str):
+        """Schedule a reconnect if the link dropped (not a shell exit)."""
+        handler = self._handlers.get(conn_id)
+        if handler is None or not handler.connection_dropped:
+            return
+        if not self._settings().auto_reconnect:
+            return
+        self._schedule_retry(conn_id)
+
+    def _schedule_retry(self, conn_id: str):
+        """Arm the next reconnect attempt using exponential backoff with jitter."""
+        handler = self._handlers.get(conn_id)
+        if handler is None:
+            return
+
+        attempt = self._attempts.get(conn_id, 0) + 1
+        if attempt > self._settings().reconnect_max_attempts:
+            self._attempts.pop(conn_id, None)
+            handler._set_status(ConnectionStatus.ERROR)
+            self.reconnect_failed.emit(conn_id, "Maximum reconnect attempts reached")
+            return
+        self._attempts[conn_id] = attempt
+
+        # Full jitter in [delay/2, delay] keeps a fleet from reconnecting in lockstep
+        delay = min(AppConstants.SSH_RECONNECT_MAX_DELAY_SEC,
+                    AppConstants.SSH_RECONNECT_BASE_DELAY_SEC * (2 ** (attempt - 1)))
+        delay = random.uniform(delay / 2, delay)
+
+        handler._set_status(ConnectionStatus.RECONNECTING)
+        handler.reconnecting.emit(attempt, delay)
+
+        self._cancel_retry(conn_id)
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.timeout.connect(lambda cid=conn_id: self._retry(cid))
+        timer.start(int(delay * 1000))
+        self._retry_timers[conn_id] = timer
+
+    def _retry(self, conn_id: str):
+        """Run a scheduled reconnect attempt."""
+        self._cancel_retry(conn_id)
+        handler = self._handlers.get(conn_id)
+        if handler is None or handler.is_connected:
+            return
+        if not handler.reconnect_async() and handler.status != ConnectionStatus.CONNECTING:
+            self._schedule_retry(conn_id)
+
+    def _on_connect_finished(self, conn_id: str, success: bool, message: str):
+        """Track the outcome of reconnect attempts."""
+        if conn_id not in self._attempts:
+            return
+        if success:
+            self._attempts.pop(conn_id, None)
+            self.reconnected.emit(conn_id)
+        else:
+            self._schedule_retry(conn_id)
+
+    def _cancel_retry(self, conn_id: str):
+        timer = self._retry_timers.pop(conn_id, None)
+        if timer:
+            timer.stop()
+            timer.deleteLater()
@@ -22,6 +22,7 @@ class AIProfile:
     model: str  # 模型名称
     is_default: bool = False  # 是否为默认配置
     description: str = ""  # 描述
+    context_tokens: int = 8192  # 模型上下文窗口 (tokens)，用于请求的 token 预算
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
 
     def to_dict(self) -> dict:
@@ -38,6 +39,7 @@ class AIProfile:
             'model': self.model,
             'is_default': self.is_default,
             'description': self.description,
+            'context_tokens': self.context_tokens,
             'created_at': self.created_at
         }
 
@@ -59,6 +61,7 @@ class AIProfile:
             model=data.get('model', 'gpt-4-turbo'),
             is_default=data.get('is_default', False),
             description=data.get('description', ''),
+            context_tokens=data.get('context_tokens', 8192),
             created_at=data.get('created_at')
         )
 
@@ -0,0 +1,48 @@
+"""
+Bounded worker pool for connection setup.
+Keeps TCP connect, key exchange and authentication off the GUI thread.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+from config.constants import AppConstants
+
+
+class ConnectWorkerPool:
+    """
+    Process-wide pool that runs blocking connection work.
+
+    The pool size is bounded by SSH_CONNECT_MAX_WORKERS so opening many
+    saved hosts at once connects them in parallel without spawning an
+    unbounded number of threads.
+    """
+
+    _instance: Optional['ConnectWorkerPool'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_workers: int = AppConstants.SSH_CONNECT_MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="ssh-connect"
+        )
+
+    @classmethod
+    def get_instance(cls) -> 'ConnectWorkerPool':
+        """Get the shared pool, creating it on first use."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Run a blocking callable on a pool thread.
+
+        Args:
+            fn: Callable to run
+            *args, **kwargs: Arguments passed to fn
+
+        Returns:
+            Future for the call result
+        """
+        return self._executor.submit(fn, *args, **kwargs)
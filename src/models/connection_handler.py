@@ -5,6 +5,7 @@ Note: This is a conceptual base class. Subclasses must implement the abstract me
 from PyQt6.QtCore import QObject, pyqtSignal
 from enum import Enum
 from typing import Optional
+from models.connect_pool import ConnectWorkerPool
 
 
 class ConnectionStatus(Enum):
@@ -27,12 +28,17 @@ class ConnectionHandler(QObject):
     connection_lost = pyqtSignal(str)  # Emitted when connection is lost
     connection_established = pyqtSignal()  # Emitted when connection is successful
     status_changed = pyqtSignal(str)  # Status changed (status string)
+    connect_progress = pyqtSignal(str)  # Progress message during connection setup
+    connect_finished = pyqtSignal(bool, str)  # (success, message) from connect_async()
+    reconnecting = pyqtSignal(int, float)  # (attempt, delay seconds) before an automatic reconnect
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self._connected = False
         self._connection_id: Optional[str] = None
         self._status = ConnectionStatus.DISCONNECTED
+        self._connect_args: Optional[dict] = None  # Last connect() parameters, for reconnects
+        self._dropped = False  # True when the last disconnect was not requested locally
 
     def connect(self, host, port, username, password=None, timeout=10):
         """
@@ -48,6 +54,51 @@ class ConnectionHandler(QObject):
         """
         raise NotImplementedError("Subclasses must implement connect()")
 
+    def connect_async(self, host, port, username, password=None, timeout=10) -> bool:
+        """
+        Establish connection on the shared worker pool without blocking.
+        Result is reported via connect_finished; status moves through
+        CONNECTING to CONNECTED or ERROR.
+
+        Args:
+            host: Server hostname or IP
+            port: Server port
+            username: Login username
+            password: Login password (optional for key-based auth)
+            timeout: Connection timeout in seconds
+
+        Returns:
+            bool: False if a connection attempt is already in progress
+        """
+        if self._status == ConnectionStatus.CONNECTING:
+            return False
+
+        self._set_status(ConnectionStatus.CONNECTING)
+        ConnectWorkerPool.get_instance().submit(
+            self._connect_worker, host, port, username, password, timeout
+        )
+        return True
+
+    def reconnect_async(self) -> bool:
+        """
+        Repeat the last connection attempt in the background.
+
+        Returns:
+            bool: False if there is nothing to reconnect to or an attempt is running
+        """
+        if not self._connect_args or self._connected:
+            return False
+        return self.connect_async(**self._connect_args)
+
+    def _connect_worker(self, host, port, username, password, timeout):
+        """Run connect() on a pool thread and report the outcome."""
+        try:
+            success, message = self.connect(host, port, username, password, timeout)
+        except Exception as e:
+            success, message = False, f"Connection error: {str(e)}"
+            self._set_status(ConnectionStatus.ERROR)
+        self.connect_finished.emit(success, message)
+
     def send_command(self, command):
         """
         Send command to remote server.
@@ -70,6 +121,11 @@ class ConnectionHandler(QObject):
         """Check if connection is active."""
         return self._connected
 
+    @property
+    def connection_dropped(self) -> bool:
+        """True if the connection ended because of the network or peer, not close()."""
+        return self._dropped
+
     @property
     def status(self) -> ConnectionStatus:
         """Get current connection status."""
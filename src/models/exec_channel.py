@@ -0,0 +1,119 @@
+"""
+One-shot command execution on an SSH exec channel.
+Runs beside the interactive shell on the same transport.
+"""
+import select
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+from config.constants import AppConstants
+from utils.stream_decoder import TerminalStreamDecoder
+
+
+@dataclass
+class ExecResult:
+    """Outcome of a command run on an exec channel."""
+    command: str
+    exit_code: int = -1          # -1 when the command did not report a status
+    stdout: str = ""
+    stderr: str = ""
+    duration: float = 0.0        # seconds
+    timed_out: bool = False
+    truncated: bool = False      # stdout/stderr exceeded SSH_EXEC_MAX_OUTPUT_CHARS
+    error: str = ""              # channel/transport error, if any
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0 and not self.timed_out and not self.error
+
+
+def run_exec(transport, command: str, timeout: Optional[float] = None,
+             on_output: Optional[Callable[[str, str], None]] = None) -> ExecResult:
+    """
+    Run a command on a new exec channel and wait for it to exit.
+
+    Unlike typing into the interactive shell, completion is exact: the
+    result carries the exit status and keeps stdout and stderr apart.
+    No PTY is requested, so programs that insist on a terminal (e.g. sudo
+    asking for a password) fail instead of waiting for input. The timeout
+    applies even while output keeps streaming, and only the first
+    SSH_EXEC_MAX_OUTPUT_CHARS of each stream are kept in the result
+    (on_output still sees everything).
+
+    Args:
+        transport: Active paramiko.Transport
+        command: Command line to execute
+        timeout: Seconds before the channel is closed (None waits forever)
+        on_output: Optional callback (stream, text) for live output,
+                   stream is 'stdout' or 'stderr'
+
+    Returns:
+        ExecResult
+    """
+    result = ExecResult(command=command)
+    started = time.monotonic()
+    deadline = started + timeout if timeout else None
+    kept = {'stdout': [], 'stderr': []}
+    room = {'stdout': AppConstants.SSH_EXEC_MAX_OUTPUT_CHARS, 'stderr': AppConstants.SSH_EXEC_MAX_OUTPUT_CHARS}
+    decoders = {'stdout': TerminalStreamDecoder(), 'stderr': TerminalStreamDecoder()}
+
+    def feed(stream, data, final=False):
+        text = decoders[stream].decode(data, final=final)
+        if text:
+            if len(text) > room[stream]:
+                result.truncated = True
+            if room[stream] > 0:
+                kept[stream].append(text[:room[stream]])
+                room[stream] -= len(kept[stream][-1])
+            if on_output:
+                on_output(stream, text)
+
+    channel = None
+    try:
+        channel = transport.open_session(timeout=AppConstants.SSH_TIMEOUT_SECONDS)
+        channel.exec_command(command)
+        channel.setblocking(0)
+
+        while True:
+            wait = AppConstants.SSH_EXEC_POLL_SEC
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    result.timed_out = True
+                    break
+                wait = min(wait, remaining)
+
+            # Checked before reading: the server sends the exit status after
+            # the last data, so once it is seen, draining the buffers below
+            # reads everything that came before it
+            exited = channel.exit_status_ready()
+            closed = channel.closed
+            if channel.recv_ready():
+                feed('stdout', channel.recv(AppConstants.SSH_CHANNEL_RECV_MAX_SIZE))
+            elif channel.recv_stderr_ready():
+                feed('stderr', channel.recv_stderr(AppConstants.SSH_CHANNEL_RECV_MAX_SIZE))
+            elif exited:
+                result.exit_code = channel.recv_exit_status()
+                break
+            elif closed:
+                break
+            elif channel.eof_received:
+                # Output is complete; wake as soon as the exit status arrives
+                channel.status_event.wait(wait)
+            else:
+                select.select([channel], [], [], wait)
+    except Exception as e:
+        result.error = str(e) or e.__class__.__name__
+    finally:
+        if channel is not None:
+            try:
+                channel.close()
+            except Exception:
+                pass
+
+    feed('stdout', b'', final=True)
+    feed('stderr', b'', final=True)
+    result.stdout = ''.join(kept['stdout'])
+    result.stderr = ''.join(kept['stderr'])
+    result.duration = time.monotonic() - started
+    return result
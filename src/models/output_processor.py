@@ -0,0 +1,169 @@
+"""
+Per-session output processing worker.
+Runs the terminal screen model and output analysis off the GUI thread.
+"""
+import queue
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Optional
+from PyQt6.QtCore import QObject, pyqtSignal
+from utils.terminal_screen import TerminalScreen, ScreenUpdate
+
+
+@dataclass
+class ProcessedOutput:
+    """Result of one processed batch, ready for the GUI thread to apply."""
+    update: ScreenUpdate      # Screen damage to draw (render fragments)
+    text: str = ""            # Plain-text projection for the AI context
+    password_prompt: bool = False
+    remote: bool = False      # Batch contained output from the server
+    markers: List[Any] = field(default_factory=list)  # From submit_marker, in order
+
+
+class OutputProcessor(QObject):
+    """
+    Worker thread that owns a session's TerminalScreen.
+
+    Output chunks (and screen commands such as resize) are queued from any
+    thread; the worker drains whatever is queued and emits one
+    ProcessedOutput per batch. Each chunk is parsed once: the screen feed
+    yields the styled runs and the plain-text projection together, and
+    the password patterns are combined into one regular expression that
+    scans the batch's text once. The GUI thread only merges the
+    ScreenUpdate into its pending frame and appends the text, so a tab
+    flooding output no longer competes with typing in another one.
+
+    Once attached to a TerminalWidget the screen must only be touched
+    through this object.
+    """
+
+    # Emitted on the worker thread; connected slots run queued on the GUI thread
+    processed = pyqtSignal(object)
+
+    def __init__(self, screen: TerminalScreen, password_patterns: Iterable[str] = (), parent=None):
+        """
+        Args:
+            screen: Screen model to feed (owned by the worker from now on)
+            password_patterns: Regular expressions matched against plain text
+            parent: Qt parent
+        """
+        super().__init__(parent)
+        self.screen = screen
+        patterns = '|'.join(f'(?:{p})' for p in password_patterns)
+        self._password_re = re.compile(patterns, re.IGNORECASE) if patterns else None
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the worker thread (idempotent)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="output-processor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the worker after the queued items were processed."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def submit(self, data: str) -> None:
+        """
+        Queue output received from the server (safe from any thread).
+
+        Args:
+            data: Decoded terminal output
+        """
+        self._queue.put(('remote', data))
+
+    def submit_local(self, data: str, context: bool = False) -> None:
+        """
+        Queue locally generated output (status messages, exec mirroring);
+        it is drawn but not matched against triggers.
+
+        Args:
+            data: Terminal output with escape sequences
+            context: Also return its plain text for the AI context
+        """
+        self._queue.put(('local', data, context))
+
+    def submit_marker(self, marker: Any) -> None:
+        """
+        Queue a marker that is handed back in ProcessedOutput.markers once
+        everything queued before it was processed.
+
+        Args:
+            marker: Any object
+        """
+        self._queue.put(('marker', marker))
+
+    def resize(self, cols: int, rows: int) -> None:
+        """Queue a screen resize, ordered with the output around it."""
+        self._queue.put(('resize', cols, rows))
+
+    def reset(self, keep_rows: bool = False) -> None:
+        """
+        Queue a screen reset (safe from any thread).
+
+        Args:
+            keep_rows: Move the rows in use to the scrollback first
+        """
+        self._queue.put(('reset', keep_rows))
+
+    def invalidate(self) -> None:
+        """Queue a full repaint of the screen rows."""
+        self._queue.put(('invalidate',))
+
+    def process(self, items: List[tuple]) -> ProcessedOutput:
+        """
+        Apply queued items to the screen and analyse remote output.
+
+        Args:
+            items: Queued items, oldest first
+
+        Returns:
+            ProcessedOutput for the whole batch
+        """
+        screen = self.screen
+        remote = []   # Plain text of server output (matched against triggers)
+        texts = []    # Plain text for the context, in order
+        markers = []
+        for item in items:
+            kind = item[0]
+            if kind == 'remote':
+                plain = []
+                screen.feed(item[1], plain)
+                remote.extend(plain)
+                texts.extend(plain)
+            elif kind == 'local':
+                screen.feed(item[1], texts if item[2] else None)
+            elif kind == 'resize':
+                screen.resize(item[1], item[2])
+            elif kind == 'reset':
+                screen.reset(item[1])
+            elif kind == 'invalidate':
+                screen.invalidate()
+            elif kind == 'marker':
+                markers.append(item[1])
+        password_prompt = bool(remote and self._password_re and self._password_re.search(''.join(remote)))
+        return ProcessedOutput(screen.take_update(), ''.join(texts), password_prompt, bool(remote), markers)
+
+    def _run(self) -> None:
+        """Worker loop: block for one item, then take everything queued behind it."""
+        while True:
+            item = self._queue.get()
+            items = []
+            while item is not None:
+                items.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if items:
+                try:
+                    self.processed.emit(self.process(items))
+                except Exception as e:
+                    print(f"[DEBUG OutputProcessor] processing failed: {e}")
+            if item is None:
+                return
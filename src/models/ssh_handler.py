@@ -1,26 +1,68 @@
 """
 SSH connection handler using Paramiko.
 """
-import paramiko
+import queue
+import re
+import select
+import socket
 import threading
 import time
-from PyQt6.QtCore import QObject, pyqtSignal
-from models.connection_handler import ConnectionHandler
+import paramiko
+from PyQt6.QtCore import pyqtSignal
+from models.connection_handler import ConnectionHandler, ConnectionStatus
+from models.exec_channel import run_exec
+from models.ssh_reader import SSHReaderService
+from models.transport_registry import TransportRegistry
+from config.constants import AppConstants
+from utils.ansi_filter import strip_ansi
+from utils.stream_decoder import TerminalStreamDecoder
 
 
 class SSHHandler(ConnectionHandler):
     """
-    SSH connection handler that wraps Paramiko SSHClient.
+    SSH connection handler that wraps a Paramiko shell channel.
     Handles SSH connections, command execution, and real-time output streaming.
+
+    The underlying transport comes from a TransportRegistry. Handlers that
+    share a registry (e.g. all tabs of one ConnectionManager) open extra
+    channels on an existing connection to the same user@host:port.
     """
 
-    def __init__(self, parent=None):
+    # Seconds from connect() to the first usable shell prompt
+    shell_ready = pyqtSignal(float)
+
+    # exec_command_async() output: (stream, text) with stream 'stdout'/'stderr'
+    exec_output = pyqtSignal(str, str)
+    # exec_command_async() completion: ExecResult
+    exec_finished = pyqtSignal(object)
+
+    # Queued sends: (bytes sent, total bytes) for multi-chunk payloads, and failures
+    send_progress = pyqtSignal(int, int)
+    send_failed = pyqtSignal(str)
+
+    # Sent as a single write once the shell prompt appears. The leading space
+    # keeps it out of history where HISTCONTROL=ignorespace is set.
+    SHELL_INIT = (" export COLORTERM=truecolor FORCE_COLOR=1;"
+                  " alias ls='ls --color=always' grep='grep --color=always'\n")
+
+    # Environment passed with the channel request (servers may ignore it)
+    SHELL_ENV = {'COLORTERM': 'truecolor', 'FORCE_COLOR': '1'}
+
+    _PROMPT_RE = re.compile(AppConstants.SHELL_PROMPT_PATTERN)
+
+    def __init__(self, parent=None, transport_registry: TransportRegistry = None):
         super().__init__(parent)
-        self.client = None
+        # A private registry gives this handler its own connection
+        self._transport_registry = transport_registry or TransportRegistry()
+        self._transport_key = None
         self.channel = None
-        self._read_thread = None
-        self._stop_reading = False
+        self._decoder = TerminalStreamDecoder()
         self._state_lock = threading.Lock()
+        self._term_size = (AppConstants.SSH_DEFAULT_COLS, AppConstants.SSH_DEFAULT_ROWS)
+        self.time_to_prompt = None  # Seconds, measured on every connect
+        self._exec_thread = None
+        self._send_queue = queue.Queue()
+        self._send_thread = None
 
     def connect(self, host, port, username, password=None, timeout=10):
         """
@@ -33,67 +75,164 @@ class SSHHandler(ConnectionHandler):
             password: Login password
             timeout: Connection timeout in seconds
         """
+        started = time.monotonic()
+        self._set_status(ConnectionStatus.CONNECTING)
+        self._connect_args = dict(host=host, port=port, username=username,
+                                  password=password, timeout=timeout)
+        self._dropped = False
+        self._release_transport()
         try:
-            # Create SSH client
-            self.client = paramiko.SSHClient()
-            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
-            # Connect to server
-            self.client.connect(
-                hostname=host,
-                port=port,
-                username=username,
-                password=password,
-                timeout=timeout,
-                look_for_keys=False,
-                allow_agent=False
+            # Get a transport, reusing an authenticated one to the same target
+            transport = self._transport_registry.acquire(
+                host, port, username, password, timeout,
+                progress=self.connect_progress.emit
             )
+            self._transport_key = TransportRegistry.make_key(host, port, username)
 
             # Create interactive shell channel
-            # Set environment variable for PTY to get colors
-            self.channel = self.client.invoke_shell()
-            self.channel.setblocking(0)  # Non-blocking mode
-
-            # Immediately send environment setup commands
-            # These must be sent before shell prompt appears
-            import time
-            time.sleep(0.2)  # Wait for shell to initialize
-
-            # Set all color-related environment variables
-            self.channel.send('export TERM=xterm-256color\n')
-            self.channel.send('export COLORTERM=256color\n')
-            self.channel.send('export FORCE_COLOR=1\n')
-            self.channel.send('alias ls="ls --color=always"\n')  # Force ls to use colors
-            self.channel.send('alias grep="grep --color=always"\n')  # Force grep to use colors
-            self.channel.send('clear\n')  # Clear screen to clean up initialization messages
+            self.connect_progress.emit("Authenticated, starting shell...")
+            self.channel = transport.open_session(timeout=timeout)
+            cols, rows = self._term_size
+            self.channel.get_pty(term=AppConstants.SSH_TERM_TYPE, width=cols, height=rows)
+            self.channel.update_environment(self.SHELL_ENV)
+            self.channel.invoke_shell()
+
+            self.channel.settimeout(timeout)
+            self._decoder.reset()
+            banner = self._handshake_shell(started)
+            # Blocking sends wait for the SSH window up to this timeout. The
+            # reader service only calls recv() when data is ready.
+            self.channel.settimeout(AppConstants.SSH_SEND_TIMEOUT_SEC)
 
             with self._state_lock:
                 self._connected = True
+            self._set_status(ConnectionStatus.CONNECTED)
             self.connection_established.emit()
+            if banner:
+                self.data_received.emit(banner)
 
-            # Start reading thread
-            self._stop_reading = False
-            self._read_thread = threading.Thread(target=self._read_output, daemon=True)
-            self._read_thread.start()
+            # Hand the channel to the shared reader service
+            SSHReaderService.get_instance().register(self, self.channel)
 
             return True, "Connected successfully"
 
         except paramiko.AuthenticationException:
             with self._state_lock:
                 self._connected = False
+            self._release_transport()
+            self._set_status(ConnectionStatus.ERROR)
             return False, "Authentication failed. Please check your credentials."
         except paramiko.SSHException as e:
             with self._state_lock:
                 self._connected = False
+            self._release_transport()
+            self._set_status(ConnectionStatus.ERROR)
             return False, f"SSH connection failed: {str(e)}"
         except Exception as e:
             with self._state_lock:
                 self._connected = False
+            self._release_transport()
+            self._set_status(ConnectionStatus.ERROR)
             return False, f"Connection error: {str(e)}"
 
+    def _handshake_shell(self, started: float) -> str:
+        """
+        Initialize the shell once it is actually ready for input.
+
+        Waits for the first prompt, sends SHELL_INIT in one write and waits
+        for the prompt that follows it. The original prompt line and the
+        echo of the init line are dropped, so the user sees the login banner
+        followed by a single fresh prompt. If no prompt is recognized within
+        SSH_PROMPT_TIMEOUT_SEC (a password-change prompt, a menu, an unusual
+        prompt) nothing is typed and the output is passed through untouched;
+        the session then only has the SHELL_ENV channel environment.
+
+        Args:
+            started: time.monotonic() value when connect() began
+
+        Returns:
+            Decoded output to show before live streaming starts
+        """
+        timeout = AppConstants.SSH_PROMPT_TIMEOUT_SEC
+        text, ready = self._read_until_prompt('', timeout)
+        if not ready:
+            self.time_to_prompt = None
+            return text
+
+        self.time_to_prompt = time.monotonic() - started
+        self.shell_ready.emit(self.time_to_prompt)
+        banner = text[:text.rfind('\n') + 1]
+
+        mark = len(text)
+        self.channel.sendall(self.SHELL_INIT)
+        text, ready = self._read_until_prompt(text, timeout, start=mark)
+        tail = text[mark:]
+        if ready:
+            # Keep only the new prompt line after the echoed init command
+            tail = tail[tail.rfind('\n') + 1:]
+        return banner + tail
+
+    def _read_until_prompt(self, text: str, timeout: float, start: int = 0):
+        """
+        Read shell output until it ends with a prompt.
+
+        Args:
+            text: Output collected so far
+            timeout: Maximum seconds to wait
+            start: Only consider output after this offset; a newline must
+                   follow it (the echo of what was sent) before a prompt counts
+
+        Returns:
+            (text, ready) - all output collected and whether a prompt was seen
+        """
+        deadline = time.monotonic() + timeout
+        while not self._ends_with_prompt(text, start):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return text, False
+            readable, _, _ = select.select([self.channel], [], [], remaining)
+            if not readable:
+                continue
+            if self.channel.recv_ready():
+                text += self._decoder.decode(self.channel.recv(AppConstants.SSH_CHANNEL_RECV_SIZE))
+            elif self.channel.closed or self.channel.eof_received:
+                return text, False
+        return text, True
+
+    @classmethod
+    def _ends_with_prompt(cls, text: str, start: int = 0) -> bool:
+        """Check whether the last output line (after start) looks like a shell prompt."""
+        newline = text.rfind('\n', start)
+        if start and newline < 0:
+            return False
+        last_line = strip_ansi(text[newline + 1:]).strip('\r')
+        return bool(last_line.strip()) and bool(cls._PROMPT_RE.search(last_line))
+
+    def set_terminal_size(self, cols: int, rows: int):
+        """
+        Set the PTY size; applied immediately when connected, else on next connect.
+
+        Args:
+            cols: Terminal width in characters
+            rows: Terminal height in lines
+        """
+        if (cols, rows) == self._term_size:
+            return
+        self._term_size = (cols, rows)
+        channel = self.channel
+        if self._connected and channel:
+            try:
+                channel.resize_pty(width=cols, height=rows)
+            except Exception:
+                # Size is re-applied on the next connect
+                pass
+
     def send_command(self, command):
         """
-        Send command to SSH server.
+        Queue a command for sending to the SSH server.
+        Data is written in order by a send worker; large payloads (pastes,
+        scripts) are chunked and reported through send_progress, errors
+        through send_failed.
 
         Args:
             command: Command string to send
@@ -101,52 +240,148 @@ class SSHHandler(ConnectionHandler):
         if not self._connected or not self.channel:
             return False, "Not connected to server"
 
+        self._enqueue_send((command + '\n').encode('utf-8'))
+        return True, "Command queued"
+
+    def _enqueue_send(self, data: bytes):
+        """Queue bytes for the send worker, starting it if needed."""
+        with self._state_lock:
+            if self._send_thread is None or not self._send_thread.is_alive():
+                # Each worker gets its own queue so a stopping one cannot take new data
+                self._send_queue = queue.Queue()
+                self._send_thread = threading.Thread(
+                    target=self._send_worker, args=(self._send_queue,),
+                    name="ssh-send", daemon=True
+                )
+                self._send_thread.start()
+            self._send_queue.put(data)
+
+    def _send_worker(self, send_queue: queue.Queue):
+        """Write queued payloads to the channel (send thread)."""
+        while True:
+            data = send_queue.get()
+            try:
+                if data is None:
+                    return
+                self._send_payload(data)
+            finally:
+                send_queue.task_done()
+
+    def _send_payload(self, data: bytes):
+        """
+        Write one payload completely. sendall() blocks while the remote
+        window is full, so a large paste advances at the rate the server
+        consumes it; SSH_SEND_TIMEOUT_SEC without progress fails the send.
+        """
+        channel = self.channel
+        if channel is None or not self._connected:
+            self.send_failed.emit("Not connected to server")
+            return
+
+        chunk_size = AppConstants.SSH_SEND_CHUNK_SIZE
+        total = len(data)
+        sent = 0
         try:
-            # Send command with newline
-            self.channel.send(command + '\n')
-            return True, "Command sent"
+            while sent < total:
+                chunk = data[sent:sent + chunk_size]
+                channel.sendall(chunk)
+                sent += len(chunk)
+                if total > chunk_size:
+                    self.send_progress.emit(sent, total)
+        except socket.timeout:
+            if self._connected:
+                self.send_failed.emit(f"Send stalled after {sent} of {total} bytes")
         except Exception as e:
-            return False, f"Failed to send command: {str(e)}"
+            if self._connected:
+                self.send_failed.emit(f"Failed to send command: {str(e)}")
+
+    def _stop_send_worker(self):
+        """Discard unsent data and let the send worker exit."""
+        with self._state_lock:
+            while True:
+                try:
+                    self._send_queue.get_nowait()
+                    self._send_queue.task_done()
+                except queue.Empty:
+                    break
+            if self._send_thread is not None:
+                self._send_queue.put(None)
+                self._send_thread = None
 
-    def _read_output(self):
+    def exec_command_async(self, command: str, timeout: float = AppConstants.SSH_EXEC_TIMEOUT_SEC) -> bool:
         """
-        Background thread to continuously read output from SSH channel.
-        Emits data_received signal with new data.
+        Run a command on a separate exec channel over this session's transport.
+        Output streams via exec_output; exec_finished reports the ExecResult
+        as soon as the command exits. The interactive shell is not touched,
+        so the command does not see its working directory or variables.
+
+        Args:
+            command: Command line to execute
+            timeout: Seconds before the command is abandoned
+
+        Returns:
+            bool: False if not connected or another exec command is running
         """
-        while True:
-            with self._state_lock:
-                if not self._connected or self._stop_reading:
-                    should_exit = not self._connected
-                    if should_exit:
-                        break
-            try:
-                if self.channel and self.channel.recv_ready():
-                    # Read data from channel
-                    data = self.channel.recv(4096)
-                    if data:
-                        # Decode and emit signal
-                        text = data.decode('utf-8', errors='ignore')
-                        self.data_received.emit(text)
-                else:
-                    # Small sleep to prevent busy waiting
-                    time.sleep(0.01)
-            except Exception as e:
-                with self._state_lock:
-                    if self._connected:
-                        self.connection_lost.emit(f"Read error: {str(e)}")
-                    break
+        transport = self.transport
+        if not self._connected or transport is None:
+            return False
+        if self._exec_thread and self._exec_thread.is_alive():
+            return False
+
+        self._exec_thread = threading.Thread(
+            target=self._exec_worker, args=(transport, command, timeout),
+            name="ssh-exec", daemon=True
+        )
+        self._exec_thread.start()
+        return True
+
+    def _exec_worker(self, transport, command, timeout):
+        """Run an exec command and report the result (exec thread)."""
+        result = run_exec(transport, command, timeout, on_output=self.exec_output.emit)
+        self.exec_finished.emit(result)
 
+    def _on_channel_data(self, data: bytes):
+        """
+        Called by SSHReaderService (reader thread) with a coalesced batch
+        of channel output, at most about once per display frame.
+        Emits data_received signal with the decoded text; partial UTF-8
+        characters and escape sequences are held for the next batch.
+        """
+        text = self._decoder.decode(data)
+        if text:
+            self.data_received.emit(text)
+
+    def _on_channel_closed(self, reason: str):
+        """Called by SSHReaderService (reader thread) when the channel ends."""
         with self._state_lock:
-            if self._connected:
-                self._connected = False
-                self.connection_lost.emit("Connection closed")
+            if not self._connected:
+                return
+            self._connected = False
+
+        # A shell that exited leaves the transport up; a dead link takes it down
+        channel = self.channel
+        transport = channel.get_transport() if channel else None
+        self._dropped = transport is None or not transport.is_active()
+        self._set_status(ConnectionStatus.DISCONNECTED)
+        tail = self._decoder.decode(b'', final=True)
+        if tail:
+            self.data_received.emit(tail)
+        self.connection_lost.emit(reason)
 
     def close(self):
         """Close SSH connection."""
         with self._state_lock:
-            self._stop_reading = True
             self._connected = False
+        self._dropped = False
+        self._set_status(ConnectionStatus.DISCONNECTED)
+
+        SSHReaderService.get_instance().unregister(self)
+        self._stop_send_worker()
 
+        self._release_transport()
+
+    def _release_transport(self):
+        """Close this handler's channel and drop its share of the transport."""
         if self.channel:
             try:
                 self.channel.close()
@@ -154,13 +389,13 @@ class SSHHandler(ConnectionHandler):
                 pass
             self.channel = None
 
-        if self.client:
-            try:
-                self.client.close()
-            except:
-                pass
-            self.client = None
+        if self._transport_key:
+            self._transport_registry.release(self._transport_key)
+            self._transport_key = None
 
-        # Wait for read thread to finish
-        if self._read_thread and self._read_thread.is_alive():
-            self._read_thread.join(timeout=2)
+    @property
+    def transport(self):
+        """Underlying Paramiko transport, or None when not connected."""
+        if not self._transport_key:
+            return None
+        return self._transport_registry.get_transport(self._transport_key)
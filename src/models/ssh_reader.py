@@ -0,0 +1,202 @@
+"""
+Shared SSH output reader service.
+One selector thread serves every SSHHandler instead of one polling thread per tab.
+"""
+import selectors
+import socket
+import threading
+import time
+from typing import Optional
+from config.constants import AppConstants
+
+
+class _ChannelState:
+    """Per-channel read buffer and batching bookkeeping."""
+
+    __slots__ = ('channel', 'pending', 'recv_size', 'last_flush', 'deadline')
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.pending = bytearray()
+        self.recv_size = AppConstants.SSH_CHANNEL_RECV_SIZE
+        self.last_flush = 0.0
+        self.deadline = None  # Monotonic time of a scheduled flush
+
+
+class SSHReaderService:
+    """
+    Event-driven reader for Paramiko channels.
+
+    Each channel exposes a pollable file descriptor via ``channel.fileno()``
+    which becomes readable when data (or EOF) is buffered. All channels are
+    registered with a single selector, so the thread sleeps in the kernel
+    until output actually arrives and wakes with no added latency.
+
+    Output is coalesced into at most one batch per display frame
+    (SSH_OUTPUT_FRAME_MS) or SSH_OUTPUT_BATCH_MAX_BYTES, whichever comes
+    first. The first chunk after an idle period is delivered immediately,
+    so keystroke echo is never delayed.
+    """
+
+    _instance: Optional['SSHReaderService'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._pending = []  # (action, handler, channel) applied on the reader thread
+        self._handlers = {}  # handler -> _ChannelState
+        self._frame_sec = AppConstants.SSH_OUTPUT_FRAME_MS / 1000.0
+
+        # Self-pipe used to wake the selector when registrations change
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ, None)
+
+        self._thread = threading.Thread(target=self._run, name="ssh-reader", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def get_instance(cls) -> 'SSHReaderService':
+        """Get the process-wide reader service, starting it on first use."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def register(self, handler, channel) -> None:
+        """
+        Start delivering output of a channel to its handler.
+
+        The handler must implement ``_on_channel_data(bytes)`` and
+        ``_on_channel_closed(str)``; both are called on the reader thread.
+
+        Args:
+            handler: Owning SSHHandler
+            channel: Paramiko channel to watch
+        """
+        with self._lock:
+            self._pending.append(('add', handler, channel))
+        self._wakeup()
+
+    def unregister(self, handler) -> None:
+        """
+        Stop delivering output to a handler. Safe to call more than once.
+
+        Args:
+            handler: SSHHandler previously passed to register()
+        """
+        with self._lock:
+            self._pending.append(('remove', handler, None))
+        self._wakeup()
+
+    def _wakeup(self):
+        """Interrupt select() so pending registrations are applied."""
+        try:
+            self._wakeup_send.send(b'\0')
+        except (BlockingIOError, OSError):
+            # Buffer full means a wakeup is already pending
+            pass
+
+    def _apply_pending(self):
+        """Apply queued register/unregister requests (reader thread only)."""
+        try:
+            while self._wakeup_recv.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        for action, handler, channel in pending:
+            if action == 'add':
+                self._drop(handler)
+                try:
+                    self._selector.register(channel.fileno(), selectors.EVENT_READ, handler)
+                    self._handlers[handler] = _ChannelState(channel)
+                except (OSError, ValueError) as e:
+                    handler._on_channel_closed(f"Read error: {str(e)}")
+            else:
+                self._drop(handler)
+
+    def _drop(self, handler):
+        """Remove a handler's channel from the selector if registered."""
+        state = self._handlers.pop(handler, None)
+        if state is None:
+            return
+        try:
+            self._selector.unregister(state.channel.fileno())
+        except (KeyError, OSError, ValueError):
+            pass
+
+    def _next_timeout(self) -> Optional[float]:
+        """Seconds until the earliest scheduled flush, or None to block."""
+        deadlines = [s.deadline for s in self._handlers.values() if s.deadline is not None]
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def _run(self):
+        """Reader thread main loop."""
+        while True:
+            events = self._selector.select(self._next_timeout())
+            for key, _ in events:
+                handler = key.data
+                if handler is None:
+                    self._apply_pending()
+                elif handler in self._handlers:
+                    self._read_channel(handler, self._handlers[handler])
+
+            # Deliver batches whose frame budget has expired
+            now = time.monotonic()
+            for handler, state in list(self._handlers.items()):
+                if state.deadline is not None and state.deadline <= now:
+                    self._flush(handler, state, now)
+
+    def _read_channel(self, handler, state: _ChannelState):
+        """Drain a readable channel into its batch buffer."""
+        channel = state.channel
+        try:
+            while (channel.recv_ready() and
+                   len(state.pending) < AppConstants.SSH_OUTPUT_BATCH_MAX_BYTES):
+                data = channel.recv(state.recv_size)
+                if not data:
+                    break
+                state.pending += data
+                self._adapt_recv_size(state, len(data))
+
+            now = time.monotonic()
+            if channel.closed or (channel.eof_received and not channel.recv_ready()):
+                self._flush(handler, state, now)
+                self._drop(handler)
+                handler._on_channel_closed("Connection closed")
+            elif (len(state.pending) >= AppConstants.SSH_OUTPUT_BATCH_MAX_BYTES or
+                  now - state.last_flush >= self._frame_sec):
+                self._flush(handler, state, now)
+            elif state.pending and state.deadline is None:
+                state.deadline = state.last_flush + self._frame_sec
+        except Exception as e:
+            self._flush(handler, state, time.monotonic())
+            self._drop(handler)
+            handler._on_channel_closed(f"Read error: {str(e)}")
+
+    @staticmethod
+    def _adapt_recv_size(state: _ChannelState, received: int):
+        """Grow the recv size while reads fill the buffer, shrink when idle."""
+        if received >= state.recv_size:
+            state.recv_size = min(state.recv_size * 2, AppConstants.SSH_CHANNEL_RECV_MAX_SIZE)
+        elif received < state.recv_size // 4:
+            state.recv_size = max(state.recv_size // 2, AppConstants.SSH_CHANNEL_RECV_SIZE)
+
+    @staticmethod
+    def _flush(handler, state: _ChannelState, now: float):
+        """Hand the coalesced batch to the handler."""
+        state.deadline = None
+        if not state.pending:
+            return
+        data = bytes(state.pending)
+        state.pending.clear()
+        state.last_flush = now
+        handler._on_channel_data(data)
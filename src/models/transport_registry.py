@@ -0,0 +1,169 @@
+"""
+Shared SSH transport registry.
+Lets several tabs to the same user@host:port multiplex channels over one connection.
+"""
+import hashlib
+import hmac
+import threading
+from typing import Callable, Dict, Optional, Tuple
+import paramiko
+
+
+TransportKey = Tuple[str, int, str]
+
+
+class _TransportEntry:
+    """One authenticated SSH connection and the number of channels using it."""
+
+    def __init__(self):
+        self.client: Optional[paramiko.SSHClient] = None
+        self.refcount = 0
+        self.credentials: bytes = b""  # Digest of the password it authenticated with
+        self.lock = threading.Lock()  # Serializes the handshake for this key
+
+    @property
+    def transport(self) -> Optional[paramiko.Transport]:
+        return self.client.get_transport() if self.client else None
+
+    def is_active(self) -> bool:
+        transport = self.transport
+        return transport is not None and transport.is_active()
+
+
+class TransportRegistry:
+    """
+    Reference-counted pool of Paramiko transports keyed by (host, port, user).
+
+    The first acquire() for a key performs the TCP connect, key exchange and
+    authentication; later acquires reuse the live transport so a new channel
+    costs a single round trip. A transport is only shared with callers that
+    supply the same password it was opened with; any other password is
+    rejected rather than granted a channel. The transport is closed when the
+    last holder releases it.
+    """
+
+    def __init__(self):
+        self._entries: Dict[TransportKey, _TransportEntry] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(host: str, port: int, username: str) -> TransportKey:
+        """Build the registry key for a connection target."""
+        return (host, int(port), username)
+
+    @staticmethod
+    def _digest(password: Optional[str]) -> bytes:
+        """Digest of a password, so it is not kept in memory in clear."""
+        return hashlib.sha256((password or "").encode('utf-8')).digest()
+
+    def acquire(self, host: str, port: int, username: str, password: Optional[str] = None,
+                timeout: int = 10, progress: Optional[Callable[[str], None]] = None) -> paramiko.Transport:
+        """
+        Get a live transport for a target, connecting if necessary.
+        Every successful acquire() must be paired with release().
+
+        Args:
+            host: Server hostname or IP
+            port: SSH port
+            username: Login username
+            password: Login password (must match the shared connection's)
+            timeout: Connection timeout in seconds
+            progress: Optional callback for progress messages
+
+        Returns:
+            Active paramiko.Transport
+
+        Raises:
+            paramiko.AuthenticationException, paramiko.SSHException, OSError
+        """
+        key = self.make_key(host, port, username)
+        credentials = self._digest(password)
+        with self._lock:
+            entry = self._entries.setdefault(key, _TransportEntry())
+            entry.refcount += 1
+
+        try:
+            with entry.lock:
+                if entry.is_active():
+                    if not hmac.compare_digest(entry.credentials, credentials):
+                        raise paramiko.AuthenticationException(
+                            f"Credentials do not match the open connection to {username}@{host}:{port}"
+                        )
+                    if progress:
+                        progress(f"Reusing connection to {host}:{port}...")
+                else:
+                    if entry.client:
+                        entry.client.close()
+                    entry.client = None
+                    if progress:
+                        progress(f"Connecting to {host}:{port}...")
+                    entry.client = self._open_client(host, port, username, password, timeout)
+                    entry.credentials = credentials
+                return entry.transport
+        except Exception:
+            self.release(key)
+            raise
+
+    def release(self, key: TransportKey) -> None:
+        """
+        Drop one reference; closes the transport when none remain.
+
+        Args:
+            key: Key returned by make_key() for the acquired target
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refcount -= 1
+            if entry.refcount > 0:
+                return
+            del self._entries[key]
+
+        if entry.client:
+            try:
+                entry.client.close()
+            except Exception:
+                pass
+
+    def get_transport(self, key: TransportKey) -> Optional[paramiko.Transport]:
+        """Get the live transport for a key, if any."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or not entry.is_active():
+            return None
+        return entry.transport
+
+    def refcount(self, key: TransportKey) -> int:
+        """Number of holders currently sharing a transport."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.refcount if entry else 0
+
+    def close_all(self) -> None:
+        """Close every transport regardless of holders (application shutdown)."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            if entry.client:
+                try:
+                    entry.client.close()
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _open_client(host, port, username, password, timeout) -> paramiko.SSHClient:
+        """Perform the TCP connect, key exchange and authentication."""
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(
+            hostname=host,
+            port=port,
+            username=username,
+            password=password,
+            timeout=timeout,
+            look_for_keys=False,
+            allow_agent=False
+        )
+        return client
@@ -0,0 +1,186 @@
+"""
+Streaming ANSI/VT escape sequence tokenizer.
+Splits terminal output into text runs, control characters and escape
+sequences in a single pass, following the VT500 parser's states.
+"""
+import re
+from typing import List, Tuple
+
+
+# Token kinds. Tokens are tuples whose first item is the kind:
+#   (TEXT, text)
+#   (CTRL, char)                               C0 control other than ESC
+#   (SGR, params)                              CSI ... m, params as a str
+#   (CSI, private, params, intermediates, final)
+#   (OSC, payload)                             ESC ] ... BEL / ST
+#   (ESC, intermediates, final)                other escape sequences
+#   (STRING, kind, payload)                    DCS/SOS/PM/APC strings
+TEXT = 'text'
+CTRL = 'ctrl'
+SGR = 'sgr'
+CSI = 'csi'
+OSC = 'osc'
+ESC = 'esc'
+STRING = 'string'
+
+Token = Tuple
+
+# C0 controls and DEL; everything between two matches is a printable run
+_SPECIAL = re.compile(r'[\x00-\x1f\x7f]')
+
+# Complete sequences, matched at the ESC position
+_CSI_SEQ = re.compile(r'\x1b\[([<=>?]?)([0-9:;]*)([ -/]*)([@-~])')
+_OSC_SEQ = re.compile(r'\x1b\]([^\x07\x1b]*)(?:\x07|\x1b\\)')
+_STRING_SEQ = re.compile(r'\x1b([PX^_])([^\x1b]*)\x1b\\')
+_ESC_SEQ = re.compile(r'\x1b([ -/]*)([0-~])')
+
+# Prefixes that may still become a complete sequence with more input
+_CSI_PARTIAL = re.compile(r'\x1b\[[<=>?]?[0-9:;]*[ -/]*\Z')
+_OSC_PARTIAL = re.compile(r'\x1b\][^\x07\x1b]*\x1b?\Z')
+_STRING_PARTIAL = re.compile(r'\x1b[PX^_][^\x1b]*\x1b?\Z')
+_ESC_PARTIAL = re.compile(r'\x1b[ -/]*\Z')
+
+# Unterminated strings longer than this are dropped instead of held
+MAX_SEQUENCE_LENGTH = 4096
+
+
+class AnsiParser:
+    """
+    Incremental tokenizer for terminal output.
+
+    feed() walks the input once: printable runs are located with a single
+    regex search for the next control character and emitted as one TEXT
+    token, and each ESC is resolved with one anchored match chosen by the
+    character that follows it (CSI, OSC, string or plain escape). A
+    sequence cut off at the end of the input is kept and completed by the
+    next feed(), so callers can pass arbitrary chunks.
+    """
+
+    def __init__(self):
+        self._pending = ''
+
+    def reset(self):
+        """Forget any partial sequence carried over from the last feed()."""
+        self._pending = ''
+
+    def feed(self, data: str) -> List[Token]:
+        """
+        Tokenize a chunk of terminal output.
+
+        Args:
+            data: Decoded terminal output
+
+        Returns:
+            List of tokens (see module constants)
+        """
+        if self._pending:
+            data = self._pending + data
+            self._pending = ''
+        if not data:
+            return []
+
+        tokens = []
+        append = tokens.append
+        search = _SPECIAL.search
+        pos = 0
+        end = len(data)
+
+        while pos < end:
+            match = search(data, pos)
+            if match is None:
+                append((TEXT, data[pos:]))
+                break
+
+            start = match.start()
+            if start > pos:
+                append((TEXT, data[pos:start]))
+
+            char = data[start]
+            if char != '\x1b':
+                append((CTRL, char))
+                pos = start + 1
+                continue
+
+            token, pos = self._parse_escape(data, start)
+            if token is None:
+                if pos < 0:
+                    # Incomplete: wait for the rest of the sequence
+                    if end - start <= MAX_SEQUENCE_LENGTH:
+                        self._pending = data[start:]
+                    break
+                continue
+            append(token)
+
+        return tokens
+
+    @staticmethod
+    def _parse_escape(data: str, start: int):
+        """
+        Resolve the escape sequence starting at data[start] (an ESC).
+
+        Returns:
+            (token, next position); (None, -1) when the sequence is incomplete;
+            (None, start + 1) when it is malformed (the ESC is dropped)
+        """
+        kind = data[start + 1] if start + 1 < len(data) else ''
+
+        if kind == '[':
+            match = _CSI_SEQ.match(data, start)
+            if match:
+                private, params, intermediates, final = match.groups()
+                if final == 'm' and not private and not intermediates:
+                    return (SGR, params), match.end()
+                return (CSI, private, params, intermediates, final), match.end()
+            partial = _CSI_PARTIAL
+        elif kind == ']':
+            match = _OSC_SEQ.match(data, start)
+            if match:
+                return (OSC, match.group(1)), match.end()
+            partial = _OSC_PARTIAL
+        elif kind in ('P', 'X', '^', '_'):
+            match = _STRING_SEQ.match(data, start)
+            if match:
+                return (STRING, match.group(1), match.group(2)), match.end()
+            partial = _STRING_PARTIAL
+        else:
+            match = _ESC_SEQ.match(data, start)
+            if match:
+                return (ESC, match.group(1), match.group(2)), match.end()
+            partial = _ESC_PARTIAL
+
+        if partial.match(data, start):
+            return None, -1
+        return None, start + 1
+
+
+def tokenize(text: str) -> List[Token]:
+    """
+    Tokenize a complete string; a trailing partial sequence is dropped.
+
+    Args:
+        text: Terminal output
+
+    Returns:
+        List of tokens
+    """
+    return AnsiParser().feed(text)
+
+
+def parse_params(params: str, default: int = 0) -> List[int]:
+    """
+    Split CSI parameters into integers.
+    Empty parameters take the default; ':' sub-parameters are split out.
+
+    Args:
+        params: Parameter string, e.g. "1;31" or "38:5:196"
+        default: Value for empty parameters
+
+    Returns:
+        List of integers (at least one element)
+    """
+    if not params:
+        return [default]
+    values = []
+    for part in params.replace(':', ';').split(';'):
+        values.append(int(part) if part.isdigit() else default)
+    return values
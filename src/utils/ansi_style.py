@@ -0,0 +1,242 @@
+"""
+Terminal text styles.
+Interns SGR attribute combinations so each distinct style is built once.
+"""
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+from utils.ansi_parser import parse_params
+
+
+class Style(NamedTuple):
+    """Rendition of a character cell. Colors are '#rrggbb' or None for the default."""
+    fg: Optional[str] = None
+    bg: Optional[str] = None
+    bold: bool = False
+    dim: bool = False
+    italic: bool = False
+    underline: bool = False
+    inverse: bool = False
+    strike: bool = False
+
+
+DEFAULT_STYLE = Style()
+
+# Colors 0-15 (30-37 / 90-97 and 40-47 / 100-107)
+BASIC_COLORS = [
+    '#000000', '#cd0000', '#00cd00', '#cdcd00', '#0000ee', '#cd00cd', '#00cdcd', '#e5e5e5',
+    '#7f7f7f', '#ff0000', '#00ff00', '#ffff00', '#5c5cff', '#ff00ff', '#00ffff', '#ffffff',
+]
+
+
+def _build_palette() -> List[str]:
+    """xterm 256-color palette: 16 basic colors, 6x6x6 cube, 24 grays."""
+    palette = list(BASIC_COLORS)
+    levels = [0, 95, 135, 175, 215, 255]
+    for r in levels:
+        for g in levels:
+            for b in levels:
+                palette.append(f'#{r:02x}{g:02x}{b:02x}')
+    for i in range(24):
+        gray = 8 + 10 * i
+        palette.append(f'#{gray:02x}{gray:02x}{gray:02x}')
+    return palette
+
+
+PALETTE_256 = _build_palette()
+
+
+def apply_sgr(style: Style, params: str) -> Style:
+    """
+    Apply an SGR parameter string to a style (cumulative, like a terminal).
+
+    Args:
+        style: Current style
+        params: Parameters of ESC [ ... m, e.g. "1;38;5;196"
+
+    Returns:
+        New style
+    """
+    values = parse_params(params)
+    changes = style._asdict()
+    i = 0
+    count = len(values)
+    while i < count:
+        num = values[i]
+        if num == 0:
+            changes = DEFAULT_STYLE._asdict()
+        elif num == 1:
+            changes['bold'] = True
+        elif num == 2:
+            changes['dim'] = True
+        elif num == 3:
+            changes['italic'] = True
+        elif num == 4:
+            changes['underline'] = True
+        elif num == 7:
+            changes['inverse'] = True
+        elif num == 9:
+            changes['strike'] = True
+        elif num == 22:
+            changes['bold'] = changes['dim'] = False
+        elif num == 23:
+            changes['italic'] = False
+        elif num == 24:
+            changes['underline'] = False
+        elif num == 27:
+            changes['inverse'] = False
+        elif num == 29:
+            changes['strike'] = False
+        elif 30 <= num <= 37:
+            changes['fg'] = BASIC_COLORS[num - 30]
+        elif 90 <= num <= 97:
+            changes['fg'] = BASIC_COLORS[num - 90 + 8]
+        elif 40 <= num <= 47:
+            changes['bg'] = BASIC_COLORS[num - 40]
+        elif 100 <= num <= 107:
+            changes['bg'] = BASIC_COLORS[num - 100 + 8]
+        elif num == 39:
+            changes['fg'] = None
+        elif num == 49:
+            changes['bg'] = None
+        elif num in (38, 48):
+            color, i = _extended_color(values, i)
+            if color is not None:
+                changes['fg' if num == 38 else 'bg'] = color
+        i += 1
+    return Style(**changes)
+
+
+def _extended_color(values: List[int], i: int):
+    """Parse 38/48 ;5;n or ;2;r;g;b starting at values[i]. Returns (color, last index used)."""
+    if i + 1 < len(values):
+        mode = values[i + 1]
+        if mode == 5 and i + 2 < len(values):
+            index = values[i + 2]
+            return (PALETTE_256[index] if 0 <= index < 256 else None), i + 2
+        if mode == 2 and i + 4 < len(values):
+            r, g, b = (min(255, v) for v in values[i + 2:i + 5])
+            return f'#{r:02x}{g:02x}{b:02x}', i + 4
+    return None, len(values)
+
+
+class StyleTable:
+    """
+    Process-wide intern table mapping Style values to small integer ids.
+
+    Id 0 is the default style. SGR transitions are memoized per
+    (style id, parameter string), so a color seen before costs one dict
+    lookup. Renderers keep per-style artifacts (HTML span tags, text
+    formats) through cached(), which builds each one only once per id.
+    """
+
+    _instance: Optional['StyleTable'] = None
+    _instance_lock = threading.Lock()
+
+    MAX_TRANSITIONS = 4096
+
+    # Colors used when inverse video swaps a default color
+    DEFAULT_FG = '#00ff00'
+    DEFAULT_BG = '#000000'
+
+    def __init__(self):
+        self._styles: List[Style] = [DEFAULT_STYLE]
+        self._ids: Dict[Style, int] = {DEFAULT_STYLE: 0}
+        self._transitions: Dict[tuple, int] = {}
+        self._caches: Dict[str, Dict[int, object]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'StyleTable':
+        """Get the shared table, creating it on first use."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def intern(self, style: Style) -> int:
+        """Get the id for a style, assigning one if it is new."""
+        style_id = self._ids.get(style)
+        if style_id is None:
+            with self._lock:
+                style_id = self._ids.get(style)
+                if style_id is None:
+                    style_id = len(self._styles)
+                    self._styles.append(style)
+                    self._ids[style] = style_id
+        return style_id
+
+    def style(self, style_id: int) -> Style:
+        """Get the style for an id."""
+        return self._styles[style_id]
+
+    def apply_sgr(self, style_id: int, params: str) -> int:
+        """
+        Apply SGR parameters to an interned style.
+
+        Args:
+            style_id: Current style id
+            params: SGR parameter string
+
+        Returns:
+            Id of the resulting style
+        """
+        key = (style_id, params)
+        result = self._transitions.get(key)
+        if result is None:
+            result = self.intern(apply_sgr(self._styles[style_id], params))
+            if len(self._transitions) >= self.MAX_TRANSITIONS:
+                self._transitions.clear()
+            self._transitions[key] = result
+        return result
+
+    def cached(self, style_id: int, kind: str, factory: Callable[[Style], object]):
+        """
+        Get a per-style artifact, building it on first use.
+
+        Args:
+            style_id: Style id
+            kind: Artifact family, e.g. 'span' or 'format'
+            factory: Builds the artifact from a Style
+
+        Returns:
+            Cached artifact
+        """
+        cache = self._caches.setdefault(kind, {})
+        value = cache.get(style_id)
+        if value is None:
+            value = cache[style_id] = factory(self._styles[style_id])
+        return value
+
+    def css(self, style_id: int) -> str:
+        """CSS declarations for a style ('' for the default style)."""
+        return self.cached(style_id, 'css', self._build_css)
+
+    def span_open(self, style_id: int) -> str:
+        """Opening <span> tag for a style ('' for the default style)."""
+        return self.cached(style_id, 'span',
+                           lambda style: f'<span style="{self.css(style_id)}">' if style_id else '')
+
+    @classmethod
+    def colors(cls, style: Style):
+        """Effective (foreground, background) after inverse video; None means default."""
+        if not style.inverse:
+            return style.fg, style.bg
+        return style.bg or cls.DEFAULT_BG, style.fg or cls.DEFAULT_FG
+
+    @classmethod
+    def _build_css(cls, style: Style) -> str:
+        parts = []
+        fg, bg = cls.colors(style)
+        if style.bold:
+            parts.append('font-weight: bold')
+        if style.italic:
+            parts.append('font-style: italic')
+        decorations = [name for flag, name in ((style.underline, 'underline'),
+                                               (style.strike, 'line-through')) if flag]
+        if decorations:
+            parts.append(f"text-decoration: {' '.join(decorations)}")
+        if fg:
+            parts.append(f'color: {fg}')
+        if bg:
+            parts.append(f'background-color: {bg}')
+        return '; '.join(parts)
@@ -0,0 +1,125 @@
+"""
+Compressed cold storage for terminal scrollback.
+Lines trimmed from the live view are kept as zlib-compressed chunks so
+they can still be searched without staying in the document.
+"""
+import re
+import zlib
+from collections import deque
+from typing import Deque, Iterable, Iterator, List, Tuple
+from config.constants import AppConstants
+
+
+class ScrollbackArchive:
+    """
+    Append-only archive of plain-text lines.
+
+    Lines are buffered and compressed chunk_lines at a time. Each line
+    keeps an absolute number (counted from first_line),
+    so search results stay meaningful after old chunks are dropped to
+    respect max_lines.
+    """
+
+    def __init__(self, max_lines: int = 100000, first_line: int = 0,
+                 chunk_lines: int = AppConstants.SCROLLBACK_ARCHIVE_CHUNK_LINES):
+        """
+        Args:
+            max_lines: Lines to retain; whole chunks are dropped beyond this
+            first_line: Number of the first line that will be appended
+            chunk_lines: Lines per compressed chunk
+        """
+        self.max_lines = max_lines
+        self.chunk_lines = chunk_lines
+        self._chunks: Deque[Tuple[int, int, bytes]] = deque()  # (first line, count, data)
+        self._pending: List[str] = []
+        self._next_line = first_line  # Absolute number of the next appended line
+        self._archived = 0   # Lines held in chunks
+
+    def append(self, lines: Iterable[str]):
+        """Archive lines, oldest first."""
+        lines = list(lines)
+        self._pending.extend(lines)
+        self._next_line += len(lines)
+        while len(self._pending) >= self.chunk_lines:
+            self._flush(self.chunk_lines)
+
+    def _flush(self, count: int):
+        lines, self._pending = self._pending[:count], self._pending[count:]
+        first = self._next_line - len(self._pending) - len(lines)
+        data = zlib.compress('\n'.join(lines).encode('utf-8'))
+        self._chunks.append((first, len(lines), data))
+        self._archived += len(lines)
+        while self._chunks and self._archived + len(self._pending) > self.max_lines:
+            _, dropped, _ = self._chunks.popleft()
+            self._archived -= dropped
+
+    def __len__(self) -> int:
+        return self._archived + len(self._pending)
+
+    @property
+    def next_line(self) -> int:
+        """Absolute number the next appended line will get."""
+        return self._next_line
+
+    @property
+    def compressed_size(self) -> int:
+        """Bytes held in compressed chunks."""
+        return sum(len(data) for _, _, data in self._chunks)
+
+    def clear(self):
+        """Drop all archived lines (numbering continues)."""
+        self._chunks.clear()
+        self._pending = []
+        self._archived = 0
+
+    def iter_lines(self) -> Iterator[Tuple[int, str]]:
+        """Yield (line number, text) oldest first, decompressing one chunk at a time."""
+        for first, _, data in list(self._chunks):
+            for offset, line in enumerate(zlib.decompress(data).decode('utf-8').split('\n')):
+                yield first + offset, line
+        first = self._next_line - len(self._pending)
+        for offset, line in enumerate(list(self._pending)):
+            yield first + offset, line
+
+    def search(self, pattern: str, regex: bool = False, ignore_case: bool = True,
+               limit: int = 500) -> List[Tuple[int, str]]:
+        """
+        Find archived lines matching a pattern.
+
+        Args:
+            pattern: Text or regular expression
+            regex: Treat pattern as a regular expression
+            ignore_case: Case-insensitive match
+            limit: Maximum number of results (oldest first)
+
+        Returns:
+            List of (line number, line text)
+        """
+        matcher = compile_pattern(pattern, regex, ignore_case)
+        results = []
+        for number, line in self.iter_lines():
+            if matcher(line):
+                results.append((number, line))
+                if len(results) >= limit:
+                    break
+        return results
+
+
+def compile_pattern(pattern: str, regex: bool = False, ignore_case: bool = True):
+    """
+    Build a line predicate for search.
+
+    Args:
+        pattern: Text or regular expression
+        regex: Treat pattern as a regular expression
+        ignore_case: Case-insensitive match
+
+    Returns:
+        Callable taking a line and returning a truthy value on match
+    """
+    if regex:
+        return re.compile(pattern, re.IGNORECASE if ignore_case else 0).search
+    if ignore_case:
+        needle = pattern.casefold()
+        return lambda line: needle in line.casefold()
+    return lambda line: pattern in line
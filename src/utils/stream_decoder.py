@@ -0,0 +1,105 @@
+"""
+Incremental decoder for the raw SSH byte stream.
+Keeps multibyte characters and escape sequences intact across chunk boundaries.
+"""
+import codecs
+import re
+
+
+class TerminalStreamDecoder:
+    """
+    Stateful bytes -> str stage that sits between the channel and the GUI.
+
+    - Incomplete UTF-8 sequences at the end of a chunk are kept by the
+      incremental codec until the rest of the character arrives.
+    - A trailing escape sequence that is not finished yet is held back
+      and prepended to the next chunk, so consumers never see half of it.
+
+    Only the last few hundred characters of each chunk are inspected,
+    so the cost is independent of how much output has been received.
+    """
+
+    # Escape sequences longer than this are passed through rather than held
+    MAX_HOLD_CHARS = 512
+
+    # Complete escape sequences anchored at an ESC character
+    _COMPLETE_PATTERN = re.compile(
+        r'\x1b(?:'
+        r'\[[0-?]*[ -/]*[@-~]'                   # CSI
+        r'|[\]P_^X][^\x07\x1b]*(?:\x07|\x1b\\)'  # OSC / DCS / APC / PM / SOS
+        r'|[ -/]*[0-OQ-WYZ\\`-~]'                # Two-character escapes
+        r')'
+    )
+
+    # Escape sequences that are still being received
+    _PARTIAL_PATTERN = re.compile(
+        r'\x1b(?:'
+        r'\[[0-?]*[ -/]*'
+        r'|[\]P_^X][^\x07\x1b]*\x1b?'
+        r'|[ -/]*'
+        r')\Z'
+    )
+
+    def __init__(self, encoding: str = 'utf-8'):
+        """
+        Initialize decoder.
+
+        Args:
+            encoding: Character encoding of the remote stream
+        """
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._held = ''
+
+    def decode(self, data: bytes, final: bool = False) -> str:
+        """
+        Decode the next chunk of the stream.
+
+        Args:
+            data: Raw bytes received from the channel
+            final: True at end of stream to release everything held back
+
+        Returns:
+            Text that is safe to render; may be empty
+        """
+        text = self._held + self._decoder.decode(data, final)
+        self._held = ''
+
+        if final or not text:
+            return text
+
+        split = self._incomplete_start(text)
+        if split is not None:
+            self._held = text[split:]
+            text = text[:split]
+        return text
+
+    def reset(self):
+        """Discard all held state (e.g. on reconnect)."""
+        self._decoder.reset()
+        self._held = ''
+
+    def _incomplete_start(self, text: str):
+        """
+        Find where an unfinished escape sequence starts at the end of text.
+
+        Returns:
+            Index to split at, or None if the text ends cleanly
+        """
+        window_start = max(0, len(text) - self.MAX_HOLD_CHARS)
+        last = text.rfind('\x1b', window_start)
+        if last < 0:
+            return None
+
+        # A lone trailing ESC may be the first half of the ST that closes
+        # an OSC/DCS string started earlier; hold the whole string then.
+        if last == len(text) - 1:
+            previous = text.rfind('\x1b', window_start, last)
+            if previous >= 0 and self._PARTIAL_PATTERN.match(text, previous):
+                return previous
+            return last
+
+        if self._COMPLETE_PATTERN.match(text, last):
+            return None
+        if self._PARTIAL_PATTERN.match(text, last):
+            return last
+        return None
@@ -0,0 +1,679 @@
+"""
+Virtual VT100/xterm screen model.
+Keeps a grid of character cells so cursor addressing, erasing and scrolling
+update the screen in place instead of appending to the scrollback.
+"""
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import groupby
+from typing import Dict, List, Optional, Tuple
+from utils.ansi_parser import AnsiParser, parse_params, TEXT, CTRL, SGR, CSI, OSC, ESC
+from utils.ansi_style import Style, StyleTable
+
+# A row is rendered as runs of text sharing one style id
+Run = Tuple[str, int]
+
+# DEC special graphics (ESC ( 0): line drawing used by ncurses apps
+DEC_GRAPHICS = str.maketrans({
+    '`': '◆', 'a': '▒', 'f': '°', 'g': '±', 'j': '┘', 'k': '┐', 'l': '┌', 'm': '└',
+    'n': '┼', 'o': '⎺', 'p': '⎻', 'q': '─', 'r': '⎼', 's': '⎽', 't': '├', 'u': '┤',
+    'v': '┴', 'w': '┬', 'x': '│', 'y': '≤', 'z': '≥', '{': 'π', '|': '≠', '}': '£', '~': '·',
+})
+
+
+@lru_cache(maxsize=4096)
+def char_width(char: str) -> int:
+    """Number of cells a character occupies (0 for combining marks)."""
+    if unicodedata.combining(char) or unicodedata.category(char) in ('Mn', 'Me', 'Cf'):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+
+
+@dataclass
+class ScreenUpdate:
+    """
+    Changes since the last TerminalScreen.take_update().
+
+    Attributes:
+        scrolled: Lines that scrolled off the top of the main screen, oldest first
+        rows: Changed visible rows by index (all rows below row_count when full)
+        row_count: Rows in use; rows at or beyond it are blank and not shown
+        cursor: (x, y) cursor position
+        cursor_visible: False while the application hides the cursor (DECTCEM)
+        full: True when every visible row is included (resize, screen switch)
+    """
+    scrolled: List[List[Run]] = field(default_factory=list)
+    rows: Dict[int, List[Run]] = field(default_factory=dict)
+    row_count: int = 1
+    cursor: Tuple[int, int] = (0, 0)
+    cursor_visible: bool = True
+    full: bool = False
+
+    def merge(self, later: 'ScreenUpdate') -> 'ScreenUpdate':
+        """
+        Combine with a later update so both can be applied at once.
+        Scrolling marks every row of the scroll region dirty, so rows from
+        the later update always win over rows from this one.
+        """
+        rows = dict(self.rows)
+        rows.update(later.rows)
+        return ScreenUpdate(
+            scrolled=self.scrolled + later.scrolled,
+            rows=rows,
+            row_count=later.row_count,
+            cursor=later.cursor,
+            cursor_visible=later.cursor_visible,
+            full=self.full or later.full,
+        )
+
+    @property
+    def empty(self) -> bool:
+        return not (self.scrolled or self.rows or self.full)
+
+
+class _Line:
+    """One screen row: parallel lists of characters and style ids."""
+
+    __slots__ = ('chars', 'styles')
+
+    def __init__(self, cols: int, style_id: int = 0):
+        self.chars = [' '] * cols
+        self.styles = [style_id] * cols
+
+    def resize(self, cols: int):
+        extra = cols - len(self.chars)
+        if extra > 0:
+            self.chars.extend([' '] * extra)
+            self.styles.extend([0] * extra)
+        elif extra < 0:
+            del self.chars[cols:]
+            del self.styles[cols:]
+            if self.chars and self.chars[-1] == '' and cols > 1:
+                self.chars[-1] = ' '
+
+    def is_blank(self) -> bool:
+        return not any(self.styles) and ''.join(self.chars).isspace()
+
+    def runs(self) -> List[Run]:
+        """Text runs with trailing default-style blanks trimmed."""
+        chars, styles = self.chars, self.styles
+        text = ''.join(chars)
+        # Trailing blanks are plain ' ' cells ('' only follows a wide char)
+        end = len(chars) - (len(text) - len(text.rstrip(' ')))
+        if any(styles[end:]):
+            end = len(styles)
+            while not styles[end - 1]:
+                end -= 1
+        if not end:
+            return []
+        if end == len(chars) and len(text) == end and styles.count(styles[0]) == end:
+            return [(text, styles[0])]
+
+        runs = []
+        start = 0
+        for style_id, group in groupby(styles[:end]):
+            stop = start + len(list(group))
+            runs.append((''.join(chars[start:stop]), style_id))
+            start = stop
+        return runs
+
+
+class TerminalScreen:
+    """
+    Screen buffer driven by the ANSI tokenizer.
+
+    Implements the subset of VT100/xterm that shells and full-screen tools
+    rely on: cursor movement, erase in display/line, insert/delete of
+    characters and lines, scroll regions (DECSTBM), autowrap, the
+    alternate screen (1049/1047/47), DEC line drawing and wide characters.
+
+    Damaged rows are tracked; take_update() returns only those, plus the
+    lines that scrolled off the top of the main screen, which belong in
+    the scrollback. The model itself holds exactly one screen of cells
+    (two while the alternate screen is active).
+    """
+
+    TAB_WIDTH = 8
+
+    def __init__(self, cols: int = 80, rows: int = 24, style_table: Optional[StyleTable] = None):
+        self.cols = max(1, cols)
+        self.rows = max(1, rows)
+        self._styles = style_table or StyleTable.get_instance()
+        self._parser = AnsiParser()
+        self.title = ''
+        self.reset()
+
+    # ---------- State ----------
+
+    def reset(self, keep_rows: bool = False):
+        """
+        Full reset (RIS): blank main screen, default modes, cursor home.
+        Lines already scrolled out but not yet taken are kept.
+
+        Args:
+            keep_rows: Also move the main screen's rows in use to the
+                       scrollback (a new session starting below the old one)
+        """
+        scrolled = getattr(self, '_scrolled', [])
+        if keep_rows:
+            count = len(self._main)
+            while count and self._main[count - 1].is_blank():
+                count -= 1
+            if not self.using_alt:
+                count = max(count, self.y + 1)
+            scrolled.extend(line.runs() for line in self._main[:count])
+        self._parser.reset()
+        self._main = [_Line(self.cols) for _ in range(self.rows)]
+        self.lines = self._main
+        self.using_alt = False
+        self.x = self.y = 0
+        self.style_id = 0
+        self.top, self.bottom = 0, self.rows - 1
+        self.autowrap = True
+        self.insert_mode = False
+        self.cursor_visible = True
+        self._wrap_pending = False
+        self._graphics = False
+        self._last_char = ' '
+        self._saved = {False: None, True: None}  # per screen: main / alternate
+        self._dirty = set()
+        self._all_dirty = True
+        self._scrolled: List[List[Run]] = scrolled
+
+    def resize(self, cols: int, rows: int):
+        """
+        Change the screen size. Lines are truncated or padded, not reflowed.
+        When the main screen loses rows above the cursor they go to the
+        scrollback.
+        """
+        cols, rows = max(1, cols), max(1, rows)
+        if (cols, rows) == (self.cols, self.rows):
+            return
+
+        screens = [self._main] if self.lines is self._main else [self._main, self.lines]
+        for screen in screens:
+            for line in screen:
+                line.resize(cols)
+        if rows < self.rows:
+            # Keep the cursor row visible: drop lines from the top first
+            shift = max(0, self.y - (rows - 1))
+            for screen in screens:
+                removed = screen[:shift]
+                del screen[:shift]
+                del screen[rows:]
+                if screen is self._main and shift:
+                    self._scrolled.extend(line.runs() for line in removed)
+            self.y -= shift
+        else:
+            for screen in screens:
+                screen.extend(_Line(cols) for _ in range(rows - len(screen)))
+
+        self.cols, self.rows = cols, rows
+        self.top, self.bottom = 0, rows - 1
+        self.x = min(self.x, cols - 1)
+        self.y = min(self.y, rows - 1)
+        self._wrap_pending = False
+        self._all_dirty = True
+
+    def take_update(self) -> ScreenUpdate:
+        """Collect damage since the last call and reset it."""
+        row_count = self.row_count()
+        if self._all_dirty:
+            rows = {y: self.lines[y].runs() for y in range(row_count)}
+        else:
+            rows = {y: self.lines[y].runs() for y in sorted(self._dirty) if y < row_count}
+        update = ScreenUpdate(
+            scrolled=self._scrolled,
+            rows=rows,
+            row_count=row_count,
+            cursor=(self.x, self.y),
+            cursor_visible=self.cursor_visible,
+            full=self._all_dirty,
+        )
+        self._scrolled = []
+        self._dirty = set()
+        self._all_dirty = False
+        return update
+
+    @property
+    def scrolled_count(self) -> int:
+        """Lines scrolled into the scrollback since the last take_update()."""
+        return len(self._scrolled)
+
+    def take_scrolled(self, count: int) -> List[List[Run]]:
+        """Remove and return the oldest pending scrolled lines."""
+        lines = self._scrolled[:count]
+        del self._scrolled[:count]
+        return lines
+
+    def invalidate(self):
+        """Report every row in the next update (e.g. for a new renderer)."""
+        self._all_dirty = True
+
+    def row_count(self) -> int:
+        """Rows in use: through the cursor and the last non-blank row."""
+        if self.using_alt:
+            return self.rows
+        last = self.rows - 1
+        while last > self.y and self.lines[last].is_blank():
+            last -= 1
+        return last + 1
+
+    def text(self) -> List[str]:
+        """Visible rows as plain text (for tests and debugging)."""
+        return [''.join(line.chars).rstrip() for line in self.lines]
+
+    # ---------- Input ----------
+
+    def feed(self, data: str, plain: Optional[List[str]] = None):
+        """
+        Apply a chunk of terminal output.
+
+        Args:
+            data: Decoded output; escape sequences may be split across calls
+            plain: If given, the plain-text projection (text and control
+                characters, as strip_ansi would return) is appended to it
+                from the same parse
+        """
+        for token in self._parser.feed(data):
+            kind = token[0]
+            if kind == TEXT:
+                self._print(token[1])
+                if plain is not None:
+                    plain.append(token[1])
+            elif kind == SGR:
+                self.style_id = self._styles.apply_sgr(self.style_id, token[1])
+            elif kind == CTRL:
+                self._control(token[1])
+                if plain is not None:
+                    plain.append(token[1])
+            elif kind == CSI:
+                self._csi(token[1], token[2], token[3], token[4])
+            elif kind == ESC:
+                self._esc(token[1], token[2])
+            elif kind == OSC:
+                code, _, value = token[1].partition(';')
+                if code in ('0', '2'):
+                    self.title = value
+
+    def _print(self, text: str):
+        if self._graphics:
+            text = text.translate(DEC_GRAPHICS)
+        self._last_char = text[-1]
+        if text.isascii():
+            self._print_narrow(text)
+        else:
+            for char in text:
+                self._print_char(char)
+
+    def _print_narrow(self, text: str):
+        """Fast path for text where every character is one cell wide."""
+        cols = self.cols
+        style_id = self.style_id
+        pos, end = 0, len(text)
+        while pos < end:
+            if self._wrap_pending:
+                self._wrap()
+            line = self.lines[self.y]
+            x = self.x
+            count = min(cols - x, end - pos)
+            chunk = text[pos:pos + count]
+            if self.insert_mode:
+                line.chars[x:x] = chunk
+                line.styles[x:x] = [style_id] * count
+                del line.chars[cols:]
+                del line.styles[cols:]
+            else:
+                if x and line.chars[x] == '':
+                    line.chars[x - 1] = ' '  # Overwrote the right half of a wide char
+                line.chars[x:x + count] = chunk
+                line.styles[x:x + count] = [style_id] * count
+                if x + count < cols and line.chars[x + count] == '':
+                    line.chars[x + count] = ' '
+            self._dirty.add(self.y)
+            pos += count
+            x += count
+            if x >= cols:
+                self.x = cols - 1
+                if self.autowrap:
+                    self._wrap_pending = True
+                elif pos < end:
+                    # No autowrap: the rest overwrites the last column
+                    line.chars[cols - 1] = text[end - 1]
+                    line.styles[cols - 1] = style_id
+                    break
+            else:
+                self.x = x
+
+    def _print_char(self, char: str):
+        width = char_width(char)
+        if width == 0:
+            # Combining mark: attach to the previous cell
+            x = self.x if self._wrap_pending else self.x - 1
+            line = self.lines[self.y]
+            while x > 0 and line.chars[x] == '':
+                x -= 1
+            if x >= 0:
+                line.chars[x] += char
+                self._dirty.add(self.y)
+            return
+
+        if self._wrap_pending:
+            self._wrap()
+        if width == 2 and self.x == self.cols - 1:
+            if self.autowrap and self.cols > 1:
+                line = self.lines[self.y]
+                line.chars[self.x] = ' '
+                self._wrap()
+            else:
+                width = 1
+
+        line = self.lines[self.y]
+        x = self.x
+        if self.insert_mode:
+            line.chars[x:x] = [''] * width
+            line.styles[x:x] = [self.style_id] * width
+            del line.chars[self.cols:]
+            del line.styles[self.cols:]
+        if x and line.chars[x] == '':
+            line.chars[x - 1] = ' '
+        line.chars[x] = char
+        line.styles[x] = self.style_id
+        if width == 2:
+            line.chars[x + 1] = ''
+            line.styles[x + 1] = self.style_id
+        if x + width < self.cols and line.chars[x + width] == '':
+            line.chars[x + width] = ' '
+        self._dirty.add(self.y)
+
+        x += width
+        if x >= self.cols:
+            self.x = self.cols - 1
+            self._wrap_pending = self.autowrap
+        else:
+            self.x = x
+
+    def _control(self, char: str):
+        if char == '\r':
+            self.x = 0
+            self._wrap_pending = False
+        elif char in '\n\x0b\x0c':
+            self._index()
+        elif char == '\b':
+            self._wrap_pending = False
+            self.x = max(0, self.x - 1)
+        elif char == '\t':
+            self._wrap_pending = False
+            self.x = min(self.cols - 1, (self.x // self.TAB_WIDTH + 1) * self.TAB_WIDTH)
+        elif char == '\x0e':
+            self._graphics = True   # SO: shift to G1 (line drawing in practice)
+        elif char == '\x0f':
+            self._graphics = False  # SI: back to G0
+
+    def _esc(self, intermediates: str, final: str):
+        if intermediates == '(':
+            self._graphics = final == '0'
+        elif intermediates:
+            return
+        elif final == 'D':
+            self._index()
+        elif final == 'E':
+            self.x = 0
+            self._index()
+        elif final == 'M':
+            self._reverse_index()
+        elif final == '7':
+            self._save_cursor()
+        elif final == '8':
+            self._restore_cursor()
+        elif final == 'c':
+            self.reset()
+
+    def _csi(self, private: str, params: str, intermediates: str, final: str):
+        if intermediates:
+            return
+        if private == '?':
+            if final in 'hl':
+                for mode in parse_params(params):
+                    self._set_private_mode(mode, final == 'h')
+            return
+        if private:
+            return
+
+        if final in 'hl':
+            if 4 in parse_params(params):
+                self.insert_mode = final == 'h'
+            return
+
+        if final == 'r':
+            values = parse_params(params)
+            top = (values[0] or 1) - 1
+            bottom = (values[1] if len(values) > 1 and values[1] else self.rows) - 1
+            if 0 <= top < bottom < self.rows:
+                self.top, self.bottom = top, bottom
+                self._move_to(0, 0)
+            return
+        if final == 's':
+            self._save_cursor()
+            return
+        if final == 'u':
+            self._restore_cursor()
+            return
+        # Counts and positions default to 1 (0 also means 1); erase modes to 0
+        values = parse_params(params, 0)
+        n = values[0] if final in 'JK' else (values[0] or 1)
+
+        if final in 'Hf':
+            col = values[1] if len(values) > 1 and values[1] else 1
+            self._move_to(col - 1, n - 1)
+        elif final == 'A':
+            self._move_to(self.x, max(self.top if self.y >= self.top else 0, self.y - n))
+        elif final == 'B':
+            self._move_to(self.x, min(self.bottom if self.y <= self.bottom else self.rows - 1, self.y + n))
+        elif final == 'C':
+            self._move_to(self.x + n, self.y)
+        elif final == 'D':
+            self._move_to(self.x - n, self.y)
+        elif final == 'E':
+            self._move_to(0, self.y + n)
+        elif final == 'F':
+            self._move_to(0, self.y - n)
+        elif final in 'G`':
+            self._move_to(n - 1, self.y)
+        elif final == 'd':
+            self._move_to(self.x, n - 1)
+        elif final == 'J':
+            self._erase_display(n)
+        elif final == 'K':
+            self._erase_line(n)
+        elif final == '@':
+            self._insert_chars(n)
+        elif final == 'P':
+            self._delete_chars(n)
+        elif final == 'X':
+            self._erase_chars(n)
+        elif final == 'L':
+            self._insert_lines(n)
+        elif final == 'M':
+            self._delete_lines(n)
+        elif final == 'S':
+            self._scroll_up(n, keep=False)
+        elif final == 'T':
+            self._scroll_down(n)
+        elif final == 'b':
+            self._print(self._last_char * min(n, self.cols * self.rows))
+
+    def _set_private_mode(self, mode: int, enable: bool):
+        if mode in (1049, 1047, 47):
+            if mode == 1049 and enable:
+                self._save_cursor()
+            self._switch_screen(enable)
+            if mode == 1049 and not enable:
+                self._restore_cursor()
+        elif mode == 1048:
+            self._save_cursor() if enable else self._restore_cursor()
+        elif mode == 7:
+            self.autowrap = enable
+        elif mode == 25:
+            self.cursor_visible = enable
+
+    # ---------- Operations ----------
+
+    def _blank_style(self) -> int:
+        """Erased cells keep the current background color (BCE)."""
+        if not self.style_id:
+            return 0
+        bg = self._styles.style(self.style_id).bg
+        return self._styles.intern(Style(bg=bg)) if bg else 0
+
+    def _blank_line(self) -> _Line:
+        return _Line(self.cols, self._blank_style())
+
+    def _move_to(self, x: int, y: int):
+        self.x = min(max(0, x), self.cols - 1)
+        self.y = min(max(0, y), self.rows - 1)
+        self._wrap_pending = False
+
+    def _wrap(self):
+        self._wrap_pending = False
+        self.x = 0
+        self._index()
+
+    def _index(self):
+        """Move down one line, scrolling at the bottom margin."""
+        self._wrap_pending = False
+        if self.y == self.bottom:
+            self._scroll_up(1)
+        elif self.y < self.rows - 1:
+            self.y += 1
+
+    def _reverse_index(self):
+        self._wrap_pending = False
+        if self.y == self.top:
+            self._scroll_down(1)
+        elif self.y > 0:
+            self.y -= 1
+
+    def _mark_region(self, first: int, last: int):
+        if first == 0 and last == self.rows - 1:
+            self._all_dirty = True
+        else:
+            self._dirty.update(range(first, last + 1))
+
+    def _scroll_up(self, n: int, keep: bool = True):
+        """Scroll the region up; lines leaving the top of the main screen are kept."""
+        top, bottom = self.top, self.bottom
+        n = min(n, bottom - top + 1)
+        removed = self.lines[top:top + n]
+        if keep and top == 0 and not self.using_alt:
+            self._scrolled.extend(line.runs() for line in removed)
+        del self.lines[top:top + n]
+        self.lines[bottom - n + 1:bottom - n + 1] = [self._blank_line() for _ in range(n)]
+        self._mark_region(top, bottom)
+
+    def _scroll_down(self, n: int):
+        top, bottom = self.top, self.bottom
+        n = min(n, bottom - top + 1)
+        del self.lines[bottom - n + 1:bottom + 1]
+        self.lines[top:top] = [self._blank_line() for _ in range(n)]
+        self._mark_region(top, bottom)
+
+    def _erase_cells(self, line: _Line, start: int, end: int):
+        style_id = self._blank_style()
+        if start and line.chars[start] == '':
+            line.chars[start - 1] = ' '
+        if end < self.cols and line.chars[end] == '':
+            line.chars[end] = ' '
+        line.chars[start:end] = [' '] * (end - start)
+        line.styles[start:end] = [style_id] * (end - start)
+
+    def _erase_display(self, mode: int):
+        if mode == 0:
+            self._erase_line(0)
+            for y in range(self.y + 1, self.rows):
+                self.lines[y] = self._blank_line()
+            self._mark_region(self.y, self.rows - 1)
+        elif mode == 1:
+            self._erase_line(1)
+            for y in range(self.y):
+                self.lines[y] = self._blank_line()
+            self._mark_region(0, self.y)
+        elif mode == 2:
+            for y in range(self.rows):
+                self.lines[y] = self._blank_line()
+            self._all_dirty = True
+        # Mode 3 (erase scrollback) is ignored: history stays in the view
+
+    def _erase_line(self, mode: int):
+        line = self.lines[self.y]
+        if mode == 0:
+            self._erase_cells(line, self.x, self.cols)
+        elif mode == 1:
+            self._erase_cells(line, 0, self.x + 1)
+        elif mode == 2:
+            self._erase_cells(line, 0, self.cols)
+        self._dirty.add(self.y)
+
+    def _insert_chars(self, n: int):
+        line = self.lines[self.y]
+        n = min(n, self.cols - self.x)
+        line.chars[self.x:self.x] = [' '] * n
+        line.styles[self.x:self.x] = [self._blank_style()] * n
+        del line.chars[self.cols:]
+        del line.styles[self.cols:]
+        self._dirty.add(self.y)
+
+    def _delete_chars(self, n: int):
+        line = self.lines[self.y]
+        n = min(n, self.cols - self.x)
+        del line.chars[self.x:self.x + n]
+        del line.styles[self.x:self.x + n]
+        line.chars.extend([' '] * n)
+        line.styles.extend([self._blank_style()] * n)
+        self._dirty.add(self.y)
+
+    def _erase_chars(self, n: int):
+        self._erase_cells(self.lines[self.y], self.x, min(self.cols, self.x + n))
+        self._dirty.add(self.y)
+
+    def _insert_lines(self, n: int):
+        if not self.top <= self.y <= self.bottom:
+            return
+        n = min(n, self.bottom - self.y + 1)
+        del self.lines[self.bottom - n + 1:self.bottom + 1]
+        self.lines[self.y:self.y] = [self._blank_line() for _ in range(n)]
+        self._mark_region(self.y, self.bottom)
+        self.x = 0
+
+    def _delete_lines(self, n: int):
+        if not self.top <= self.y <= self.bottom:
+            return
+        n = min(n, self.bottom - self.y + 1)
+        del self.lines[self.y:self.y + n]
+        self.lines[self.bottom - n + 1:self.bottom - n + 1] = [self._blank_line() for _ in range(n)]
+        self._mark_region(self.y, self.bottom)
+        self.x = 0
+
+    def _save_cursor(self):
+        self._saved[self.using_alt] = (self.x, self.y, self.style_id, self._graphics, self.autowrap)
+
+    def _restore_cursor(self):
+        saved = self._saved[self.using_alt]
+        if saved is None:
+            self._move_to(0, 0)
+            return
+        x, y, self.style_id, self._graphics, self.autowrap = saved
+        self._move_to(x, y)
+
+    def _switch_screen(self, alternate: bool):
+        if alternate == self.using_alt:
+            return
+        if alternate:
+            self.lines = [_Line(self.cols) for _ in range(self.rows)]
+        else:
+            self.lines = self._main
+        self.using_alt = alternate
+        self.top, self.bottom = 0, self.rows - 1
+        self._wrap_pending = False
+        self._all_dirty = True
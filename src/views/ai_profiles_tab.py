@@ -9,11 +9,13 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QLineEdit, QLabel,
                              QHeaderView, QMessageBox, QDialog,
                              QFormLayout, QDialogButtonBox, QCheckBox, QComboBox,
-                             QProgressDialog)
+                             QProgressDialog, QSpinBox)
 from PyQt6.QtCore import Qt, pyqtSignal
 from typing import List, Optional
 from models.ai_profile import AIProfile
 from managers.ai_profile_manager import AIProfileManager
+from config.config_manager import ConfigManager
+from config.constants import AppConstants
 
 
 class AIProfileDialog(QDialog):
@@ -28,19 +30,23 @@ class AIProfileDialog(QDialog):
         "自定义": None,
         "OpenAI GPT-4": {
             "api_base": "https://api.openai.com/v1",
-            "model": "gpt-4-turbo"
+            "model": "gpt-4-turbo",
+            "context_tokens": 128000
         },
         "OpenAI GPT-3.5": {
             "api_base": "https://api.openai.com/v1",
-            "model": "gpt-3.5-turbo"
+            "model": "gpt-3.5-turbo",
+            "context_tokens": 16385
         },
         "DeepSeek": {
             "api_base": "https://api.deepseek.com",
-            "model": "deepseek-chat"
+            "model": "deepseek-chat",
+            "context_tokens": 64000
         },
         "Claude (via OpenAI)": {
             "api_base": "https://api.anthropic.com/v1",
-            "model": "claude-3-5-sonnet-20241022"
+            "model": "claude-3-5-sonnet-20241022",
+            "context_tokens": 200000
         }
     }
 
@@ -92,6 +98,14 @@ class AIProfileDialog(QDialog):
         self.model_input.setPlaceholderText("gpt-4-turbo")
         layout.addRow("模型:", self.model_input)
 
+        # 上下文窗口 (请求的 token 预算)
+        self.context_tokens_spin = QSpinBox()
+        self.context_tokens_spin.setRange(1024, 2000000)
+        self.context_tokens_spin.setSingleStep(1024)
+        self.context_tokens_spin.setValue(AIProfile.context_tokens)
+        self.context_tokens_spin.setSuffix(" tokens")
+        layout.addRow("上下文窗口:", self.context_tokens_spin)
+
         # 设为默认
         self.default_check = QCheckBox("设为默认配置")
         layout.addRow("", self.default_check)
@@ -131,6 +145,7 @@ class AIProfileDialog(QDialog):
         if preset_data:
             self.api_base_input.setText(preset_data["api_base"])
             self.model_input.setText(preset_data["model"])
+            self.context_tokens_spin.setValue(preset_data["context_tokens"])
 
     def _load_profile(self):
         """加载现有配置数据"""
@@ -139,6 +154,7 @@ class AIProfileDialog(QDialog):
             self.api_key_input.setText(self.profile.api_key)
             self.api_base_input.setText(self.profile.api_base)
             self.model_input.setText(self.profile.model)
+            self.context_tokens_spin.setValue(self.profile.context_tokens)
             self.default_check.setChecked(self.profile.is_default)
             if self.profile.description:
                 self.description_input.setText(self.profile.description)
@@ -160,6 +176,17 @@ class AIProfileDialog(QDialog):
             QMessageBox.warning(self, "验证错误", "配置名称和 API Key 为必填项")
             return None
 
+        # 上下文窗口必须能容纳回复 (max_tokens) 和请求本身
+        max_tokens = ConfigManager.get_instance().settings.ai.max_tokens
+        required = max_tokens + AppConstants.AI_TOKEN_SAFETY_MARGIN + AppConstants.AI_MIN_PROMPT_TOKENS
+        if self.context_tokens_spin.value() < required:
+            QMessageBox.warning(
+                self, "验证错误",
+                f"上下文窗口至少需要 {required} tokens：最大 Tokens ({max_tokens}) "
+                f"加上请求所需空间 ({AppConstants.AI_TOKEN_SAFETY_MARGIN + AppConstants.AI_MIN_PROMPT_TOKENS})"
+            )
+            return None
+
         # 如果是编辑模式，保留 created_at
         created_at = self.profile.created_at if self.profile else None
 
@@ -170,6 +197,7 @@ class AIProfileDialog(QDialog):
             model=self.model_input.text().strip() or "gpt-4-turbo",
             is_default=self.default_check.isChecked(),
             description=self.description_input.text().strip(),
+            context_tokens=self.context_tokens_spin.value(),
             created_at=created_at
         )
 
@@ -0,0 +1,291 @@
+"""
+Broadcast dialog.
+Runs one command on a group of saved hosts and compares their output.
+"""
+from typing import Dict, List
+from PyQt6.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
+                             QLineEdit, QComboBox, QListWidget, QListWidgetItem,
+                             QSpinBox, QPushButton, QTableWidget, QTableWidgetItem,
+                             QHeaderView, QPlainTextEdit, QSplitter, QLabel,
+                             QAbstractItemView, QMessageBox)
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QFont, QColor
+from models.connection_profile import ConnectionProfile
+from models.exec_channel import ExecResult
+from managers.broadcast_runner import (BroadcastRunner, group_outputs, diff_outputs,
+                                       result_text, target_labels)
+from managers.profile_manager import ProfileManager
+from config.constants import AppConstants
+
+
+class BroadcastDialog(QDialog):
+    """
+    Select saved hosts by group or tag, run a command on all of them
+    concurrently and review the results per host, grouped by identical
+    output, or as a diff against a baseline host.
+    """
+
+    VIEW_OUTPUT = "输出 (Output)"
+    VIEW_GROUPED = "分组 (Grouped)"
+    VIEW_DIFF = "对比 (Diff vs baseline)"
+
+    ALL = "全部 (All)"
+
+    def __init__(self, connection_manager, parent=None):
+        super().__init__(parent)
+        self.connection_manager = connection_manager
+        self.profiles: List[ConnectionProfile] = ProfileManager().get_all_profiles()
+        self.runner: BroadcastRunner = None
+        self._rows: Dict[str, int] = {}
+        self._finished_results: Dict[str, ExecResult] = {}
+
+        self.setWindowTitle("广播命令 (Broadcast Command)")
+        self.resize(1000, 700)
+        self._setup_ui()
+        self._refresh_targets()
+
+    def _setup_ui(self):
+        """Setup dialog UI."""
+        layout = QVBoxLayout(self)
+
+        # Command and target selection
+        form = QFormLayout()
+        self.command_input = QLineEdit()
+        self.command_input.setPlaceholderText("df -h")
+        self.command_input.returnPressed.connect(self._run)
+        form.addRow("命令 (Command):", self.command_input)
+
+        filter_layout = QHBoxLayout()
+        self.group_combo = QComboBox()
+        self.group_combo.addItem(self.ALL, None)
+        for group in sorted({p.group for p in self.profiles if p.group}):
+            self.group_combo.addItem(group, group)
+        self.tag_combo = QComboBox()
+        self.tag_combo.addItem(self.ALL, None)
+        for tag in sorted({t for p in self.profiles for t in p.tags}):
+            self.tag_combo.addItem(tag, tag)
+        self.group_combo.currentIndexChanged.connect(self._refresh_targets)
+        self.tag_combo.currentIndexChanged.connect(self._refresh_targets)
+        filter_layout.addWidget(QLabel("分组 (Group):"))
+        filter_layout.addWidget(self.group_combo, 1)
+        filter_layout.addWidget(QLabel("标签 (Tag):"))
+        filter_layout.addWidget(self.tag_combo, 1)
+        form.addRow(filter_layout)
+
+        self.target_list = QListWidget()
+        self.target_list.setMaximumHeight(120)
+        form.addRow("目标 (Targets):", self.target_list)
+
+        limits_layout = QHBoxLayout()
+        self.timeout_spin = QSpinBox()
+        self.timeout_spin.setRange(1, 3600)
+        self.timeout_spin.setSuffix(" sec")
+        self.timeout_spin.setValue(AppConstants.BROADCAST_TIMEOUT_SEC)
+        self.parallel_spin = QSpinBox()
+        self.parallel_spin.setRange(1, 128)
+        self.parallel_spin.setValue(AppConstants.BROADCAST_MAX_PARALLEL)
+        self.per_host_spin = QSpinBox()
+        self.per_host_spin.setRange(1, 10)
+        self.per_host_spin.setValue(AppConstants.BROADCAST_PER_HOST_LIMIT)
+        limits_layout.addWidget(QLabel("超时 (Timeout):"))
+        limits_layout.addWidget(self.timeout_spin)
+        limits_layout.addWidget(QLabel("并发 (Parallel):"))
+        limits_layout.addWidget(self.parallel_spin)
+        limits_layout.addWidget(QLabel("每主机 (Per host):"))
+        limits_layout.addWidget(self.per_host_spin)
+        limits_layout.addStretch()
+        self.run_btn = QPushButton("▶ 运行 (Run)")
+        self.run_btn.clicked.connect(self._run)
+        self.cancel_btn = QPushButton("■ 取消 (Cancel)")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self._cancel)
+        limits_layout.addWidget(self.run_btn)
+        limits_layout.addWidget(self.cancel_btn)
+        form.addRow(limits_layout)
+        layout.addLayout(form)
+
+        # Results: per-host table and detail view
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.results_table = QTableWidget(0, 4)
+        self.results_table.setHorizontalHeaderLabels(["Host", "Status", "Exit", "Time"])
+        self.results_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.results_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.results_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.results_table.itemSelectionChanged.connect(self._update_detail)
+        splitter.addWidget(self.results_table)
+
+        detail = QVBoxLayout()
+        view_layout = QHBoxLayout()
+        self.view_combo = QComboBox()
+        self.view_combo.addItems([self.VIEW_OUTPUT, self.VIEW_GROUPED, self.VIEW_DIFF])
+        self.view_combo.currentIndexChanged.connect(self._update_detail)
+        self.baseline_combo = QComboBox()
+        self.baseline_combo.currentIndexChanged.connect(self._update_detail)
+        view_layout.addWidget(QLabel("视图 (View):"))
+        view_layout.addWidget(self.view_combo)
+        view_layout.addWidget(QLabel("基准 (Baseline):"))
+        view_layout.addWidget(self.baseline_combo, 1)
+        detail.addLayout(view_layout)
+
+        self.detail_view = QPlainTextEdit()
+        self.detail_view.setReadOnly(True)
+        font = QFont(AppConstants.DEFAULT_TERMINAL_FONT_FAMILY, 10)
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        self.detail_view.setFont(font)
+        detail.addWidget(self.detail_view)
+
+        detail_widget = QWidget()
+        detail_widget.setLayout(detail)
+        splitter.addWidget(detail_widget)
+        splitter.setSizes([350, 650])
+        layout.addWidget(splitter, 1)
+
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+
+    def _matches_filter(self, profile: ConnectionProfile) -> bool:
+        group = self.group_combo.currentData()
+        tag = self.tag_combo.currentData()
+        return (group is None or profile.group == group) and (tag is None or tag in profile.tags)
+
+    def _refresh_targets(self):
+        """List profiles matching the group and tag filters, all checked."""
+        self.target_list.clear()
+        for index, profile in enumerate(self.profiles):
+            if not self._matches_filter(profile):
+                continue
+            item = QListWidgetItem(f"{profile.name} ({profile.username}@{profile.host}:{profile.port})")
+            item.setData(Qt.ItemDataRole.UserRole, index)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked)
+            self.target_list.addItem(item)
+
+    def _checked_profiles(self) -> List[ConnectionProfile]:
+        indexes = {
+            self.target_list.item(i).data(Qt.ItemDataRole.UserRole)
+            for i in range(self.target_list.count())
+            if self.target_list.item(i).checkState() == Qt.CheckState.Checked
+        }
+        return [p for i, p in enumerate(self.profiles) if i in indexes]
+
+    def _run(self):
+        """Start the broadcast on the checked hosts."""
+        if self.runner is not None:
+            return
+        command = self.command_input.text().strip()
+        targets = self._checked_profiles()
+        if not command or not targets:
+            QMessageBox.warning(self, "Broadcast", "请输入命令并选择至少一个目标主机。")
+            return
+
+        self._rows = {}
+        self.results_table.setRowCount(0)
+        self.baseline_combo.clear()
+        self.detail_view.clear()
+        self._finished_results = {}
+        # Rows are keyed like the runner's results, unique even for duplicate names
+        for label in target_labels(targets):
+            row = self.results_table.rowCount()
+            self.results_table.insertRow(row)
+            self.results_table.setItem(row, 0, QTableWidgetItem(label))
+            self.results_table.setItem(row, 1, QTableWidgetItem("queued"))
+            self.results_table.setItem(row, 2, QTableWidgetItem(""))
+            self.results_table.setItem(row, 3, QTableWidgetItem(""))
+            self._rows[label] = row
+
+        self.runner = self.connection_manager.create_broadcast()
+        self.runner.host_started.connect(self._on_host_started)
+        self.runner.host_finished.connect(self._on_host_finished)
+        self.runner.finished.connect(self._on_finished)
+        self.run_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.summary_label.setText(f"Running on {len(targets)} hosts...")
+        self.runner.start(
+            targets, command,
+            timeout=self.timeout_spin.value(),
+            max_parallel=self.parallel_spin.value(),
+            per_host_limit=self.per_host_spin.value()
+        )
+
+    def _cancel(self):
+        if self.runner:
+            self.runner.cancel()
+            self.cancel_btn.setEnabled(False)
+
+    def _on_host_started(self, name: str):
+        row = self._rows.get(name)
+        if row is not None:
+            self.results_table.item(row, 1).setText("running")
+
+    def _on_host_finished(self, name: str, result: ExecResult):
+        row = self._rows.get(name)
+        if row is None:
+            return
+        if result.error:
+            status, color = result.error, QColor("#f44336")
+        elif result.timed_out:
+            status, color = "timed out", QColor("#ff9800")
+        else:
+            status = "ok" if result.exit_code == 0 else "failed"
+            color = QColor("#4caf50") if result.exit_code == 0 else QColor("#f44336")
+        self.results_table.item(row, 1).setText(status)
+        self.results_table.item(row, 1).setForeground(color)
+        self.results_table.item(row, 2).setText("" if result.exit_code < 0 else str(result.exit_code))
+        self.results_table.item(row, 3).setText(f"{result.duration:.2f}s")
+        self.baseline_combo.addItem(name)
+        self._update_detail()
+
+    def _on_finished(self):
+        results = self.runner.results
+        ok = sum(1 for r in results.values() if r.ok)
+        groups = len(group_outputs(results))
+        self.summary_label.setText(
+            f"Done: {ok}/{len(results)} succeeded, {groups} distinct output(s)"
+        )
+        self.runner.deleteLater()
+        self.runner = None
+        self._finished_results = results
+        self.run_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self._update_detail()
+
+    def _current_results(self) -> Dict[str, ExecResult]:
+        if self.runner is not None:
+            return dict(self.runner.results)
+        return self._finished_results
+
+    def _update_detail(self):
+        """Render the detail view for the selected mode."""
+        results = self._current_results()
+        mode = self.view_combo.currentText()
+        selected = [self.results_table.item(i.row(), 0).text()
+                    for i in self.results_table.selectionModel().selectedRows()]
+
+        if mode == self.VIEW_GROUPED:
+            parts = []
+            for output, names in group_outputs(results):
+                parts.append(f"===== {len(names)} host(s): {', '.join(names)} =====\n{output}")
+            self.detail_view.setPlainText('\n'.join(parts))
+        elif mode == self.VIEW_DIFF:
+            baseline = self.baseline_combo.currentText()
+            if baseline not in results:
+                self.detail_view.setPlainText("")
+                return
+            names = selected or [n for n in results if n != baseline]
+            parts = []
+            for name in names:
+                if name == baseline or name not in results:
+                    continue
+                diff = diff_outputs(baseline, results[baseline], name, results[name])
+                parts.append(diff or f"===== {name}: identical to {baseline} =====\n")
+            self.detail_view.setPlainText('\n'.join(parts))
+        else:
+            names = selected or list(results)
+            self.detail_view.setPlainText('\n'.join(
+                f"===== {name} =====\n{result_text(results[name])}" for name in names if name in results
+            ))
+
+    def closeEvent(self, event):
+        if self.runner:
+            self.runner.cancel()
+        super().closeEvent(event)
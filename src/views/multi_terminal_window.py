@@ -13,6 +13,8 @@ from views.terminal_widget import TerminalWidget
 from views.chat_widget import AIChatWidget
 from views.connection_dialog import ConnectionDialog
 from controllers.session_controller import SessionController
+from models.connection_handler import ConnectionStatus
+from managers.connection_manager import ConnectionManager
 from ai.ai_client import AIClient
 from config.constants import AppConstants
 from config.config_manager import ConfigManager
@@ -31,6 +33,9 @@ class MultiTerminalWindow(QMainWindow):
         super().__init__(parent)
         self.sessions = {}  # session_id -> SessionController
         self.next_session_id = 1
+        # Shared transports: tabs to the same user@host:port reuse one SSH connection
+        self.connection_manager = ConnectionManager(self)
+        self.connection_manager.supervisor.rtt_measured.connect(self._on_rtt_measured)
         self.ai_client = None
         self.connection_history = []  # Store connection history
         self._load_connection_history()
@@ -98,6 +103,15 @@ class MultiTerminalWindow(QMainWindow):
 
         toolbar.addSeparator()
 
+        # Broadcast button: run one command on a group of saved hosts
+        self.broadcast_button = QToolButton(self)
+        self.broadcast_button.setText("📡 Broadcast")
+        self.broadcast_button.setToolTip("Run a command on multiple saved hosts")
+        self.broadcast_button.clicked.connect(self._open_broadcast_dialog)
+        toolbar.addWidget(self.broadcast_button)
+
+        toolbar.addSeparator()
+
         # Settings button (v1.6.0)
         self.settings_button = QToolButton(self)
         self.settings_button.setText("⚙️ Settings")
@@ -304,6 +318,7 @@ class MultiTerminalWindow(QMainWindow):
 
         # Terminal and Chat widgets
         terminal = TerminalWidget()
+        terminal.apply_settings(ConfigManager.get_instance().settings.terminal)
         chat = AIChatWidget()
 
         # Create splitter for resizable panes
@@ -318,13 +333,15 @@ class MultiTerminalWindow(QMainWindow):
 
         # Create session controller
         ssh_handler = None
+        conn_id = None
         try:
             from models.ssh_handler import SSHHandler
 
             # Debug: Print before creating SSH handler
             print(f"[DEBUG] Creating SSHHandler for session {session_id}...")
-            ssh_handler = SSHHandler()
-            print(f"[DEBUG] SSHHandler created: {ssh_handler}")
+            ssh_handler = SSHHandler(transport_registry=self.connection_manager.transport_registry)
+            conn_id = self.connection_manager.register_handler(ssh_handler, conn_info)
+            print(f"[DEBUG] SSHHandler created: {ssh_handler} ({conn_id})")
 
             # Create independent AI client for this session
             print(f"[DEBUG] Creating AIClient for session {session_id}...")
@@ -357,6 +374,7 @@ class MultiTerminalWindow(QMainWindow):
             self.sessions[session_id] = {
                 'controller': controller,
                 'ssh_handler': ssh_handler,
+                'conn_id': conn_id,
                 'terminal': terminal,
                 'chat': chat,
                 'widget': session_widget,
@@ -383,11 +401,15 @@ class MultiTerminalWindow(QMainWindow):
             print(f"[DEBUG] conn_info: {conn_info}")
             print(f"[DEBUG] controller.ssh_handler before connect: {controller.ssh_handler}")
 
+            # Connection runs on the worker pool; the outcome is reported by the controller
+            ssh_handler.status_changed.connect(
+                lambda status, sid=session_id: self._on_session_status_changed(sid, status)
+            )
             success = controller.connect_to_server(conn_info)
-            print(f"[DEBUG] Connection result: {success}")
+            print(f"[DEBUG] Connection started: {success}")
 
             if not success:
-                # Connection failed but keep the tab open
+                # Connection could not be started but keep the tab open
                 terminal.append_output(f"\n=== Connection to {conn_info['host']} failed ===\n")
                 terminal.append_output("You can try connecting again using the Connect button.\n")
 
@@ -400,7 +422,9 @@ class MultiTerminalWindow(QMainWindow):
             error_msg = f"Failed to create session: {str(e)}\n\n{traceback.format_exc()}"
             QMessageBox.critical(self, "Error", error_msg)
             # Cleanup
-            if ssh_handler:
+            if conn_id:
+                self.connection_manager.remove_connection(conn_id)
+            elif ssh_handler:
                 try:
                     ssh_handler.close()
                 except:
@@ -454,6 +478,7 @@ class MultiTerminalWindow(QMainWindow):
         # Cleanup controller (this will disconnect AI signals)
         controller = session_info['controller']
         controller.cleanup()
+        self.connection_manager.remove_connection(session_info['conn_id'])
 
         # Cleanup this session's AI client (clear conversation history)
         ai_client = session_info.get('ai_client')
@@ -491,12 +516,44 @@ class MultiTerminalWindow(QMainWindow):
             # Currently disconnected - reconnect
             print(f"[DEBUG] Reconnecting session {session_id}")
             success = controller.reconnect(conn_info)
-            if not success:
+            if not success and ssh_handler.status != ConnectionStatus.CONNECTING:
                 terminal.append_output(f"\n=== Reconnection failed ===\n")
 
+    def _on_session_status_changed(self, session_id: str, status: str):
+        """Reflect a session's connection status in its tab and the status bar."""
+        if session_id not in self.sessions:
+            return
+
+        conn_info = self.sessions[session_id]['conn_info']
+        self._update_tab_tooltip(session_id)
+        self.statusBar().showMessage(f"{conn_info['host']}:{conn_info['port']} - {status}")
+
+    def _on_rtt_measured(self, conn_id: str, rtt_ms: float):
+        """Show the latest round-trip time in the session's tab tooltip."""
+        for session_id, session_info in self.sessions.items():
+            if session_info['conn_id'] == conn_id:
+                self._update_tab_tooltip(session_id)
+                break
+
+    def _update_tab_tooltip(self, session_id: str):
+        """Build a tab tooltip from connection status and RTT."""
+        session_info = self.sessions[session_id]
+        conn_info = session_info['conn_info']
+        index = self.tab_widget.indexOf(session_info['widget'])
+        if index < 0:
+            return
+
+        tooltip = f"{conn_info['username']}@{conn_info['host']}: {session_info['ssh_handler'].status.value}"
+        rtt = self.connection_manager.supervisor.get_rtt(session_info['conn_id'])
+        if rtt is not None:
+            tooltip += f" (RTT {rtt:.0f} ms)"
+        self.tab_widget.setTabToolTip(index, tooltip)
+
     def _on_tab_changed(self, index: int):
-        """Handle tab change event."""
-        pass
+        """Handle tab change event: only the visible tab's terminal renders."""
+        current = self.tab_widget.widget(index)
+        for info in self.sessions.values():
+            info['terminal'].set_render_active(info['widget'] is current)
 
     def _next_tab(self):
         """Switch to next tab."""
@@ -536,6 +593,12 @@ class MultiTerminalWindow(QMainWindow):
 
     # ========== v1.6.0 Configuration Persistence Methods ==========
 
+    def _open_broadcast_dialog(self):
+        """Open the broadcast command dialog."""
+        from views.broadcast_dialog import BroadcastDialog
+        dialog = BroadcastDialog(self.connection_manager, self)
+        dialog.exec()
+
     def _open_settings_dialog(self):
         """Open settings dialog"""
         try:
@@ -558,7 +621,9 @@ class MultiTerminalWindow(QMainWindow):
         """Handle settings changed"""
         print("[DEBUG] Settings changed, reloading configuration", flush=True)
         # Note: AI client settings will take effect on new connections
-        # Terminal settings can be applied immediately in the future
+        terminal_settings = ConfigManager.get_instance().settings.terminal
+        for info in self.sessions.values():
+            info['terminal'].apply_settings(terminal_settings)
 
     def _save_window_state(self):
         """Save window geometry and state"""
@@ -0,0 +1,447 @@
+"""
+Custom-painted terminal renderer.
+"""
+from collections import OrderedDict, deque
+from itertools import chain
+from PyQt6.QtWidgets import QAbstractScrollArea, QApplication, QFrame, QMenu
+from PyQt6.QtCore import Qt, QPointF, QRect
+from PyQt6.QtGui import (QColor, QFont, QFontMetrics, QKeySequence, QPainter,
+                         QStaticText, QTransform)
+from config.constants import AppConstants
+from config.settings import TerminalSettings
+from utils.ansi_style import StyleTable
+from utils.terminal_screen import ScreenUpdate, char_width
+from utils.scrollback_archive import ScrollbackArchive, compile_pattern
+
+
+def _cells(text):
+    """Width of a run in character cells."""
+    return len(text) if text.isascii() else sum(char_width(char) for char in text)
+
+
+class PaintedTerminalView(QAbstractScrollArea):
+    """
+    Terminal output painted directly from a compact line buffer.
+
+    Lines are kept as (text, style id) runs: the scrollback in a deque
+    followed by the current screen rows. paintEvent draws only the rows
+    intersecting the exposed rectangle, using QStaticText glyph runs cached
+    per (text, style). New output scrolls the viewport by blitting the
+    pixels already on screen; only rows whose content changed are repainted.
+
+    New output is followed only while the view is at the bottom and
+    scroll_on_output is enabled.
+
+    Offers the same interface as TextTerminalView so TerminalWidget can
+    use either renderer.
+    """
+
+    GLYPH_CACHE_SIZE = 4096
+    BACKGROUND = QColor(0, 0, 0)
+    SELECTION = QColor(255, 255, 255, 90)
+    CURSOR = QColor(0, 255, 0, 160)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._styles = StyleTable.get_instance()
+        self._history = deque()   # Scrollback lines (lists of runs)
+        self._rows = [[]]         # Screen rows in use
+        self._cursor = (0, 0)
+        self._cursor_visible = True
+        self._max_lines = TerminalSettings.max_lines
+        self._trimmed_lines = 0
+        self._archive = None      # Optional[ScrollbackArchive]
+        self._auto_scroll = TerminalSettings.scroll_on_output
+        self._glyphs = OrderedDict()  # (text, style id) -> QStaticText
+        self._anchor = None       # Selection start (line, col)
+        self._selection = None    # ((line, col), (line, col)), ordered
+
+        self.setFrameStyle(QFrame.Shape.NoFrame)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.viewport().setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.viewport().setCursor(Qt.CursorShape.IBeamCursor)
+
+        font = QFont("Consolas", 10)
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        self.setFont(font)
+        metrics = QFontMetrics(font)
+        self._cell_width = max(1, metrics.horizontalAdvance('M'))
+        self._line_height = max(1, metrics.lineSpacing())
+
+    # ---------- Renderer interface ----------
+
+    def terminal_size(self):
+        """
+        Size of the viewport in character cells.
+
+        Returns:
+            (cols, rows) tuple
+        """
+        viewport = self.viewport()
+        return (max(20, viewport.width() // self._cell_width),
+                max(5, viewport.height() // self._line_height))
+
+    def apply_update(self, update: ScreenUpdate):
+        """
+        Apply screen damage and repaint only what changed.
+
+        Args:
+            update: Result of TerminalScreen.take_update()
+        """
+        # Lines are compared by absolute number (counted from the last
+        # clear), so content that merely moved up needs no repaint
+        old_base = self._trimmed_lines + len(self._history)
+        old_rows = self._rows
+        scrollbar = self.verticalScrollBar()
+        follow = self._auto_scroll and scrollbar.value() >= scrollbar.maximum()
+        trimmed = 0
+
+        def previous(line):
+            index = line - old_base
+            return old_rows[index] if 0 <= index < len(old_rows) else None
+
+        changed = {old_base + self._cursor[1]}
+        full = update.full
+        for offset, runs in enumerate(update.scrolled):
+            if previous(old_base + offset) != runs:
+                changed.add(old_base + offset)
+        if update.scrolled:
+            self._history.extend(update.scrolled)
+            if len(self._history) >= self._max_lines + AppConstants.SCROLLBACK_TRIM_BATCH:
+                trimmed = self._trimmed_lines
+                self._trim_history()
+                trimmed = self._trimmed_lines - trimmed
+                full = True
+
+        base = self._trimmed_lines + len(self._history)
+        count = update.row_count
+        rows = old_rows[:count] + [[] for _ in range(count - len(old_rows))]
+        for y, runs in update.rows.items():
+            if y < count:
+                rows[y] = runs
+                if previous(base + y) != runs:
+                    changed.add(base + y)
+        # Lines that no longer exist are repainted as background
+        changed.update(range(base + count, old_base + len(old_rows)))
+        self._rows = rows
+        self._cursor = update.cursor
+        self._cursor_visible = update.cursor_visible
+        changed.add(base + update.cursor[1])
+
+        top = scrollbar.value()
+        self._update_scrollbar()
+        if follow:
+            scrollbar.setValue(scrollbar.maximum())  # Blits via scrollContentsBy
+        elif trimmed:
+            scrollbar.setValue(max(0, top - trimmed))  # Keep the lines being read in place
+        if full:
+            self.viewport().update()
+        else:
+            for line in changed:
+                self._update_line(line)
+
+    def commit_screen(self):
+        """Keep the rows shown so far as scrollback and start an empty screen area."""
+        self._history.extend(self._rows)
+        self._rows = [[]]
+        self._cursor = (0, 0)
+        self._trim_history()
+        self._refresh()
+
+    def clear_output(self):
+        """Remove all output, including archived lines."""
+        self._history.clear()
+        self._rows = [[]]
+        self._cursor = (0, 0)
+        self._trimmed_lines = 0
+        self._selection = None
+        if self._archive is not None:
+            self._archive = ScrollbackArchive(self._archive.max_lines)
+        self._refresh()
+
+    def history_lines(self):
+        """Scrollback as runs, oldest first."""
+        return list(self._history)
+
+    def load_history(self, lines):
+        """Replace the scrollback with lines of runs (used when switching renderers)."""
+        self.clear_output()
+        self._history.extend(lines)
+        self._trim_history()
+        self._refresh()
+
+    def insert_history(self, lines, before_last):
+        """
+        Insert older scrollback lines before the newest history lines
+        (lazy catch-up after a tab was hidden).
+
+        Args:
+            lines: Lines of runs, oldest first
+            before_last: Number of existing history lines that stay after them
+        """
+        scrollbar = self.verticalScrollBar()
+        follow = self._auto_scroll and scrollbar.value() >= scrollbar.maximum()
+        split = max(0, len(self._history) - before_last)
+        self._history.rotate(-split)
+        self._history.extendleft(reversed(lines))
+        self._history.rotate(split)
+        if len(self._history) >= self._max_lines + AppConstants.SCROLLBACK_TRIM_BATCH:
+            self._trim_history()
+        self._update_scrollbar()
+        if follow:
+            scrollbar.setValue(scrollbar.maximum())
+        self.viewport().update()
+
+    def drop_lines(self, lines):
+        """
+        Account for lines that went past the scrollback limit before they
+        were drawn. The whole history is older, so it is trimmed first; the
+        archive receives both in order.
+
+        Args:
+            lines: Lines of runs, oldest first
+        """
+        max_lines, self._max_lines = self._max_lines, 0
+        self._trim_history()
+        self._max_lines = max_lines
+        if self._archive is not None:
+            self._archive.append(''.join(text for text, _ in runs) for runs in lines)
+        self._trimmed_lines += len(lines)
+
+    def apply_settings(self, settings: TerminalSettings):
+        """
+        Apply scrollback and auto-scroll settings; a lower limit takes
+        effect immediately.
+
+        Args:
+            settings: Terminal settings
+        """
+        self._max_lines = max(1, settings.max_lines)
+        self._auto_scroll = settings.scroll_on_output
+        if not settings.archive_scrollback:
+            self._archive = None
+        elif self._archive is None:
+            self._archive = ScrollbackArchive(settings.archive_max_lines, first_line=self._trimmed_lines)
+        else:
+            self._archive.max_lines = settings.archive_max_lines
+        if self._trim_history():
+            self._refresh()
+
+    def search_scrollback(self, pattern, regex=False, ignore_case=True, limit=500):
+        """
+        Search archived and live output, oldest first.
+
+        Args:
+            pattern: Text or regular expression
+            regex: Treat pattern as a regular expression
+            ignore_case: Case-insensitive match
+            limit: Maximum number of results
+
+        Returns:
+            List of (line number, text); numbers count from the last clear
+        """
+        results = self._archive.search(pattern, regex, ignore_case, limit) if self._archive else []
+        matcher = compile_pattern(pattern, regex, ignore_case)
+        number = self._trimmed_lines
+        for runs in chain(self._history, self._rows):
+            if len(results) >= limit:
+                break
+            text = ''.join(text for text, _ in runs)
+            if matcher(text):
+                results.append((number, text))
+            number += 1
+        return results
+
+    # ---------- Buffer ----------
+
+    def _trim_history(self) -> bool:
+        """Drop the oldest scrollback lines down to max_lines. Returns True if any were dropped."""
+        excess = len(self._history) - self._max_lines
+        if excess <= 0:
+            return False
+        dropped = [self._history.popleft() for _ in range(excess)]
+        if self._archive is not None:
+            self._archive.append(''.join(text for text, _ in runs) for runs in dropped)
+        self._trimmed_lines += excess
+        self._selection = None
+        return True
+
+    def _line_count(self):
+        return len(self._history) + len(self._rows)
+
+    def _line(self, index):
+        """Runs of a line by index into scrollback + screen rows."""
+        history = len(self._history)
+        return self._history[index] if index < history else self._rows[index - history]
+
+    def _refresh(self):
+        self._update_scrollbar()
+        scrollbar = self.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+        self.viewport().update()
+
+    def _update_scrollbar(self):
+        visible = max(1, self.viewport().height() // self._line_height)
+        scrollbar = self.verticalScrollBar()
+        scrollbar.setPageStep(visible)
+        scrollbar.setSingleStep(1)
+        scrollbar.setRange(0, max(0, self._line_count() - visible))
+
+    def _update_line(self, absolute):
+        """Schedule a repaint of one line given its absolute number."""
+        row = absolute - self._trimmed_lines - self.verticalScrollBar().value()
+        if 0 <= row * self._line_height < self.viewport().height():
+            self.viewport().update(QRect(0, row * self._line_height,
+                                         self.viewport().width(), self._line_height))
+
+    # ---------- Painting ----------
+
+    def scrollContentsBy(self, dx, dy):
+        """Scroll by blitting; Qt repaints only the exposed strip."""
+        self.viewport().scroll(0, dy * self._line_height)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbar()
+
+    def _paint_style(self, style_id):
+        """(font, pen color, background or None) for a style, built once per id."""
+        def build(style):
+            fg, bg = StyleTable.colors(style)
+            font = QFont(self.font())
+            font.setBold(style.bold)
+            font.setItalic(style.italic)
+            font.setUnderline(style.underline)
+            font.setStrikeOut(style.strike)
+            color = QColor(fg or StyleTable.DEFAULT_FG)
+            if style.dim:
+                color.setAlpha(160)
+            return font, color, (QColor(bg) if bg else None)
+        return self._styles.cached(style_id, 'paint', build)
+
+    def _glyph(self, text, style_id, font):
+        """Shaped text for a run, kept in an LRU cache."""
+        key = (text, style_id)
+        glyph = self._glyphs.get(key)
+        if glyph is None:
+            glyph = QStaticText(text)
+            glyph.setTextFormat(Qt.TextFormat.PlainText)
+            glyph.prepare(QTransform(), font)
+            self._glyphs[key] = glyph
+            if len(self._glyphs) > self.GLYPH_CACHE_SIZE:
+                self._glyphs.popitem(last=False)
+        else:
+            self._glyphs.move_to_end(key)
+        return glyph
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        rect = event.rect()
+        painter.fillRect(rect, self.BACKGROUND)
+
+        height = self._line_height
+        first = self.verticalScrollBar().value()
+        total = self._line_count()
+        cursor_line = len(self._history) + self._cursor[1]
+        for row in range(rect.top() // height, rect.bottom() // height + 1):
+            index = first + row
+            if index >= total:
+                break
+            y = row * height
+            self._paint_runs(painter, self._line(index), y)
+            if self._selection:
+                self._paint_selection(painter, index + self._trimmed_lines, y)
+            if index == cursor_line and self._cursor_visible:
+                painter.fillRect(self._cursor[0] * self._cell_width, y,
+                                 self._cell_width, height, self.CURSOR)
+        painter.end()
+
+    def _paint_runs(self, painter, runs, y):
+        x = 0
+        for text, style_id in runs:
+            font, color, background = self._paint_style(style_id)
+            width = _cells(text) * self._cell_width
+            if background is not None:
+                painter.fillRect(x, y, width, self._line_height, background)
+            painter.setFont(font)
+            painter.setPen(color)
+            painter.drawStaticText(QPointF(x, y), self._glyph(text, style_id, font))
+            x += width
+
+    def _paint_selection(self, painter, line, y):
+        (start_line, start_col), (end_line, end_col) = self._selection
+        if not start_line <= line <= end_line:
+            return
+        left = start_col if line == start_line else 0
+        right = end_col if line == end_line else self.viewport().width() // self._cell_width
+        if right > left:
+            painter.fillRect(left * self._cell_width, y, (right - left) * self._cell_width,
+                             self._line_height, self.SELECTION)
+
+    # ---------- Selection ----------
+
+    def _cell_at(self, pos):
+        row = max(0, pos.y()) // self._line_height
+        col = max(0, round(pos.x() / self._cell_width))
+        return self._trimmed_lines + self.verticalScrollBar().value() + row, col
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._anchor = self._cell_at(event.position().toPoint())
+            if self._selection:
+                self._selection = None
+                self.viewport().update()
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._anchor and event.buttons() & Qt.MouseButton.LeftButton:
+            self._selection = tuple(sorted((self._anchor, self._cell_at(event.position().toPoint()))))
+            self.viewport().update()
+
+    def selected_text(self):
+        """Text of the current selection ('' if none)."""
+        if not self._selection:
+            return ''
+        (start_line, start_col), (end_line, end_col) = self._selection
+        lines = []
+        for line in range(max(start_line, self._trimmed_lines),
+                          min(end_line + 1, self._trimmed_lines + self._line_count())):
+            text = ''.join(text for text, _ in self._line(line - self._trimmed_lines))
+            left = start_col if line == start_line else 0
+            right = end_col if line == end_line else None
+            lines.append(_slice_cells(text, left, right).rstrip())
+        return '\n'.join(lines)
+
+    def copy(self):
+        """Copy the selection to the clipboard."""
+        text = self.selected_text()
+        if text:
+            QApplication.clipboard().setText(text)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Copy):
+            self.copy()
+        else:
+            super().keyPressEvent(event)
+
+    def contextMenuEvent(self, event):
+        menu = QMenu(self)
+        action = menu.addAction("Copy")
+        action.setEnabled(bool(self._selection))
+        action.triggered.connect(self.copy)
+        menu.exec(event.globalPos())
+
+
+def _slice_cells(text, start, end=None):
+    """Substring of text covering cells [start, end)."""
+    if text.isascii():
+        return text[start:end]
+    result = []
+    col = 0
+    for char in text:
+        if end is not None and col >= end:
+            break
+        if col >= start:
+            result.append(char)
+        col += char_width(char)
+    return ''.join(result)
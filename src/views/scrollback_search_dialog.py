@@ -0,0 +1,86 @@
+"""
+Scrollback search dialog.
+Finds lines in a terminal's live and archived (compressed) scrollback.
+"""
+import re
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QCheckBox,
+                             QPushButton, QListWidget, QLabel)
+from PyQt6.QtGui import QFont
+from config.constants import AppConstants
+
+
+class ScrollbackSearchDialog(QDialog):
+    """
+    Non-modal dialog that searches a TerminalWidget's scrollback,
+    including lines already moved to the compressed archive.
+    """
+
+    def __init__(self, terminal_widget, parent=None):
+        super().__init__(parent)
+        self.terminal_widget = terminal_widget
+        self._setup_ui()
+
+    def _setup_ui(self):
+        """Setup dialog UI."""
+        self.setWindowTitle("搜索回滚缓冲 (Find in Scrollback)")
+        self.resize(700, 450)
+
+        layout = QVBoxLayout()
+
+        search_layout = QHBoxLayout()
+        self.pattern_input = QLineEdit()
+        self.pattern_input.setPlaceholderText("Search text or regular expression")
+        self.pattern_input.returnPressed.connect(self.search)
+        self.regex_check = QCheckBox("Regex")
+        self.case_check = QCheckBox("Match case")
+        search_btn = QPushButton("Find")
+        search_btn.clicked.connect(self.search)
+        search_layout.addWidget(self.pattern_input, 1)
+        search_layout.addWidget(self.regex_check)
+        search_layout.addWidget(self.case_check)
+        search_layout.addWidget(search_btn)
+        layout.addLayout(search_layout)
+
+        self.results_list = QListWidget()
+        font = QFont(AppConstants.DEFAULT_TERMINAL_FONT_FAMILY, 10)
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        self.results_list.setFont(font)
+        layout.addWidget(self.results_list, 1)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+        self.setLayout(layout)
+
+    def search(self):
+        """Run the search and list matching lines with their line numbers."""
+        pattern = self.pattern_input.text()
+        self.results_list.clear()
+        if not pattern:
+            self.status_label.setText("")
+            return
+
+        limit = AppConstants.SCROLLBACK_SEARCH_LIMIT
+        try:
+            results = self.terminal_widget.search_scrollback(
+                pattern,
+                regex=self.regex_check.isChecked(),
+                ignore_case=not self.case_check.isChecked(),
+                limit=limit
+            )
+        except re.error as e:
+            self.status_label.setText(f"Invalid regular expression: {e}")
+            return
+
+        for number, text in results:
+            self.results_list.addItem(f"{number + 1:>7}  {text}")
+        if len(results) >= limit:
+            self.status_label.setText(f"Showing the first {limit} matches")
+        else:
+            self.status_label.setText(f"{len(results)} match(es)")
+
+    def showEvent(self, event):
+        """Focus the search field whenever the dialog is shown."""
+        super().showEvent(event)
+        self.pattern_input.setFocus()
+        self.pattern_input.selectAll()
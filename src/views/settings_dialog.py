@@ -8,7 +8,7 @@ import sys
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QTabWidget, QWidget,
                              QFormLayout, QLineEdit, QSpinBox, QCheckBox,
                              QDialogButtonBox, QColorDialog, QPushButton, QLabel,
-                             QSlider, QHBoxLayout)
+                             QSlider, QHBoxLayout, QComboBox)
 from PyQt6.QtCore import Qt, pyqtSignal
 from config.config_manager import ConfigManager
 from config.settings import AppSettings
@@ -116,6 +116,14 @@ class SettingsDialog(QDialog):
         self.max_history_spin.setRange(0, 50)
         layout.addRow("最大历史 (Max History):", self.max_history_spin)
 
+        # Exec channel for AI commands
+        self.use_exec_channel_check = QCheckBox()
+        self.use_exec_channel_check.setToolTip(
+            "在独立的 exec 通道中执行 AI 命令：命令结束即反馈，并附带退出码。\n"
+            "命令不会继承交互式 Shell 的当前目录和变量。"
+        )
+        layout.addRow("独立执行通道 (Exec Channel):", self.use_exec_channel_check)
+
         # System Prompt - 添加恢复默认按钮
         from PyQt6.QtWidgets import QPlainTextEdit, QPushButton, QGroupBox, QVBoxLayout
         prompt_group = QGroupBox("系统提示词 (System Prompt)")
@@ -185,10 +193,26 @@ class SettingsDialog(QDialog):
 
         # Max Lines
         self.max_lines_spin = QSpinBox()
-        self.max_lines_spin.setRange(100, 2000)
-        self.max_lines_spin.setSingleStep(100)
+        self.max_lines_spin.setRange(100, 100000)
+        self.max_lines_spin.setSingleStep(500)
         layout.addRow("Max Lines:", self.max_lines_spin)
 
+        # Archive trimmed scrollback (compressed, searchable)
+        self.archive_check = QCheckBox()
+        layout.addRow("Archive Old Lines:", self.archive_check)
+
+        self.archive_lines_spin = QSpinBox()
+        self.archive_lines_spin.setRange(1000, 1000000)
+        self.archive_lines_spin.setSingleStep(10000)
+        layout.addRow("Archive Max Lines:", self.archive_lines_spin)
+
+        # Renderer
+        self.renderer_combo = QComboBox()
+        self.renderer_combo.addItem("Rich Text (QTextEdit)", "text")
+        self.renderer_combo.addItem("Painted (fast)", "painted")
+        self.renderer_combo.addItem("Rich Text via HTML (legacy)", "html")
+        layout.addRow("Renderer:", self.renderer_combo)
+
         widget.setLayout(layout)
         return widget
 
@@ -238,6 +262,22 @@ class SettingsDialog(QDialog):
         self.max_history_count_spin.setRange(0, 50)
         layout.addRow("Max History Count:", self.max_history_count_spin)
 
+        # Keepalive Interval
+        self.keepalive_spin = QSpinBox()
+        self.keepalive_spin.setRange(0, 600)
+        self.keepalive_spin.setSuffix(" sec")
+        self.keepalive_spin.setSpecialValueText("Off")
+        layout.addRow("Keepalive Interval:", self.keepalive_spin)
+
+        # Auto Reconnect
+        self.auto_reconnect_check = QCheckBox()
+        layout.addRow("Auto Reconnect:", self.auto_reconnect_check)
+
+        # Reconnect Attempts
+        self.reconnect_attempts_spin = QSpinBox()
+        self.reconnect_attempts_spin.setRange(1, 50)
+        layout.addRow("Max Reconnect Attempts:", self.reconnect_attempts_spin)
+
         widget.setLayout(layout)
         return widget
 
@@ -275,6 +315,7 @@ class SettingsDialog(QDialog):
         self.temperature_value_label.setText(f"{s.ai.temperature:.2f}")
         self.max_tokens_spin.setValue(s.ai.max_tokens)
         self.max_history_spin.setValue(s.ai.max_history)
+        self.use_exec_channel_check.setChecked(s.ai.use_exec_channel)
         # 系统提示词：v1.6.1 - 简化逻辑：只有空字符串才使用默认
         from ai.ai_client import AIClient
         self._original_system_prompt = s.ai.system_prompt  # 保存原始值
@@ -301,6 +342,9 @@ class SettingsDialog(QDialog):
         self.cursor_blink_check.setChecked(s.terminal.cursor_blink)
         self.scroll_check.setChecked(s.terminal.scroll_on_output)
         self.max_lines_spin.setValue(s.terminal.max_lines)
+        self.archive_check.setChecked(s.terminal.archive_scrollback)
+        self.archive_lines_spin.setValue(s.terminal.archive_max_lines)
+        self.renderer_combo.setCurrentIndex(max(0, self.renderer_combo.findData(s.terminal.renderer)))
 
         # UI Settings
         self.window_width_spin.setValue(s.ui.window_width)
@@ -312,6 +356,9 @@ class SettingsDialog(QDialog):
         self.conn_timeout_spin.setValue(s.connection.timeout)
         self.auto_save_check.setChecked(s.connection.auto_save_history)
         self.max_history_count_spin.setValue(s.connection.max_history_count)
+        self.keepalive_spin.setValue(s.connection.keepalive_interval)
+        self.auto_reconnect_check.setChecked(s.connection.auto_reconnect)
+        self.reconnect_attempts_spin.setValue(s.connection.reconnect_max_attempts)
 
     def _apply(self):
         """应用设置"""
@@ -323,6 +370,7 @@ class SettingsDialog(QDialog):
         s.ai.temperature = self.temperature_slider.value() / 100.0
         s.ai.max_tokens = self.max_tokens_spin.value()
         s.ai.max_history = self.max_history_spin.value()
+        s.ai.use_exec_channel = self.use_exec_channel_check.isChecked()
 
         # 系统提示词：v1.6.1 简化逻辑 - 直接保存用户输入
         from ai.ai_client import AIClient
@@ -355,6 +403,9 @@ class SettingsDialog(QDialog):
         s.terminal.cursor_blink = self.cursor_blink_check.isChecked()
         s.terminal.scroll_on_output = self.scroll_check.isChecked()
         s.terminal.max_lines = self.max_lines_spin.value()
+        s.terminal.archive_scrollback = self.archive_check.isChecked()
+        s.terminal.archive_max_lines = self.archive_lines_spin.value()
+        s.terminal.renderer = self.renderer_combo.currentData()
 
         # UI Settings
         s.ui.window_width = self.window_width_spin.value()
@@ -366,6 +417,9 @@ class SettingsDialog(QDialog):
         s.connection.timeout = self.conn_timeout_spin.value()
         s.connection.auto_save_history = self.auto_save_check.isChecked()
         s.connection.max_history_count = self.max_history_count_spin.value()
+        s.connection.keepalive_interval = self.keepalive_spin.value()
+        s.connection.auto_reconnect = self.auto_reconnect_check.isChecked()
+        s.connection.reconnect_max_attempts = self.reconnect_attempts_spin.value()
 
         # 保存前打印完整配置（预览前500字符）
         import json
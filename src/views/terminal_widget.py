@@ -1,28 +1,80 @@
 """
 Terminal widget - Left panel SSH terminal interface.
 """
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTextEdit, QLineEdit,
-                             QLabel, QFrame, QPushButton, QHBoxLayout)
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QFont, QTextCursor, QColor, QPalette, QTextBlockFormat
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLineEdit,
+                             QLabel, QPushButton, QHBoxLayout)
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+from PyQt6.QtGui import QFont, QKeySequence, QShortcut
+from config.constants import AppConstants
+from config.settings import TerminalSettings
+from utils.terminal_screen import TerminalScreen, ScreenUpdate
+from views.text_terminal_view import TextTerminalView, HtmlTerminalView
+from views.painted_terminal_view import PaintedTerminalView
+from views.scrollback_search_dialog import ScrollbackSearchDialog
 
 
 class TerminalWidget(QWidget):
     """
     Terminal display widget with output area and command input.
     Simulates a real terminal with black background and green text.
+
+    Output is fed through a TerminalScreen whose damage is drawn by a
+    renderer view, selected by TerminalSettings.renderer:
+    'text' (TextTerminalView, QTextEdit with cached char formats), 'html'
+    (HtmlTerminalView, QTextEdit via insertHtml) or 'painted'
+    (PaintedTerminalView, custom painted). Renderers can be switched while
+    a session is open.
+
+    Output is applied to the screen immediately but drawn by a render
+    timer at most once per frame; the screen accumulates damage in between.
+    While the widget is in a hidden tab nothing is drawn: the screen acts
+    as the off-screen buffer. On activation the screen and the newest lines
+    are drawn at once and older scrollback is inserted in the background.
+
+    With an OutputProcessor attached the screen is fed on the processor's
+    worker thread; its ScreenUpdates arrive through queue_update and are
+    merged into the pending frame, so the GUI thread only draws.
+
+    Ctrl+Shift+F opens a search over the scrollback, including lines
+    already moved to the compressed archive.
     """
 
+    RENDERERS = {
+        'text': TextTerminalView,
+        'html': HtmlTerminalView,
+        'painted': PaintedTerminalView,
+    }
+
     # Signal emitted when user enters a command
     command_sent = pyqtSignal(str)
 
     # Signal emitted when user clicks connect button
     connect_requested = pyqtSignal()
 
+    # Signal emitted when the visible size in characters changes (cols, rows)
+    terminal_resized = pyqtSignal(int, int)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.command_history = []  # Command history
         self.history_index = -1  # Current position in history
+        self._terminal_size = None
+        self._settings = TerminalSettings()
+        self.screen = TerminalScreen(AppConstants.SSH_DEFAULT_COLS, AppConstants.SSH_DEFAULT_ROWS)
+        self._processor = None     # OutputProcessor that owns the screen, if any
+        self._pending = None       # ScreenUpdate received but not drawn yet
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setInterval(AppConstants.RENDER_FRAME_MS)
+        self._render_timer.timeout.connect(self._flush_render)
+        self._render_active = True
+        self._backlog = []         # Older scrolled lines still to be inserted
+        self._backlog_anchor = 0   # History lines that stay after the backlog
+        self._backlog_timer = QTimer(self)
+        self._backlog_timer.setSingleShot(True)
+        self._backlog_timer.setInterval(0)
+        self._backlog_timer.timeout.connect(self._fill_backlog)
+        self._search_dialog = None
         self._setup_ui()
 
     def _setup_ui(self):
@@ -32,13 +84,8 @@ class TerminalWidget(QWidget):
         layout.setSpacing(5)
 
         # Terminal output display (read-only)
-        self.output_display = QTextEdit()
-        self.output_display.setReadOnly(True)
-        self.output_display.setFrameStyle(QFrame.Shape.NoFrame)
-
-        # Set terminal-style appearance
-        self._set_terminal_style()
-
+        self.renderer = self._settings.renderer
+        self.output_display = self._create_view(self.renderer)
         # Command input area with connect button
         input_layout = QHBoxLayout()
         input_layout.setSpacing(5)
@@ -88,34 +135,75 @@ class TerminalWidget(QWidget):
 
         self.setLayout(layout)
 
-    def _set_terminal_style(self):
-        """Apply terminal-like styling to output display."""
-        # Set font to monospace
-        font = QFont("Consolas", 10)
-        font.setStyleHint(QFont.StyleHint.Monospace)
-        self.output_display.setFont(font)
-
-        # Set black background with traditional green text
-        # Note: HTML colors will override this default
-        palette = self.output_display.palette()
-        palette.setColor(QPalette.ColorRole.Base, QColor(0, 0, 0))
-        palette.setColor(QPalette.ColorRole.Text, QColor(0, 255, 0))  # Traditional terminal green
-        self.output_display.setPalette(palette)
-
-        # Auto-scroll setting
-        self.output_display.setLineWrapMode(QTextEdit.LineWrapMode.WidgetWidth)
-
-        # Reduce line spacing and paragraph spacing for tighter display
-        document = self.output_display.document()
-        document.setDocumentMargin(0)  # No margin
-
-        # Set default text block format to reduce spacing
-        cursor = self.output_display.textCursor()
-        format = QTextBlockFormat()
-        format.setLineHeight(100, 1)  # 1 = SingleHeight
-        format.setTopMargin(0)
-        format.setBottomMargin(0)
-        cursor.setBlockFormat(format)
+        # Ctrl+Shift+F: Search scrollback (this terminal only)
+        shortcut_find = QShortcut(QKeySequence("Ctrl+Shift+F"), self)
+        shortcut_find.setContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+        shortcut_find.activated.connect(self.show_search_dialog)
+
+    def _create_view(self, renderer):
+        """Create the output view for a renderer name (unknown names fall back to 'text')."""
+        view = self.RENDERERS.get(renderer, TextTerminalView)()
+        view.apply_settings(self._settings)
+        return view
+
+    def set_renderer(self, renderer):
+        """
+        Switch the output renderer, keeping scrollback text and the screen.
+
+        Args:
+            renderer: 'text', 'html' or 'painted'
+        """
+        if renderer not in self.RENDERERS:
+            renderer = 'text'
+        if renderer == self.renderer:
+            return
+        self._flush_render()
+        self._fill_backlog(everything=True)
+        old_view = self.output_display
+        view = self._create_view(renderer)
+        view.load_history(old_view.history_lines())
+        self.layout().replaceWidget(old_view, view)
+        old_view.deleteLater()
+        self.output_display = view
+        self.renderer = renderer
+        if self._processor is not None:
+            self._processor.invalidate()
+            return
+        self.screen.invalidate()
+        view.apply_update(self.screen.take_update())
+
+    def apply_settings(self, settings: TerminalSettings):
+        """
+        Apply terminal settings (renderer and scrollback).
+
+        Args:
+            settings: Terminal settings
+        """
+        self._settings = settings
+        self.set_renderer(settings.renderer)
+        self.output_display.apply_settings(settings)
+
+    def terminal_size(self):
+        """
+        Size of the output area in character cells.
+
+        Returns:
+            (cols, rows) tuple
+        """
+        return self.output_display.terminal_size()
+
+    def resizeEvent(self, event):
+        """Report size changes in character cells so the PTY can follow."""
+        super().resizeEvent(event)
+        size = self.terminal_size()
+        if size != self._terminal_size:
+            self._terminal_size = size
+            if self._processor is not None:
+                self._processor.resize(*size)
+            else:
+                self.screen.resize(*size)
+                self._flush_render()
+            self.terminal_resized.emit(*size)
 
     def _set_input_style(self):
         """Apply styling to input line."""
@@ -140,35 +228,201 @@ class TerminalWidget(QWidget):
 
     def append_output(self, text):
         """
-        Append text to terminal output display.
+        Append a local message (plain text, newline separated) at the cursor.
 
         Args:
             text: Text to append
         """
-        cursor = self.output_display.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        cursor.insertText(text)
-        self.output_display.setTextCursor(cursor)
-        self.output_display.ensureCursorVisible()
+        self.feed_output(text.replace('\r\n', '\n').replace('\n', '\r\n'))
 
-    def append_output_html(self, html_text):
+    def attach_processor(self, processor):
         """
-        Append HTML-formatted text to terminal output display.
-        Used for colored ANSI output.
+        Hand the screen over to an OutputProcessor; from now on output and
+        screen commands go through its worker thread and its results must
+        be passed to queue_update.
 
         Args:
-            html_text: HTML text to append
+            processor: OutputProcessor created for self.screen
         """
-        cursor = self.output_display.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        cursor.insertHtml(html_text)
-        self.output_display.setTextCursor(cursor)
-        self.output_display.ensureCursorVisible()
+        self._processor = processor
+        if self._terminal_size is not None:
+            processor.resize(*self._terminal_size)
 
+    def feed_output(self, data):
+        """
+        Feed raw terminal output (with escape sequences) to the screen;
+        the changed rows are drawn on the next frame.
+
+        Args:
+            data: Decoded terminal output
+        """
+        if self._processor is not None:
+            self._processor.submit_local(data)
+            return
+        self.screen.feed(data)
+        self._schedule_render()
+
+    def queue_update(self, update: ScreenUpdate):
+        """
+        Queue screen damage produced by the output processor; it is drawn
+        on the next frame together with anything else pending.
+
+        Args:
+            update: ScreenUpdate from the worker thread
+        """
+        self._pending = update if self._pending is None else self._pending.merge(update)
+        self._schedule_render()
+
+    def _schedule_render(self):
+        """Start the render timer, or keep the hidden backlog bounded."""
+        if self._render_active:
+            if not self._render_timer.isActive():
+                self._render_timer.start()
+            return
+        # Hidden: lines beyond the scrollback limit would be trimmed on
+        # activation anyway, so hand them over (archive) without drawing
+        limit = self._settings.max_lines + AppConstants.SCROLLBACK_TRIM_BATCH
+        if self._pending is not None and len(self._pending.scrolled) > limit:
+            overflow = len(self._pending.scrolled) - limit
+            self.output_display.drop_lines(self._pending.scrolled[:overflow])
+            del self._pending.scrolled[:overflow]
+        if self._processor is None and self.screen.scrolled_count > limit:
+            self.output_display.drop_lines(self.screen.take_scrolled(self.screen.scrolled_count - limit))
+
+    def _take_pending(self):
+        """Damage not drawn yet: queued updates followed by the screen's own."""
+        update, self._pending = self._pending, None
+        if self._processor is None:
+            fresh = self.screen.take_update()
+            update = fresh if update is None else update.merge(fresh)
+        return update
+
+    def set_render_active(self, active):
+        """
+        Suspend drawing while the widget is in a background tab, or resume it.
+
+        Args:
+            active: True when the widget is visible
+        """
+        if active == self._render_active:
+            return
+        self._render_active = active
+        if active:
+            self._catch_up()
+        else:
+            self._render_timer.stop()
+            self._fill_backlog(everything=True)
+
+    def _catch_up(self):
+        """Draw the screen and the newest lines now; queue older lines."""
+        update = self._take_pending()
+        if update is None:
+            return
+        tail = self.screen.rows
+        if len(update.scrolled) > tail:
+            self._backlog = update.scrolled[:-tail]
+            self._backlog_anchor = 0
+            update.scrolled = update.scrolled[-tail:]
+        self.apply_update(update)
+        if self._backlog:
+            self._backlog_timer.start()
+
+    def _fill_backlog(self, everything=False):
+        """Insert the next chunk of older lines, newest first."""
+        if not self._backlog:
+            return
+        count = len(self._backlog) if everything else AppConstants.BACKLOG_CHUNK_LINES
+        chunk = self._backlog[-count:]
+        del self._backlog[-count:]
+        self.output_display.insert_history(chunk, self._backlog_anchor)
+        self._backlog_anchor += len(chunk)
+        if self._backlog:
+            self._backlog_timer.start()
+
+    def _flush_render(self):
+        """Draw everything the screen changed since the last frame."""
+        self._render_timer.stop()
+        update = self._take_pending()
+        if update is not None:
+            self.apply_update(update)
+
+    def apply_update(self, update: ScreenUpdate):
+        """
+        Draw screen damage with the current renderer.
+
+        Args:
+            update: Result of TerminalScreen.take_update()
+        """
+        if self._backlog:
+            self._backlog_anchor += len(update.scrolled)
+        self.output_display.apply_update(update)
+
+    def reset_screen(self):
+        """
+        Start a fresh screen (new connection): the rows shown so far stay
+        in the scrollback and terminal modes go back to their defaults.
+        """
+        if self._processor is not None:
+            # Ordered with the output queued before it; the kept rows
+            # arrive as scrolled lines
+            self._processor.reset(keep_rows=True)
+            return
+        self._flush_render()
+        self._fill_backlog(everything=True)
+        self.output_display.commit_screen()
+        self.screen.reset()
+        self.screen.take_update()
+
+    def search_scrollback(self, pattern, regex=False, ignore_case=True, limit=500):
+        """
+        Search archived and live output, oldest first.
+
+        Args:
+            pattern: Text or regular expression
+            regex: Treat pattern as a regular expression
+            ignore_case: Case-insensitive match
+            limit: Maximum number of results
+
+        Returns:
+            List of (line number, text)
+        """
+        return self.output_display.search_scrollback(pattern, regex, ignore_case, limit)
+
+    def show_search_dialog(self):
+        """Open (or raise) the scrollback search dialog for this terminal."""
+        if self._search_dialog is None:
+            self._search_dialog = ScrollbackSearchDialog(self, self)
+        self._search_dialog.show()
+        self._search_dialog.raise_()
+        self._search_dialog.activateWindow()
+
+    def set_send_progress(self, sent, total):
+        """
+        Show progress of a large paste or script being sent.
+
+        Args:
+            sent: Bytes written so far
+            total: Total bytes (0 clears the indicator)
+        """
+        if total and sent < total:
+            self.input_line.setPlaceholderText(
+                f"Sending... {sent // 1024} / {total // 1024} KB ({sent * 100 // total}%)"
+            )
+        elif self.input_line.isEnabled():
+            self.input_line.setPlaceholderText("Enter command here...")
 
     def clear_output(self):
         """Clear terminal output display."""
-        self.output_display.clear()
+        self._render_timer.stop()
+        self._backlog_timer.stop()
+        self._backlog = []
+        self._pending = None
+        self.output_display.clear_output()
+        if self._processor is not None:
+            self._processor.reset()
+            return
+        self.screen.reset()
+        self.screen.take_update()
 
     def set_connection_status(self, connected):
         """
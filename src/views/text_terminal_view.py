@@ -0,0 +1,345 @@
+"""
+QTextEdit-based terminal renderer.
+"""
+import html
+from PyQt6.QtWidgets import QTextEdit, QFrame
+from PyQt6.QtGui import (QFont, QFontMetrics, QTextCursor, QColor, QPalette,
+                         QTextBlockFormat, QTextCharFormat)
+from config.constants import AppConstants
+from config.settings import TerminalSettings
+from utils.ansi_style import StyleTable
+from utils.terminal_screen import ScreenUpdate
+from utils.scrollback_archive import ScrollbackArchive, compile_pattern
+
+
+class TextTerminalView(QTextEdit):
+    """
+    Terminal output rendered into a QTextDocument.
+
+    The document holds the scrollback (lines that scrolled off the screen)
+    followed by one block per screen row; only rows the screen reports as
+    damaged are replaced. The scrollback is capped at max_lines and trimmed
+    in batches; trimmed lines can go to a compressed ScrollbackArchive for
+    searching.
+
+    Runs are inserted with QTextCursor.insertText and a QTextCharFormat
+    cached per style id, and each update is a single edit block, so no
+    HTML is built or parsed.
+
+    The view follows new output only while it is scrolled to the bottom
+    and scroll_on_output is enabled; otherwise the position is kept.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._styles = StyleTable.get_instance()
+        self._history_blocks = 0  # Scrollback blocks before the screen rows
+        self._screen_rows = 1     # Blocks showing screen rows (document has >= 1 block)
+        self._max_lines = TerminalSettings.max_lines
+        self._trimmed_lines = 0   # Lines removed from the top since the last clear
+        self._archive = None      # Optional[ScrollbackArchive]
+        self._auto_scroll = TerminalSettings.scroll_on_output
+        self._at_bottom = True
+        self.setReadOnly(True)
+        self.setFrameStyle(QFrame.Shape.NoFrame)
+        self._set_terminal_style()
+        scrollbar = self.verticalScrollBar()
+        scrollbar.valueChanged.connect(self._on_scrolled)
+        scrollbar.rangeChanged.connect(self._on_range_changed)
+
+    def _set_terminal_style(self):
+        """Apply terminal-like styling to output display."""
+        # Set font to monospace
+        font = QFont("Consolas", 10)
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        self.setFont(font)
+
+        # Set black background with traditional green text
+        # Note: HTML colors will override this default
+        palette = self.palette()
+        palette.setColor(QPalette.ColorRole.Base, QColor(0, 0, 0))
+        palette.setColor(QPalette.ColorRole.Text, QColor(0, 255, 0))  # Traditional terminal green
+        self.setPalette(palette)
+
+        # Auto-scroll setting
+        self.setLineWrapMode(QTextEdit.LineWrapMode.WidgetWidth)
+
+        # Reduce line spacing and paragraph spacing for tighter display
+        document = self.document()
+        document.setDocumentMargin(0)  # No margin
+        # Rows are rewritten in place; an undo stack would keep every version
+        document.setUndoRedoEnabled(False)
+
+        # Set default text block format to reduce spacing
+        cursor = self.textCursor()
+        format = QTextBlockFormat()
+        format.setLineHeight(100, 1)  # 1 = SingleHeight
+        format.setTopMargin(0)
+        format.setBottomMargin(0)
+        cursor.setBlockFormat(format)
+
+    def terminal_size(self):
+        """
+        Size of the viewport in character cells.
+
+        Returns:
+            (cols, rows) tuple
+        """
+        metrics = QFontMetrics(self.font())
+        viewport = self.viewport()
+        cols = max(20, viewport.width() // max(1, metrics.horizontalAdvance('M')))
+        rows = max(5, viewport.height() // max(1, metrics.lineSpacing()))
+        return cols, rows
+
+    def apply_update(self, update: ScreenUpdate):
+        """
+        Apply screen damage to the document.
+
+        Args:
+            update: Result of TerminalScreen.take_update()
+        """
+        if update.empty and update.row_count == self._screen_rows:
+            return
+        cursor = QTextCursor(self.document())
+        cursor.beginEditBlock()
+        try:
+            if update.scrolled:
+                self._insert_history(cursor, update.scrolled)
+                if self._history_blocks >= self._max_lines + AppConstants.SCROLLBACK_TRIM_BATCH:
+                    self._trim_history()
+            self._set_screen_rows(cursor, update.row_count)
+            for y, runs in update.rows.items():
+                self._render_row(cursor, y, runs)
+        finally:
+            cursor.endEditBlock()
+
+    def _on_scrolled(self, value):
+        self._at_bottom = value >= self.verticalScrollBar().maximum()
+
+    def _on_range_changed(self, minimum, maximum):
+        """Stay at the bottom as the document grows, unless scrolled back."""
+        if self._auto_scroll and self._at_bottom:
+            self.verticalScrollBar().setValue(maximum)
+
+    def commit_screen(self):
+        """Keep the rows shown so far as scrollback and start an empty screen area."""
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertBlock()
+        self._history_blocks += self._screen_rows
+        self._screen_rows = 1
+
+    def clear_output(self):
+        """Remove all output, including archived lines."""
+        self.clear()
+        self._history_blocks = 0
+        self._screen_rows = 1
+        self._trimmed_lines = 0
+        if self._archive is not None:
+            self._archive = ScrollbackArchive(self._archive.max_lines)
+
+    def history_lines(self):
+        """Scrollback as runs (plain text; styles are not kept), oldest first."""
+        lines = []
+        block = self.document().firstBlock()
+        for _ in range(self._history_blocks):
+            text = block.text()
+            lines.append([(text, 0)] if text else [])
+            block = block.next()
+        return lines
+
+    def load_history(self, lines):
+        """Replace the scrollback with lines of runs (used when switching renderers)."""
+        self.clear_output()
+        if lines:
+            cursor = QTextCursor(self.document())
+            cursor.beginEditBlock()
+            self._insert_history(cursor, lines)
+            self._trim_history()
+            cursor.endEditBlock()
+
+    def insert_history(self, lines, before_last):
+        """
+        Insert older scrollback lines before the newest history lines
+        (lazy catch-up after a tab was hidden).
+
+        Args:
+            lines: Lines of runs, oldest first
+            before_last: Number of existing history lines that stay after them
+        """
+        index = max(0, self._history_blocks - before_last)
+        cursor = QTextCursor(self.document())
+        cursor.beginEditBlock()
+        cursor.setPosition(self.document().findBlockByNumber(index).position())
+        for runs in lines:
+            self._insert_runs(cursor, runs)
+            cursor.insertBlock()
+        self._history_blocks += len(lines)
+        if self._history_blocks >= self._max_lines + AppConstants.SCROLLBACK_TRIM_BATCH:
+            self._trim_history()
+        cursor.endEditBlock()
+
+    def drop_lines(self, lines):
+        """
+        Account for lines that went past the scrollback limit before they
+        were drawn. Everything in the document's history is older, so it
+        is trimmed first; the archive receives both in order.
+
+        Args:
+            lines: Lines of runs, oldest first
+        """
+        max_lines, self._max_lines = self._max_lines, 0
+        self._trim_history()
+        self._max_lines = max_lines
+        if self._archive is not None:
+            self._archive.append(''.join(text for text, _ in runs) for runs in lines)
+        self._trimmed_lines += len(lines)
+
+    def _insert_history(self, cursor, lines):
+        """Insert scrolled-off lines between the scrollback and the screen rows."""
+        block = self.document().findBlockByNumber(self._history_blocks)
+        cursor.setPosition(block.position())
+        for runs in lines:
+            self._insert_runs(cursor, runs)
+            cursor.insertBlock()
+        self._history_blocks += len(lines)
+
+    def _trim_history(self):
+        """
+        Remove the oldest scrollback blocks down to max_lines in one edit,
+        archiving their text when the cold tier is enabled.
+        """
+        excess = self._history_blocks - self._max_lines
+        if excess <= 0:
+            return
+        document = self.document()
+        if self._archive is not None:
+            lines = []
+            block = document.firstBlock()
+            for _ in range(excess):
+                lines.append(block.text())
+                block = block.next()
+            self._archive.append(lines)
+
+        first_kept = document.findBlockByNumber(excess)
+        removed_height = document.documentLayout().blockBoundingRect(first_kept).top()
+        cursor = QTextCursor(document)
+        cursor.setPosition(first_kept.position(), QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+        self._history_blocks -= excess
+        self._trimmed_lines += excess
+        if not self._at_bottom:
+            # Keep the lines being read in place
+            scrollbar = self.verticalScrollBar()
+            scrollbar.setValue(max(0, scrollbar.value() - int(removed_height)))
+
+    def apply_settings(self, settings: TerminalSettings):
+        """
+        Apply scrollback and auto-scroll settings; a lower limit takes
+        effect immediately.
+
+        Args:
+            settings: Terminal settings
+        """
+        self._max_lines = max(1, settings.max_lines)
+        self._auto_scroll = settings.scroll_on_output
+        if not settings.archive_scrollback:
+            self._archive = None
+        elif self._archive is None:
+            self._archive = ScrollbackArchive(settings.archive_max_lines, first_line=self._trimmed_lines)
+        else:
+            self._archive.max_lines = settings.archive_max_lines
+        self._trim_history()
+
+    def search_scrollback(self, pattern, regex=False, ignore_case=True, limit=500):
+        """
+        Search archived and live output, oldest first.
+
+        Args:
+            pattern: Text or regular expression
+            regex: Treat pattern as a regular expression
+            ignore_case: Case-insensitive match
+            limit: Maximum number of results
+
+        Returns:
+            List of (line number, text); numbers count from the last clear
+        """
+        results = self._archive.search(pattern, regex, ignore_case, limit) if self._archive else []
+        matcher = compile_pattern(pattern, regex, ignore_case)
+        block = self.document().firstBlock()
+        number = self._trimmed_lines
+        while block.isValid() and len(results) < limit:
+            text = block.text()
+            if matcher(text):
+                results.append((number, text))
+            block = block.next()
+            number += 1
+        return results
+
+    def _set_screen_rows(self, cursor, count):
+        """Add or remove blocks at the end so the screen area has count rows."""
+        if count > self._screen_rows:
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            for _ in range(count - self._screen_rows):
+                cursor.insertBlock()
+        elif count < self._screen_rows:
+            block = self.document().findBlockByNumber(self._history_blocks + count - 1)
+            cursor.setPosition(block.position() + block.length() - 1)
+            cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+            cursor.removeSelectedText()
+        self._screen_rows = count
+
+    def _render_row(self, cursor, y, runs):
+        """Replace the contents of screen row y."""
+        if y >= self._screen_rows:
+            return
+        block = self.document().findBlockByNumber(self._history_blocks + y)
+        cursor.setPosition(block.position())
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+        self._insert_runs(cursor, runs)
+
+    def _insert_runs(self, cursor, runs):
+        """Insert one line of runs at the cursor."""
+        for text, style_id in runs:
+            cursor.insertText(text, self._styles.cached(style_id, 'format', self._build_format))
+
+    @staticmethod
+    def _build_format(style):
+        """QTextCharFormat for a style (default colors are set explicitly)."""
+        fmt = QTextCharFormat()
+        fg, bg = StyleTable.colors(style)
+        color = QColor(fg or StyleTable.DEFAULT_FG)
+        if style.dim:
+            color.setAlpha(160)
+        fmt.setForeground(color)
+        if bg:
+            fmt.setBackground(QColor(bg))
+        if style.bold:
+            fmt.setFontWeight(QFont.Weight.Bold)
+        fmt.setFontItalic(style.italic)
+        fmt.setFontUnderline(style.underline)
+        fmt.setFontStrikeOut(style.strike)
+        return fmt
+
+
+class HtmlTerminalView(TextTerminalView):
+    """
+    TextTerminalView that inserts rows through insertHtml with the
+    StyleTable's cached <span> tags (the previous insertion path).
+    """
+
+    def _insert_runs(self, cursor, runs):
+        if runs:
+            cursor.insertHtml(self._runs_html(runs))
+
+    def _runs_html(self, runs):
+        """HTML for one row; white-space: pre keeps column alignment."""
+        parts = ['<span style="white-space: pre">']
+        for text, style_id in runs:
+            if style_id:
+                parts.append(f'{self._styles.span_open(style_id)}{html.escape(text, quote=False)}</span>')
+            else:
+                parts.append(html.escape(text, quote=False))
+        parts.append('</span>')
+        return ''.join(parts)
@@ -0,0 +1,136 @@
+"""
+Throughput benchmark for ANSI to HTML conversion.
+
+Compares the streaming, tokenizer based ANSItoHTML with the original
+regex-chain implementation on colorized `ls -la` style output.
+
+Usage:
+    python tests/bench_ansi_filter.py [size_mb]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.ansi_filter import ANSItoHTML  # noqa: E402
+from utils.ansi_style import BASIC_COLORS  # noqa: E402
+
+
+class LegacyANSItoHTML:
+    """The original convert(): placeholders, ten substitutions, restore, split."""
+
+    LINE_BREAK = ANSItoHTML.LINE_BREAK
+
+    csi_pattern = re.compile(r'\x1b\[([0-9;]*)m')
+    control_patterns = [
+        re.compile(r'\x1b\[[0-9;]*[GKHfABCDsu]'),
+        re.compile(r'\x1b\][^\x07\x1b]*[\x07\x1b\\]'),
+        re.compile(r'\x1b\?\d+[hl]'),
+        re.compile(r'\[\?2004[hl]'),
+        re.compile(r'\x1bP[^\x1b]*\x1b\\'),
+        re.compile(r'\x1b\[[0-9;]*n'),
+        re.compile(r'\x1b\[>[0-9;]*l'),
+        re.compile(r'\x1b\[[0-9;]*r'),
+        re.compile(r'\x1b\[\?[0-9;]*[lh]'),
+        re.compile(r'\[\?[0-9;]*[hl]'),
+    ]
+
+    def convert(self, text):
+        placeholders = []
+
+        def protect(match):
+            placeholders.append(match.group(0))
+            return f'\x00SGR{len(placeholders) - 1}\x00'
+
+        cleaned = self.csi_pattern.sub(protect, text)
+        for pattern in self.control_patterns:
+            cleaned = pattern.sub('', cleaned)
+        cleaned = cleaned.replace('\x1b', '')
+        for i, seq in enumerate(placeholders):
+            cleaned = cleaned.replace(f'\x00SGR{i}\x00', seq)
+
+        parts = self.csi_pattern.split(cleaned)
+        result = []
+        style = {}
+        for i, part in enumerate(parts):
+            if i % 2 == 0:
+                if part:
+                    escaped = self._escape_html(part).replace('\n', self.LINE_BREAK)
+                    if style:
+                        result.append(f'<span style="{self._build_style(style)}">{escaped}</span>')
+                    else:
+                        result.append(escaped)
+            else:
+                style = self._parse_ansi_codes(part)
+        return ''.join(result)
+
+    @staticmethod
+    def _escape_html(text):
+        return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+    @staticmethod
+    def _parse_ansi_codes(codes):
+        style = {}
+        for code in codes.split(';'):
+            num = int(code) if code else 0
+            if num == 0:
+                return {}
+            elif num == 1:
+                style['bold'] = True
+            elif 30 <= num <= 37:
+                style['color'] = BASIC_COLORS[num - 30]
+            elif 90 <= num <= 97:
+                style['color'] = BASIC_COLORS[num - 82]
+            elif 40 <= num <= 47:
+                style['background-color'] = BASIC_COLORS[num - 40]
+        return style
+
+    @staticmethod
+    def _build_style(style):
+        parts = ['font-weight: bold'] if style.get('bold') else []
+        parts += [f"{key}: {style[key]}" for key in ('color', 'background-color') if key in style]
+        return '; '.join(parts)
+
+
+def sample_output(size: int) -> str:
+    """Colorized `ls -la` listing of roughly the given size in characters."""
+    colors = ['01;34', '01;32', '01;36', '00', '01;31', '40;33;01']
+    lines = []
+    total = 0
+    i = 0
+    while total < size:
+        color = colors[i % len(colors)]
+        line = (f"drwxr-xr-x  2 root root  4096 Jan  1 12:00 "
+                f"\x1b[{color}mentry_{i:06d}\x1b[0m\r\n")
+        lines.append(line)
+        total += len(line)
+        i += 1
+    return ''.join(lines)
+
+
+def measure(converter, chunks) -> float:
+    """Return throughput in MB/s converting all chunks."""
+    started = time.perf_counter()
+    for chunk in chunks:
+        converter.convert(chunk)
+    elapsed = time.perf_counter() - started
+    return sum(len(c) for c in chunks) / elapsed / 1e6
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    text = sample_output(int(size_mb * 1e6))
+    # Feed it the way the reader delivers it: 64 KB batches
+    chunks = [text[i:i + 65536] for i in range(0, len(text), 65536)]
+
+    legacy = measure(LegacyANSItoHTML(), chunks)
+    current = measure(ANSItoHTML(), chunks)
+    print(f"input:    {len(text) / 1e6:.1f} MB in {len(chunks)} chunks")
+    print(f"legacy:   {legacy:8.2f} MB/s")
+    print(f"current:  {current:8.2f} MB/s  ({current / legacy:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Tests for the streaming ANSI tokenizer and the converter built on it.
+"""
+from utils.ansi_parser import (AnsiParser, tokenize, parse_params,
+                               TEXT, CTRL, SGR, CSI, OSC, ESC, STRING)
+from utils.ansi_filter import ANSItoHTML, strip_ansi
+
+
+class TestAnsiParser:
+    """Test suite for AnsiParser."""
+
+    def test_text_and_controls(self):
+        assert tokenize("ab\r\ncd") == [(TEXT, "ab"), (CTRL, "\r"), (CTRL, "\n"), (TEXT, "cd")]
+
+    def test_sgr_and_csi(self):
+        tokens = tokenize("\x1b[01;34mdir\x1b[0m\x1b[2J\x1b[?25l")
+        assert tokens == [
+            (SGR, "01;34"), (TEXT, "dir"), (SGR, "0"),
+            (CSI, "", "2", "", "J"), (CSI, "?", "25", "", "l"),
+        ]
+
+    def test_osc_string_and_escape(self):
+        tokens = tokenize("\x1b]0;title\x07\x1bPq#0\x1b\\\x1b(B\x1b7")
+        assert tokens == [
+            (OSC, "0;title"), (STRING, "P", "q#0"), (ESC, "(", "B"), (ESC, "", "7"),
+        ]
+
+    def test_sequence_split_across_feeds(self):
+        parser = AnsiParser()
+        assert parser.feed("ok \x1b[01;3") == [(TEXT, "ok ")]
+        assert parser.feed("1mred") == [(SGR, "01;31"), (TEXT, "red")]
+
+    def test_osc_split_at_string_terminator(self):
+        parser = AnsiParser()
+        assert parser.feed("\x1b]0;t\x1b") == []
+        assert parser.feed("\\$ ") == [(OSC, "0;t"), (TEXT, "$ ")]
+
+    def test_malformed_escape_dropped(self):
+        assert tokenize("a\x1b[1;2\x07b") == [(TEXT, "a"), (TEXT, "[1;2"), (CTRL, "\x07"), (TEXT, "b")]
+
+    def test_parse_params(self):
+        assert parse_params("") == [0]
+        assert parse_params("1;;31") == [1, 0, 31]
+        assert parse_params("38:5:196") == [38, 5, 196]
+        assert parse_params("", default=1) == [1]
+
+
+class TestANSItoHTML:
+    """Converter output on top of the tokenizer."""
+
+    def test_colored_span(self):
+        html = ANSItoHTML().convert("\x1b[1;31mred\x1b[0m plain")
+        assert html == '<span style="font-weight: bold; color: #cd0000">red</span> plain'
+
+    def test_html_escaped_and_line_breaks(self):
+        html = ANSItoHTML().convert("a<b>&c\r\nd")
+        assert html == f"a&lt;b&gt;&amp;c{ANSItoHTML.LINE_BREAK}d"
+
+    def test_non_sgr_sequences_removed(self):
+        html = ANSItoHTML().convert("\x1b[?2004h\x1b]0;user@host\x07$ \x1b[K")
+        assert html == "$ "
+
+    def test_strip_ansi_keeps_controls(self):
+        assert strip_ansi("\x1b[01;32muser\x1b[00m:~$ ls\r\n") == "user:~$ ls\r\n"
@@ -0,0 +1,79 @@
+"""
+Tests for style interning and the streaming ANSI converter.
+"""
+from utils.ansi_style import StyleTable, Style, apply_sgr, DEFAULT_STYLE, PALETTE_256
+from utils.ansi_filter import ANSItoHTML
+
+
+class TestApplySgr:
+    """SGR attributes accumulate like a terminal."""
+
+    def test_attributes_accumulate(self):
+        style = apply_sgr(apply_sgr(DEFAULT_STYLE, "1"), "31")
+        assert style.bold and style.fg == '#cd0000'
+
+    def test_selective_reset(self):
+        style = apply_sgr(DEFAULT_STYLE, "1;4;32")
+        style = apply_sgr(style, "24;39")
+        assert style == Style(bold=True)
+
+    def test_256_and_truecolor(self):
+        assert apply_sgr(DEFAULT_STYLE, "38;5;196").fg == PALETTE_256[196] == '#ff0000'
+        assert apply_sgr(DEFAULT_STYLE, "48;2;1;2;3").bg == '#010203'
+        assert apply_sgr(DEFAULT_STYLE, "38:5:21").fg == '#0000ff'
+
+    def test_reset(self):
+        assert apply_sgr(apply_sgr(DEFAULT_STYLE, "1;31;44"), "0") == DEFAULT_STYLE
+        assert apply_sgr(apply_sgr(DEFAULT_STYLE, "1"), "") == DEFAULT_STYLE
+
+
+class TestStyleTable:
+    """Test suite for StyleTable."""
+
+    def test_interning_is_stable(self):
+        table = StyleTable()
+        red = table.apply_sgr(0, "31")
+        assert table.apply_sgr(0, "31") == red
+        assert table.intern(Style(fg='#cd0000')) == red
+        assert table.apply_sgr(red, "0") == 0
+
+    def test_artifacts_built_once(self):
+        table = StyleTable()
+        calls = []
+        style_id = table.apply_sgr(0, "1;32")
+
+        for _ in range(3):
+            table.cached(style_id, 'format', lambda style: calls.append(style) or object())
+
+        assert len(calls) == 1
+        assert table.span_open(style_id) is table.span_open(style_id)
+        assert table.span_open(0) == ''
+
+    def test_inverse_swaps_colors(self):
+        table = StyleTable()
+        assert 'background-color: #00ff00' in table.css(table.apply_sgr(0, "7"))
+
+
+class TestStreamingConverter:
+    """ANSItoHTML keeps its style across convert() calls."""
+
+    def test_color_survives_chunk_boundary(self):
+        converter = ANSItoHTML()
+        converter.convert("\x1b[31mred ")
+        assert converter.convert("still red") == '<span style="color: #cd0000">still red</span>'
+
+    def test_sequence_split_across_chunks(self):
+        converter = ANSItoHTML()
+        assert converter.convert("a\x1b[3") == "a"
+        assert converter.convert("2mb") == '<span style="color: #00cd00">b</span>'
+
+    def test_sessions_do_not_share_state(self):
+        first, second = ANSItoHTML(), ANSItoHTML()
+        first.convert("\x1b[1;31m")
+        assert second.convert("plain") == "plain"
+
+    def test_reset_state(self):
+        converter = ANSItoHTML()
+        converter.convert("\x1b[31m\x1b[")
+        converter.reset_state()
+        assert converter.convert("x") == "x"
@@ -0,0 +1,116 @@
+"""
+Tests for BroadcastRunner and result aggregation.
+"""
+import threading
+import time
+from managers.broadcast_runner import BroadcastRunner, group_outputs, diff_outputs, target_labels
+from models.connection_profile import ConnectionProfile
+from models.exec_channel import ExecResult
+
+
+class TestBroadcastRunner:
+    """Test suite for BroadcastRunner."""
+
+    def _profiles(self, count, host=None):
+        return [ConnectionProfile(name=f"web{i}", host=host or f"10.0.0.{i}", username="ops")
+                for i in range(count)]
+
+    def test_runs_on_every_host(self, qtbot, mocker):
+        registry = mocker.Mock()
+        mocker.patch('managers.broadcast_runner.run_exec',
+                     side_effect=lambda transport, command, timeout: ExecResult(command=command, exit_code=0, stdout="ok\n"))
+        runner = BroadcastRunner(registry)
+
+        with qtbot.waitSignal(runner.finished, timeout=5000):
+            runner.start(self._profiles(5), "uptime", timeout=5)
+
+        assert sorted(runner.results) == [f"web{i}" for i in range(5)]
+        assert all(r.ok for r in runner.results.values())
+        assert registry.acquire.call_count == registry.release.call_count == 5
+
+    def test_per_host_limit(self, qtbot, mocker):
+        """Profiles on the same host never exceed the per-host limit."""
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def fake_exec(transport, command, timeout):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+            return ExecResult(command=command, exit_code=0)
+
+        mocker.patch('managers.broadcast_runner.run_exec', side_effect=fake_exec)
+        runner = BroadcastRunner(mocker.Mock())
+
+        with qtbot.waitSignal(runner.finished, timeout=5000):
+            runner.start(self._profiles(6, host="10.0.0.1"), "true", max_parallel=6, per_host_limit=2)
+
+        assert max(peak) <= 2
+
+    def test_connection_failure_is_a_result(self, qtbot, mocker):
+        registry = mocker.Mock()
+        registry.acquire.side_effect = OSError("refused")
+        runner = BroadcastRunner(registry)
+
+        with qtbot.waitSignal(runner.finished, timeout=5000):
+            runner.start(self._profiles(2), "uptime")
+
+        assert all("refused" in r.error for r in runner.results.values())
+        registry.release.assert_not_called()
+
+    def test_duplicate_names_keep_separate_results(self, qtbot, mocker):
+        mocker.patch('managers.broadcast_runner.run_exec',
+                     side_effect=lambda transport, command, timeout: ExecResult(command=command, exit_code=0))
+        runner = BroadcastRunner(mocker.Mock())
+        profiles = [ConnectionProfile(name="web", host=f"10.0.0.{i}", username="ops") for i in range(3)]
+
+        with qtbot.waitSignal(runner.finished, timeout=5000):
+            runner.start(profiles, "uptime")
+
+        assert sorted(runner.results) == sorted(target_labels(profiles))
+        assert len(runner.results) == 3
+
+    def test_empty_target_list_finishes(self, qtbot, mocker):
+        runner = BroadcastRunner(mocker.Mock())
+        with qtbot.waitSignal(runner.finished, timeout=1000):
+            runner.start([], "uptime")
+
+
+class TestAggregation:
+    """Tests for grouping and diffing host outputs."""
+
+    def test_target_labels_unique(self):
+        profiles = [
+            ConnectionProfile(name="db", host="10.0.0.1", username="ops"),
+            ConnectionProfile(name="web", host="10.0.0.2", username="ops"),
+            ConnectionProfile(name="web", host="10.0.0.3", username="ops"),
+            ConnectionProfile(name="web", host="10.0.0.3", username="ops"),
+        ]
+        assert target_labels(profiles) == [
+            "db",
+            "web (ops@10.0.0.2:22)",
+            "web (ops@10.0.0.3:22)",
+            "web (ops@10.0.0.3:22) #2",
+        ]
+
+    def test_group_identical_outputs(self):
+        results = {
+            "a": ExecResult(command="x", exit_code=0, stdout="same\n"),
+            "b": ExecResult(command="x", exit_code=0, stdout="same\n"),
+            "c": ExecResult(command="x", exit_code=0, stdout="other\n"),
+        }
+        groups = group_outputs(results)
+        assert groups[0] == ("same\n", ["a", "b"])
+        assert groups[1] == ("other\n", ["c"])
+
+    def test_diff_against_baseline(self):
+        base = ExecResult(command="x", stdout="/dev/sda1 40%\n/dev/sdb1 10%\n")
+        other = ExecResult(command="x", stdout="/dev/sda1 95%\n/dev/sdb1 10%\n")
+        diff = diff_outputs("a", base, "b", other)
+        assert "-/dev/sda1 40%" in diff
+        assert "+/dev/sda1 95%" in diff
+        assert diff_outputs("a", base, "a2", base) == ""
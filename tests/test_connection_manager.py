@@ -226,3 +226,45 @@ class TestConnectionManager:
             conn_ids.append(conn_id)
 
         assert conn_ids == ["conn_1", "conn_2", "conn_3", "conn_4", "conn_5"]
+
+    def test_create_connection_async_registers_immediately(self, qtbot, mocker):
+        """Test that async creation registers the connection before it connects."""
+        manager = ConnectionManager()
+
+        mock_handler = mocker.Mock(spec=SSHHandler)
+        mock_handler.is_connected = False
+        mock_handler.connect_async.return_value = True
+
+        mocker.patch('managers.connection_manager.SSHHandler', return_value=mock_handler)
+
+        profile = ConnectionProfile(name="test", host="192.168.1.1", username="user")
+
+        with qtbot.wait_signal(manager.connection_added, timeout=1000):
+            conn_id = manager.create_connection_async(profile)
+
+        assert manager.has_connection(conn_id)
+        mock_handler.connect.assert_not_called()
+        mock_handler.connect_async.assert_called_once_with(
+            host="192.168.1.1",
+            port=22,
+            username="user",
+            password="",
+            timeout=10
+        )
+
+    def test_create_connection_async_failure(self, qtbot, mocker):
+        """Test that a failed background connection is reported and removed."""
+        manager = ConnectionManager()
+
+        mock_handler = mocker.Mock(spec=SSHHandler)
+        mocker.patch('managers.connection_manager.SSHHandler', return_value=mock_handler)
+
+        profile = ConnectionProfile(name="test", host="192.168.1.1", username="user")
+        conn_id = manager.create_connection_async(profile)
+
+        with qtbot.wait_signal(manager.connection_error, timeout=1000) as blocker:
+            manager._on_connect_finished(conn_id, False, "Authentication failed")
+
+        assert blocker.args == [conn_id, "Authentication failed"]
+        assert not manager.has_connection(conn_id)
+        mock_handler.close.assert_called_once()
@@ -0,0 +1,73 @@
+"""
+Tests for ConnectionSupervisor.
+"""
+from managers.connection_supervisor import ConnectionSupervisor
+from models.connection_handler import ConnectionStatus
+from models.ssh_handler import SSHHandler
+
+
+class TestConnectionSupervisor:
+    """Test suite for ConnectionSupervisor."""
+
+    def _dropped_handler(self, mocker):
+        handler = mocker.Mock(spec=SSHHandler)
+        handler.connection_dropped = True
+        handler.is_connected = False
+        return handler
+
+    def test_dropped_connection_schedules_reconnect(self, qtbot, mocker):
+        """A dropped link is retried with a jittered first delay."""
+        supervisor = ConnectionSupervisor()
+        handler = self._dropped_handler(mocker)
+        supervisor.watch("conn_1", handler)
+
+        supervisor._on_connection_lost("conn_1", "Read error")
+
+        handler._set_status.assert_called_with(ConnectionStatus.RECONNECTING)
+        attempt, delay = handler.reconnecting.emit.call_args[0]
+        assert attempt == 1
+        assert 0.5 <= delay <= 1.0
+        supervisor.unwatch("conn_1")
+
+    def test_shell_exit_does_not_reconnect(self, qtbot, mocker):
+        supervisor = ConnectionSupervisor()
+        handler = self._dropped_handler(mocker)
+        handler.connection_dropped = False
+        supervisor.watch("conn_1", handler)
+
+        supervisor._on_connection_lost("conn_1", "Connection closed")
+
+        handler.reconnecting.emit.assert_not_called()
+
+    def test_backoff_grows_and_gives_up(self, qtbot, mocker):
+        """Delays double per attempt and stop after the configured maximum."""
+        supervisor = ConnectionSupervisor()
+        handler = self._dropped_handler(mocker)
+        supervisor.watch("conn_1", handler)
+        max_attempts = supervisor._settings().reconnect_max_attempts
+
+        supervisor._on_connection_lost("conn_1", "Read error")
+        for _ in range(max_attempts - 1):
+            supervisor._on_connect_finished("conn_1", False, "timed out")
+
+        delays = [c[0][1] for c in handler.reconnecting.emit.call_args_list]
+        assert len(delays) == max_attempts
+        assert delays[-1] > delays[0]
+
+        with qtbot.wait_signal(supervisor.reconnect_failed, timeout=1000):
+            supervisor._on_connect_finished("conn_1", False, "timed out")
+        handler._set_status.assert_called_with(ConnectionStatus.ERROR)
+
+    def test_successful_reconnect_resets_attempts(self, qtbot, mocker):
+        supervisor = ConnectionSupervisor()
+        handler = self._dropped_handler(mocker)
+        supervisor.watch("conn_1", handler)
+
+        supervisor._on_connection_lost("conn_1", "Read error")
+        with qtbot.wait_signal(supervisor.reconnected, timeout=1000):
+            supervisor._on_connect_finished("conn_1", True, "Connected successfully")
+
+        supervisor._on_connection_lost("conn_1", "Read error")
+        attempt, _ = handler.reconnecting.emit.call_args[0]
+        assert attempt == 1
+        supervisor.unwatch("conn_1")
@@ -0,0 +1,134 @@
+"""
+Tests for the terminal context ring.
+"""
+import random
+from ai.context_manager import TerminalContext
+from config.constants import AppConstants
+
+
+def reference_context(lines, max_chars, last_n=None):
+    """The original full-join implementation of get_context."""
+    context = '\n'.join(lines[-last_n:] if last_n else lines)
+    if len(context) > max_chars:
+        context = context[-max_chars:]
+        first_newline = context.find('\n')
+        if first_newline > 0:
+            context = context[first_newline + 1:]
+    return context
+
+
+class TestTerminalContext:
+    """Test suite for TerminalContext."""
+
+    def test_size_is_exact_after_eviction(self):
+        context = TerminalContext(max_lines=3, max_chars=100)
+        context.append("aa\nbbb\ncccc\nd")
+        assert list(context.buffer) == ["bbb", "cccc", "d"]
+        assert context.size() == len(str(context)) == 10
+        context.clear()
+        assert context.size() == 0
+
+    def test_buffer_bounded_by_characters(self):
+        context = TerminalContext(max_lines=1000, max_chars=100, max_buffer_chars=50)
+        for i in range(100):
+            context.append(f"line {i:04d}\n")
+        assert context.size() <= 50
+        assert str(context).endswith("line 0099\n")
+        context.append("x" * 200)
+        assert list(context.buffer) == ["x" * 200]
+
+    def test_context_and_tail_match_full_join(self):
+        rng = random.Random(7)
+        context = TerminalContext(max_lines=200, max_chars=300)
+        for _ in range(300):
+            context.append('\n'.join('y' * rng.randint(0, 40) for _ in range(rng.randint(1, 4))))
+            lines = list(context.buffer)
+            assert context.get_context() == reference_context(lines, 300)
+            assert context.get_last_lines(5) == reference_context(lines, 300, 5)
+            count = rng.randint(1, 500)
+            assert context.get_tail(count) == '\n'.join(lines)[-count:]
+
+    def test_appends_continue_the_open_line(self):
+        context = TerminalContext()
+        context.append("user@host:~$ ")
+        context.append("ls\r\nfile")
+        context.append("1\r\n")
+        assert list(context.buffer) == ["user@host:~$ ls\r", "file1\r", ""]
+        assert context.size() == len(str(context))
+
+    def test_segments_from_echo_and_prompt_lines(self):
+        context = TerminalContext()
+        context.append("old output\r\nuser@host:~$ ")
+        context.mark_command("df -h")
+        context.append("df -h\r\n/dev/sda1 40G\r\nuser@host:~$ ")
+        segment = context.last_segment()
+        assert segment.command == "df -h"
+        assert context.get_command_output() == "user@host:~$ df -h\n/dev/sda1 40G"
+
+        context.append("uptime\r\n 10:00 up 3 days\r\n[root@web ~]# ")
+        assert context.last_segment().command == "uptime"
+        assert context.segment_lines(context.segments[0]) == ["user@host:~$ df -h", "/dev/sda1 40G"]
+
+    def test_comment_lines_are_not_commands(self):
+        context = TerminalContext()
+        context.mark_command("cat sshd_config")
+        context.append("$ cat sshd_config\r\n# Port 22\r\n> quoted\r\nPort 2222\r\n")
+        assert [s.command for s in context.segments] == ["cat sshd_config"]
+
+    def test_echo_must_be_whole_command_line(self):
+        """Output of the previous command ending in the command text is not its echo."""
+        context = TerminalContext()
+        context.append("user@host:~$ find .\r\n")
+        context.mark_command("ls")
+        context.append("./build_tools\r\nuser@host:~$ ls\r\nfile\r\n")
+        assert [s.command for s in context.segments] == ["find .", "ls"]
+        assert context.get_command_output(compact=False) == "user@host:~$ ls\nfile"
+
+    def test_unmatched_echo_expires(self):
+        """A wrapped echo must not block segments of later commands."""
+        context = TerminalContext()
+        context.mark_command("cat " + "x" * 100)
+        context.append("$ cat " + "x" * 70 + "\r\n" + "x" * 30 + "\r\n")
+        context.append(''.join(f"line {i}\r\n" for i in range(AppConstants.CONTEXT_ECHO_WINDOW_LINES)))
+        context.mark_command("uptime")
+        context.append("$ uptime\r\n 10:00 up\r\n$ ")
+        assert [s.command for s in context.segments] == ["uptime"]
+
+    def test_huge_output_keeps_head_and_tail(self):
+        context = TerminalContext(max_lines=2000, max_chars=300)
+        context.mark_command("seq 1000")
+        context.append("$ seq 1000\n" + '\n'.join(str(i) for i in range(1, 1001)) + "\n$ ")
+        output = context.get_command_output(compact=False)
+        assert len(output) <= 330
+        assert output.startswith("$ seq 1000\n1\n2\n")
+        assert output.endswith("\n999\n1000")
+        assert "lines omitted" in output
+
+    def test_evicted_segments_are_dropped(self):
+        context = TerminalContext(max_lines=5)
+        for i in range(4):
+            context.append(f"user@host:~$ cmd{i}\nout{i}\n")
+        assert [s.command for s in context.segments] == ["cmd2", "cmd3"]
+        assert context.segment_lines(context.segments[0]) == ["user@host:~$ cmd2", "out2"]
+
+    def test_delta_since_high_water_mark(self):
+        context = TerminalContext()
+        context.append("user@host:~$ uptime\r\n 10:00 up\r\nuser@host:~$ ")
+        mark = context.high_water_mark()
+        assert context.get_delta(mark) == ""
+        context.append("df -h\r\n/dev/sda1 40G\r\nuser@host:~$ ")
+        assert context.get_delta(mark) == "user@host:~$ df -h\n/dev/sda1 40G\nuser@host:~$ "
+        assert context.get_delta(None) is None
+
+    def test_delta_needs_snapshot_after_rollover_or_clear(self):
+        context = TerminalContext(max_lines=5)
+        context.append("a\nb\n")
+        mark = context.high_water_mark()
+        context.append("c\nd\n")
+        assert context.get_delta(mark) == "c\nd"
+        context.append("e\nf\ng\n")
+        assert context.get_delta(mark) is None
+        mark = context.high_water_mark()
+        context.clear()
+        context.append("h\n")
+        assert context.get_delta(mark) is None
@@ -0,0 +1,169 @@
+"""
+Tests for exec channel command execution.
+"""
+import socket
+import threading
+import time
+from config.constants import AppConstants
+from models.exec_channel import run_exec
+
+
+class FakeExecChannel:
+    """Replays a script of stdout/stderr chunks, then reports an exit status."""
+
+    def __init__(self, stdout=(), stderr=(), exit_code=0, hang=False, with_exit=()):
+        self._stdout = list(stdout)
+        self._stderr = list(stderr)
+        self._exit_code = exit_code
+        self._hang = hang
+        # (stream, chunk) pairs that arrive together with the exit status,
+        # after the recv_ready() checks (the transport thread's race)
+        self._with_exit = list(with_exit)
+        self._sock, self._peer = socket.socketpair()
+        self.closed = False
+        self.command = None
+        self.eof_received = False
+        self.status_event = threading.Event()
+
+    def exec_command(self, command):
+        self.command = command
+
+    def setblocking(self, flag):
+        pass
+
+    def fileno(self):
+        return self._sock.fileno()
+
+    def recv_ready(self):
+        return bool(self._stdout)
+
+    def recv(self, size):
+        return self._stdout.pop(0)
+
+    def recv_stderr_ready(self):
+        return bool(self._stderr)
+
+    def recv_stderr(self, size):
+        return self._stderr.pop(0)
+
+    def exit_status_ready(self):
+        if self._with_exit and not self._hang:
+            for stream, chunk in self._with_exit:
+                (self._stdout if stream == 'stdout' else self._stderr).append(chunk)
+            self._with_exit = []
+            return True
+        return not self._hang and not self._stdout and not self._stderr
+
+    def recv_exit_status(self):
+        return self._exit_code
+
+    def close(self):
+        self.closed = True
+
+
+class EndlessChannel(FakeExecChannel):
+    """Command that never stops printing (like yes)."""
+
+    def recv_ready(self):
+        return True
+
+    def recv(self, size):
+        return b"y\n" * (size // 2)
+
+
+class FakeTransport:
+    def __init__(self, channel):
+        self.channel = channel
+
+    def open_session(self, timeout=None):
+        return self.channel
+
+
+class TestRunExec:
+    """Test suite for run_exec."""
+
+    def test_collects_streams_and_exit_code(self):
+        channel = FakeExecChannel(stdout=[b"line1\n", b"line2\n"], stderr=[b"warn\n"], exit_code=3)
+
+        result = run_exec(FakeTransport(channel), "df -h")
+
+        assert channel.command == "df -h"
+        assert result.stdout == "line1\nline2\n"
+        assert result.stderr == "warn\n"
+        assert result.exit_code == 3
+        assert not result.ok
+        assert channel.closed
+
+    def test_streams_output_live(self):
+        channel = FakeExecChannel(stdout=[b"out"], stderr=[b"err"])
+        seen = []
+
+        result = run_exec(FakeTransport(channel), "true", on_output=lambda s, t: seen.append((s, t)))
+
+        assert seen == [("stdout", "out"), ("stderr", "err")]
+        assert result.ok
+
+    def test_multibyte_split_across_chunks(self):
+        data = "磁盘".encode('utf-8')
+        channel = FakeExecChannel(stdout=[data[:2], data[2:]])
+
+        assert run_exec(FakeTransport(channel), "echo").stdout == "磁盘"
+
+    def test_exit_reported_without_poll_delay(self):
+        """An exit status arriving after EOF ends the wait immediately."""
+        channel = FakeExecChannel(hang=True)
+        channel.eof_received = True
+
+        def exit_later():
+            time.sleep(0.05)
+            channel._hang = False
+            channel.status_event.set()
+
+        threading.Thread(target=exit_later).start()
+        result = run_exec(FakeTransport(channel), "true")
+
+        assert result.exit_code == 0
+        assert result.duration < AppConstants.SSH_EXEC_POLL_SEC
+
+    def test_output_buffered_with_exit_status_is_read(self):
+        channel = FakeExecChannel(with_exit=[('stdout', b"last "), ('stdout', b"chunk\n"), ('stderr', b"warn\n")])
+
+        result = run_exec(FakeTransport(channel), "echo")
+
+        assert result.stdout == "last chunk\n"
+        assert result.stderr == "warn\n"
+        assert result.exit_code == 0
+
+    def test_timeout_and_output_cap_while_streaming(self, mocker):
+        mocker.patch.object(AppConstants, 'SSH_EXEC_MAX_OUTPUT_CHARS', 1000)
+        channel = EndlessChannel(hang=True)
+        seen = []
+
+        result = run_exec(FakeTransport(channel), "yes", timeout=0.2,
+                          on_output=lambda stream, text: seen.append(len(text)))
+
+        assert result.timed_out
+        assert result.duration < 2
+        assert len(result.stdout) == 1000
+        assert result.truncated
+        assert sum(seen) > 1000
+        assert channel.closed
+
+    def test_timeout_closes_channel(self):
+        channel = FakeExecChannel(hang=True)
+
+        result = run_exec(FakeTransport(channel), "sleep 100", timeout=0.1)
+
+        assert result.timed_out
+        assert result.exit_code == -1
+        assert channel.closed
+
+    def test_open_failure_reported(self):
+        class BrokenTransport:
+            def open_session(self, timeout=None):
+                raise EOFError("transport closed")
+
+        result = run_exec(BrokenTransport(), "uptime")
+
+        assert result.error == "transport closed"
+        assert not result.ok
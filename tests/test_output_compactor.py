@@ -0,0 +1,50 @@
+"""
+Tests for the streaming output compactor.
+"""
+from ai.output_compactor import OutputCompactor, visible_text
+from ai.context_manager import TerminalContext
+
+
+def compact(lines):
+    compactor = OutputCompactor()
+    for number, line in enumerate(lines):
+        compactor.add(number, line)
+    return compactor, compactor.render(compactor.entries)
+
+
+class TestOutputCompactor:
+    """Test suite for OutputCompactor."""
+
+    def test_identical_lines_collapse(self):
+        compactor, lines = compact(["start"] + ["connection refused"] * 412 + ["end"])
+        assert lines == ["start", "connection refused [repeated 412 times]", "end"]
+        entry = compactor.entries[1]
+        assert (entry.first, entry.last) == (1, 412)
+
+    def test_near_duplicates_keep_first_and_last(self):
+        _, lines = compact([f"2024-01-01 10:00:{i:02d} worker {i} heartbeat ok" for i in range(30)])
+        assert lines == [
+            "2024-01-01 10:00:00 worker 0 heartbeat ok",
+            "... [28 similar lines] ...",
+            "2024-01-01 10:00:29 worker 29 heartbeat ok",
+        ]
+
+    def test_carriage_return_progress(self):
+        assert visible_text(" 10%\r 55%\r100% done\r") == "100% done"
+        _, lines = compact(["Downloading\r 1%\r 50%\r100%", "ok"])
+        assert lines == ["100%", "ok"]
+
+    def test_repeated_block(self):
+        trace = ["Traceback (most recent call last):", '  File "app.py", line 10', "ValueError: bad"]
+        compactor, lines = compact(trace * 5 + ["done"])
+        assert lines == trace + ["[previous 3 lines repeated 4 more times]", "done"]
+        assert compactor.entries[0].last == 14
+
+    def test_context_view_maps_back_to_raw_lines(self):
+        context = TerminalContext(max_chars=2000)
+        context.mark_command("tail app.log")
+        context.append("$ tail app.log\n" + "retrying\n" * 50 + "$ ")
+        assert context.get_command_output() == "$ tail app.log\nretrying [repeated 50 times]"
+        entry = context.compactor.entries[-1]
+        assert context.raw_lines(entry) == ["retrying"] * 50
+        assert context.get_context(compact=True) == "$ tail app.log\nretrying [repeated 50 times]\n$ "
@@ -0,0 +1,84 @@
+"""
+Tests for the per-session output processor.
+"""
+import threading
+from PyQt6.QtCore import Qt
+from models.output_processor import OutputProcessor
+from utils.terminal_screen import TerminalScreen
+
+
+class TestOutputProcessor:
+    """Test suite for OutputProcessor."""
+
+    def test_batch_produces_update_text_and_prompt(self):
+        processor = OutputProcessor(TerminalScreen(20, 3), [r"password:"])
+        result = processor.process([
+            ('remote', "\x1b[32mok\x1b[0m\r\n"),
+            ('remote', "Password: "),
+        ])
+        assert result.remote
+        assert result.text == "ok\r\nPassword: "
+        assert result.password_prompt
+        assert result.update.row_count == 2
+
+    def test_local_output_is_drawn_but_not_analysed(self):
+        processor = OutputProcessor(TerminalScreen(20, 3), [r"password:"])
+        result = processor.process([('local', "password: local\r\n", False)])
+        assert not result.remote
+        assert result.text == ""
+        assert not result.password_prompt
+        assert processor.screen.text()[0] == "password: local"
+        result = processor.process([('local', "\x1b[31mpassword: exec\x1b[0m", True)])
+        assert result.text == "password: exec"
+        assert not result.password_prompt
+
+    def test_commands_applied_in_order(self):
+        processor = OutputProcessor(TerminalScreen(10, 4))
+        result = processor.process([
+            ('remote', "1\r\n2\r\n3"),
+            ('resize', 10, 2),
+            ('remote', "\r\n4"),
+        ])
+        assert [runs[0][0] for runs in result.update.scrolled] == ["1", "2"]
+        assert processor.screen.text() == ["3", "4"]
+        processor.process([('reset', False)])
+        assert processor.screen.text() == ["", ""]
+
+    def test_reset_keeping_rows_scrolls_them_out(self):
+        processor = OutputProcessor(TerminalScreen(20, 3))
+        result = processor.process([
+            ('remote', "old\r\n$ "),
+            ('reset', True),
+            ('remote', "banner\r\n$ "),
+        ])
+        assert [''.join(t for t, _ in runs) for runs in result.update.scrolled] == ["old", "$"]
+        assert processor.screen.text() == ["banner", "$", ""]
+
+    def test_markers_follow_earlier_output(self):
+        processor = OutputProcessor(TerminalScreen(20, 3))
+        result = processor.process([('local', "out\r\n", True), ('marker', "done")])
+        assert result.text == "out\r\n"
+        assert result.markers == ["done"]
+
+    def test_worker_thread_emits_results(self):
+        processor = OutputProcessor(TerminalScreen(20, 3))
+        results = []
+        done = threading.Event()
+
+        def on_processed(result):
+            results.append(result)
+            if "end" in ''.join(r.text for r in results):
+                done.set()
+
+        # Emitted on the worker thread; no event loop runs to deliver queued calls
+        processor.processed.connect(on_processed, Qt.ConnectionType.DirectConnection)
+        processor.start()
+        try:
+            for i in range(50):
+                processor.submit(f"line {i}\r\n")
+            processor.submit("end")
+            assert done.wait(2.0)
+        finally:
+            processor.stop()
+        text = ''.join(r.text for r in results)
+        assert text.startswith("line 0\r\n") and text.endswith("end")
@@ -0,0 +1,44 @@
+"""
+Tests for the compressed scrollback archive.
+"""
+from utils.scrollback_archive import ScrollbackArchive, compile_pattern
+
+
+class TestScrollbackArchive:
+    """Test suite for ScrollbackArchive."""
+
+    def test_lines_compressed_in_chunks(self):
+        archive = ScrollbackArchive(max_lines=1000, chunk_lines=10)
+        archive.append(f"line {i}" for i in range(25))
+        assert len(archive) == 25
+        assert archive.compressed_size > 0
+        assert [n for n, _ in archive.iter_lines()] == list(range(25))
+        assert list(archive.iter_lines())[24] == (24, "line 24")
+
+    def test_oldest_chunks_dropped_beyond_max_lines(self):
+        archive = ScrollbackArchive(max_lines=20, chunk_lines=10)
+        archive.append(f"line {i}" for i in range(35))
+        numbers = [n for n, _ in archive.iter_lines()]
+        assert len(archive) <= 20
+        assert numbers[0] == 20
+        assert numbers[-1] == 34
+        assert archive.next_line == 35
+
+    def test_search_text_and_regex(self):
+        archive = ScrollbackArchive(chunk_lines=4, first_line=100)
+        archive.append(["GET /a 200", "GET /b 500", "post /c 200", "GET /d 502", "tail"])
+        assert archive.search("get /b") == [(101, "GET /b 500")]
+        assert archive.search(r" 5\d\d$", regex=True) == [(101, "GET /b 500"), (103, "GET /d 502")]
+        assert archive.search("POST", ignore_case=False) == []
+        assert archive.search("GET", limit=2) == [(100, "GET /a 200"), (101, "GET /b 500")]
+
+    def test_clear_keeps_numbering(self):
+        archive = ScrollbackArchive(chunk_lines=2)
+        archive.append(["a", "b", "c"])
+        archive.clear()
+        archive.append(["d"])
+        assert list(archive.iter_lines()) == [(3, "d")]
+
+    def test_compile_pattern(self):
+        assert compile_pattern("Err")("an error here")
+        assert not compile_pattern("Err", ignore_case=False)("an error here")
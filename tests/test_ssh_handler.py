@@ -0,0 +1,159 @@
+"""
+Tests for SSHHandler shell initialization.
+"""
+import socket
+import time
+from PyQt6.QtCore import Qt
+from models.ssh_handler import SSHHandler
+from config.constants import AppConstants
+
+
+class FakeShellChannel:
+    """Socketpair-backed channel that answers every write like an interactive shell."""
+
+    PROMPT = b"\x1b]0;user@host: ~\x07user@host:~$ "
+
+    def __init__(self, greeting: bytes = b""):
+        self._reader, self._writer = socket.socketpair()
+        self._reader.setblocking(False)
+        self.closed = False
+        self.eof_received = False
+        self.sent = []
+        if greeting:
+            self._writer.sendall(greeting)
+
+    def fileno(self):
+        return self._reader.fileno()
+
+    def recv_ready(self):
+        try:
+            return bool(self._reader.recv(1, socket.MSG_PEEK))
+        except BlockingIOError:
+            return False
+
+    def recv(self, size):
+        return self._reader.recv(size)
+
+    def sendall(self, data):
+        self.sent.append(data)
+        # Terminal echo of the line, then a fresh prompt
+        self._writer.sendall(data.replace('\n', '\r\n').encode() + self.PROMPT)
+
+
+class TestShellHandshake:
+    """Test suite for the prompt handshake in SSHHandler."""
+
+    def test_init_sent_in_one_write(self):
+        handler = SSHHandler()
+        handler.channel = FakeShellChannel(b"Welcome to Ubuntu\r\n" + FakeShellChannel.PROMPT)
+
+        handler._handshake_shell(time.monotonic())
+
+        assert handler.channel.sent == [SSHHandler.SHELL_INIT]
+        assert handler.time_to_prompt is not None
+
+    def test_init_echo_hidden(self):
+        """Banner is kept, the init command echo and the first prompt line are not."""
+        handler = SSHHandler()
+        handler.channel = FakeShellChannel(b"Welcome to Ubuntu\r\n" + FakeShellChannel.PROMPT)
+
+        banner = handler._handshake_shell(time.monotonic())
+
+        assert banner == "Welcome to Ubuntu\r\n" + FakeShellChannel.PROMPT.decode()
+        assert "alias" not in banner
+
+    def test_no_prompt_passes_output_through(self, mocker):
+        mocker.patch.object(AppConstants, 'SSH_PROMPT_TIMEOUT_SEC', 0.1)
+        handler = SSHHandler()
+        handler.channel = FakeShellChannel(b"Password expires soon")
+
+        banner = handler._handshake_shell(time.monotonic())
+
+        assert banner == "Password expires soon"
+        assert handler.time_to_prompt is None
+        assert handler.channel.sent == []
+
+    def test_prompt_detection(self):
+        assert SSHHandler._ends_with_prompt("motd\r\nroot@web01:~# ")
+        assert SSHHandler._ends_with_prompt("\x1b[01;32muser@host\x1b[00m:~$ ")
+        assert SSHHandler._ends_with_prompt("PS C:\\> ")
+        assert not SSHHandler._ends_with_prompt("Last login: Mon from 10.0.0.1\r\n")
+        assert not SSHHandler._ends_with_prompt("")
+
+    def test_prompt_after_start_needs_newline(self):
+        """The echo of the init line must finish before a prompt counts."""
+        text = "user@host:~$ "
+        assert not SSHHandler._ends_with_prompt(text, start=len(text))
+        text += " export X=1\r\nuser@host:~$ "
+        assert SSHHandler._ends_with_prompt(text, start=len("user@host:~$ "))
+
+
+class WindowedChannel:
+    """Accepts data in small writes, like a channel with a tight SSH window."""
+
+    def __init__(self, fail_after=None):
+        self.received = bytearray()
+        self.writes = 0
+        self.fail_after = fail_after
+
+    def sendall(self, data):
+        if self.fail_after is not None and len(self.received) >= self.fail_after:
+            raise socket.timeout()
+        self.writes += 1
+        self.received += data
+
+    def close(self):
+        pass
+
+
+class TestSendQueue:
+    """Test suite for the queued send path."""
+
+    def _connected_handler(self, channel):
+        handler = SSHHandler()
+        handler.channel = channel
+        handler._connected = True
+        return handler
+
+    def test_large_paste_sent_completely_in_chunks(self):
+        channel = WindowedChannel()
+        handler = self._connected_handler(channel)
+        progress = []
+        # Emitted on the send thread; record them there, no event loop runs here
+        handler.send_progress.connect(lambda sent, total: progress.append((sent, total)),
+                                      Qt.ConnectionType.DirectConnection)
+        payload = "x" * (5 * 1024 * 1024)
+
+        success, _ = handler.send_command(payload)
+        handler._send_queue.join()
+
+        assert success
+        assert bytes(channel.received) == (payload + "\n").encode()
+        assert channel.writes == len(progress) > 1
+        assert progress[-1] == (len(payload) + 1, len(payload) + 1)
+
+    def test_sends_keep_order(self):
+        channel = WindowedChannel()
+        handler = self._connected_handler(channel)
+
+        for i in range(50):
+            handler.send_command(f"echo {i}")
+        handler._send_queue.join()
+
+        assert channel.received.decode() == ''.join(f"echo {i}\n" for i in range(50))
+
+    def test_stalled_send_reports_failure(self):
+        channel = WindowedChannel(fail_after=AppConstants.SSH_SEND_CHUNK_SIZE)
+        handler = self._connected_handler(channel)
+        errors = []
+        handler.send_failed.connect(errors.append, Qt.ConnectionType.DirectConnection)
+
+        handler.send_command("y" * (AppConstants.SSH_SEND_CHUNK_SIZE * 3))
+        handler._send_queue.join()
+
+        assert len(errors) == 1
+        assert "stalled" in errors[0]
+
+    def test_not_connected(self):
+        handler = SSHHandler()
+        assert handler.send_command("ls") == (False, "Not connected to server")
@@ -0,0 +1,109 @@
+"""
+Tests for SSHReaderService.
+"""
+import socket
+import threading
+import time
+from models.ssh_reader import SSHReaderService
+
+
+class FakeChannel:
+    """Minimal stand-in for a Paramiko channel backed by a socketpair."""
+
+    def __init__(self):
+        self._reader, self.writer = socket.socketpair()
+        self._reader.setblocking(False)
+        self.closed = False
+        self.eof_received = False
+
+    def fileno(self):
+        return self._reader.fileno()
+
+    def recv_ready(self):
+        try:
+            return bool(self._reader.recv(1, socket.MSG_PEEK))
+        except BlockingIOError:
+            return False
+
+    def recv(self, size):
+        try:
+            return self._reader.recv(size)
+        except BlockingIOError:
+            return b''
+
+
+class RecordingHandler:
+    """Collects callbacks made by the reader thread."""
+
+    def __init__(self):
+        self.data = b''
+        self.batches = 0
+        self.closed_reason = None
+        self.received = threading.Event()
+        self.closed = threading.Event()
+
+    def _on_channel_data(self, data):
+        self.data += data
+        self.batches += 1
+        self.received.set()
+
+    def _on_channel_closed(self, reason):
+        self.closed_reason = reason
+        self.closed.set()
+
+
+class TestSSHReaderService:
+    """Test suite for SSHReaderService."""
+
+    def test_singleton(self):
+        """get_instance() always returns the same service."""
+        assert SSHReaderService.get_instance() is SSHReaderService.get_instance()
+
+    def test_delivers_data_from_many_channels(self):
+        """One service thread serves every registered channel."""
+        service = SSHReaderService.get_instance()
+        pairs = [(FakeChannel(), RecordingHandler()) for _ in range(5)]
+        for channel, handler in pairs:
+            service.register(handler, channel)
+
+        for i, (channel, handler) in enumerate(pairs):
+            channel.writer.send(f"host{i}".encode())
+
+        for i, (channel, handler) in enumerate(pairs):
+            assert handler.received.wait(2)
+            assert handler.data == f"host{i}".encode()
+            service.unregister(handler)
+
+    def test_reports_closed_channel(self):
+        """A closed channel is reported once and dropped."""
+        service = SSHReaderService.get_instance()
+        channel, handler = FakeChannel(), RecordingHandler()
+        service.register(handler, channel)
+
+        channel.closed = True
+        channel.writer.send(b'bye')
+
+        assert handler.closed.wait(2)
+        assert handler.data == b'bye'
+        assert handler.closed_reason == "Connection closed"
+
+    def test_coalesces_bursts_into_batches(self):
+        """A burst of small writes arrives as a few frame-sized batches."""
+        service = SSHReaderService.get_instance()
+        channel, handler = FakeChannel(), RecordingHandler()
+        service.register(handler, channel)
+
+        expected = b''
+        for i in range(200):
+            line = f"line {i}\n".encode()
+            channel.writer.send(line)
+            expected += line
+
+        for _ in range(100):
+            if handler.data == expected:
+                break
+            time.sleep(0.02)
+
+        assert handler.data == expected
+        assert handler.batches < 200
+        service.unregister(handler)
@@ -0,0 +1,54 @@
+"""
+Tests for TerminalStreamDecoder.
+"""
+from utils.stream_decoder import TerminalStreamDecoder
+
+
+def feed_bytewise(decoder, data: bytes) -> list:
+    """Feed data one byte at a time and collect non-empty outputs."""
+    return [out for out in (decoder.decode(data[i:i + 1]) for i in range(len(data))) if out]
+
+
+class TestTerminalStreamDecoder:
+    """Test suite for TerminalStreamDecoder."""
+
+    def test_plain_ascii_passes_through(self):
+        decoder = TerminalStreamDecoder()
+        assert decoder.decode(b"hello\r\n") == "hello\r\n"
+
+    def test_cjk_split_across_chunks(self):
+        """Multibyte characters split at a chunk boundary are not dropped."""
+        data = "磁盘空间".encode('utf-8')
+        decoder = TerminalStreamDecoder()
+        text = decoder.decode(data[:4]) + decoder.decode(data[4:])
+        assert text == "磁盘空间"
+
+    def test_csi_held_until_complete(self):
+        decoder = TerminalStreamDecoder()
+        assert decoder.decode(b"ok \x1b[01;3") == "ok "
+        assert decoder.decode(b"4mdir\x1b[0m") == "\x1b[01;34mdir\x1b[0m"
+
+    def test_bytewise_feed_never_splits_sequences(self):
+        """Every emitted piece contains only whole escape sequences."""
+        data = "\x1b[1;31m错误\x1b[0m \x1b]0;user@host\x1b\\$ ".encode('utf-8')
+        decoder = TerminalStreamDecoder()
+        pieces = feed_bytewise(decoder, data)
+
+        assert ''.join(pieces) == data.decode('utf-8')
+        for piece in pieces:
+            if piece.startswith('\x1b'):
+                assert piece in ("\x1b[1;31m", "\x1b[0m", "\x1b]0;user@host\x1b\\")
+
+    def test_osc_terminated_by_bel(self):
+        decoder = TerminalStreamDecoder()
+        assert decoder.decode(b"\x1b]0;tit") == ""
+        assert decoder.decode(b"le\x07$ ") == "\x1b]0;title\x07$ "
+
+    def test_final_releases_held_text(self):
+        decoder = TerminalStreamDecoder()
+        assert decoder.decode(b"abc\x1b[") == "abc"
+        assert decoder.decode(b"", final=True) == "\x1b["
+
+    def test_invalid_bytes_are_replaced(self):
+        decoder = TerminalStreamDecoder()
+        assert decoder.decode(b"a\xffb") == "a�b"
@@ -0,0 +1,140 @@
+"""
+Tests for the virtual terminal screen model.
+"""
+from utils.ansi_style import StyleTable
+from utils.terminal_screen import TerminalScreen, ScreenUpdate
+
+
+def row_text(update, y):
+    return ''.join(text for text, _ in update.rows[y])
+
+
+class TestTerminalScreen:
+    """Test suite for TerminalScreen."""
+
+    def test_lines_scroll_into_history(self):
+        screen = TerminalScreen(10, 3)
+        screen.feed("one\r\ntwo\r\nthree\r\nfour")
+        update = screen.take_update()
+        assert update.scrolled == [[("one", 0)]]
+        assert screen.text() == ["two", "three", "four"]
+        assert update.cursor == (4, 2)
+
+    def test_only_damaged_rows_reported(self):
+        screen = TerminalScreen(10, 3)
+        screen.feed("a\r\nb\r\nc")
+        screen.take_update()
+        screen.feed("\x1b[2;1Hx")
+        update = screen.take_update()
+        assert list(update.rows) == [1]
+        assert row_text(update, 1) == "x"
+        assert not update.full
+
+    def test_autowrap_and_erase(self):
+        screen = TerminalScreen(5, 3)
+        screen.feed("abcdefg\x1b[1;3H\x1b[K")
+        assert screen.text() == ["ab", "fg", ""]
+        screen.feed("\x1b[2J")
+        assert screen.text() == ["", "", ""]
+
+    def test_full_screen_app_does_not_grow_history(self):
+        screen = TerminalScreen(20, 4)
+        for frame in range(100):
+            screen.feed(f"\x1b[H\x1b[2Jtop - frame {frame}\r\nPID USER\r\n1 root")
+            assert screen.take_update().scrolled == []
+        assert screen.text()[0] == "top - frame 99"
+        assert len(screen.lines) == 4
+
+    def test_alternate_screen_restores_main(self):
+        screen = TerminalScreen(10, 3)
+        screen.feed("$ vim\r\n")
+        screen.feed("\x1b[?1049h\x1b[H~\r\n~\r\n~\r\n~")
+        update = screen.take_update()
+        assert update.scrolled == []
+        assert update.row_count == 3
+        screen.feed("\x1b[?1049l")
+        assert screen.text() == ["$ vim", "", ""]
+        assert (screen.x, screen.y) == (0, 1)
+        assert screen.take_update().full
+
+    def test_scroll_region(self):
+        screen = TerminalScreen(10, 4)
+        screen.feed("head\r\n1\r\n2\r\nfoot")
+        screen.take_update()
+        screen.feed("\x1b[2;3r\x1b[3;1H\n3")
+        update = screen.take_update()
+        assert screen.text() == ["head", "2", "3", "foot"]
+        assert update.scrolled == []
+        assert sorted(update.rows) == [1, 2]
+
+    def test_insert_delete_characters_and_lines(self):
+        screen = TerminalScreen(10, 3)
+        screen.feed("abcdef\x1b[1;3H\x1b[2P")
+        assert screen.text()[0] == "abef"
+        screen.feed("\x1b[2@")
+        assert screen.text()[0] == "ab  ef"
+        screen.feed("\r\nline2\x1b[1;1H\x1b[L")
+        assert screen.text() == ["", "ab  ef", "line2"]
+
+    def test_styles_are_kept_per_cell(self):
+        screen = TerminalScreen(10, 2)
+        screen.feed("\x1b[31mred\x1b[0m ok")
+        red = StyleTable.get_instance().apply_sgr(0, "31")
+        assert screen.take_update().rows[0] == [("red", red), (" ok", 0)]
+
+    def test_wide_and_combining_characters(self):
+        screen = TerminalScreen(6, 2)
+        screen.feed("中文é")
+        assert screen.x == 5
+        assert screen.text()[0] == "中文é"
+        screen.feed("\x1b[1;2Hx")
+        assert screen.text()[0] == " x文é"
+
+    def test_resize_keeps_cursor_row(self):
+        screen = TerminalScreen(10, 4)
+        screen.feed("1\r\n2\r\n3\r\n4")
+        screen.take_update()
+        screen.resize(10, 2)
+        update = screen.take_update()
+        assert screen.text() == ["3", "4"]
+        assert update.scrolled == [[("1", 0)], [("2", 0)]]
+        assert update.full
+
+    def test_row_count_tracks_used_rows(self):
+        screen = TerminalScreen(10, 5)
+        screen.feed("a\r\nb")
+        assert screen.take_update().row_count == 2
+        screen.feed("\x1b[H\x1b[2J$ ")
+        assert screen.take_update().row_count == 1
+
+    def test_update_merge(self):
+        first = ScreenUpdate(scrolled=[[("a", 0)]], rows={0: [("x", 0)], 1: [("y", 0)]}, row_count=2)
+        later = ScreenUpdate(scrolled=[[("b", 0)]], rows={1: [("z", 0)]}, row_count=3, cursor=(1, 2))
+        merged = first.merge(later)
+        assert merged.scrolled == [[("a", 0)], [("b", 0)]]
+        assert merged.rows == {0: [("x", 0)], 1: [("z", 0)]}
+        assert (merged.row_count, merged.cursor) == (3, (1, 2))
+
+    def test_invalidate_reports_all_rows_and_cursor_visibility(self):
+        screen = TerminalScreen(10, 3)
+        screen.feed("a\r\nb\x1b[?25l")
+        screen.take_update()
+        screen.invalidate()
+        update = screen.take_update()
+        assert update.full and sorted(update.rows) == [0, 1]
+        assert not update.cursor_visible
+
+    def test_take_scrolled_removes_oldest(self):
+        screen = TerminalScreen(10, 2)
+        screen.feed("1\r\n2\r\n3\r\n4")
+        assert screen.scrolled_count == 2
+        assert screen.take_scrolled(1) == [[("1", 0)]]
+        assert screen.take_update().scrolled == [[("2", 0)]]
+
+    def test_feed_returns_plain_projection(self):
+        screen = TerminalScreen(20, 3)
+        plain = []
+        screen.feed("\x1b[1;31merr", plain)
+        screen.feed("or\x1b[0m\r\n\x1b[2Kdone", plain)
+        assert ''.join(plain) == "error\r\ndone"
+        assert screen.text()[:2] == ["error", "done"]
@@ -0,0 +1,74 @@
+"""
+Tests for token estimation and budgeted message assembly.
+"""
+from ai.token_budget import (estimate_tokens, message_tokens, fit_text,
+                             assemble_messages)
+
+TEMPLATE = "Terminal:\n```\n{context}\n```\n\nQuestion: {question}"
+
+
+def total_tokens(messages):
+    return sum(message_tokens(m) for m in messages)
+
+
+class TestTokenEstimator:
+    """Test suite for estimate_tokens."""
+
+    def test_english_words_are_about_one_token(self):
+        assert estimate_tokens("hello world, this is a test.") == 8
+        assert estimate_tokens("") == 0
+
+    def test_cjk_costs_more_per_character(self):
+        chinese = "磁盘空间不足，请清理日志文件"
+        assert estimate_tokens(chinese) >= len(chinese)
+        assert estimate_tokens("disk space is low") < len("disk space is low") / 2
+
+    def test_fit_text_keeps_head_and_tail(self):
+        text = '\n'.join(f"line {i}" for i in range(1000))
+        fitted = fit_text(text, 200)
+        assert estimate_tokens(fitted) <= 200
+        assert fitted.startswith("line 0\n") and fitted.endswith("line 999")
+        assert fit_text("short", 100) == "short"
+
+
+class TestAssembleMessages:
+    """Test suite for assemble_messages."""
+
+    def test_never_exceeds_budget(self):
+        history = []
+        for i in range(50):
+            history.append({"role": "user", "content": f"question {i} " * 20})
+            history.append({"role": "assistant", "content": f"答案 {i} " * 30})
+        context = '\n'.join(f"/var/log/app{i}.log  {i * 1024}" for i in range(2000))
+        for budget in (300, 1000, 4000):
+            messages = assemble_messages("You are helpful.", history, "why?", context, budget, TEMPLATE)
+            assert total_tokens(messages) <= budget
+            assert messages[0]["role"] == "system"
+            assert messages[-1]["content"].endswith("Question: why?")
+
+    def test_recent_history_preferred_and_turns_kept_whole(self):
+        history = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"}
+                   for i in range(20)]
+        budget = message_tokens({"content": "sys"}) + message_tokens({"content": "now"}) \
+            + sum(message_tokens(m) for m in history[-5:])
+        messages = assemble_messages("sys", history, "now", "", budget, TEMPLATE)
+        middle = messages[1:-1]
+        assert middle == history[-4:]
+        assert middle[0]["role"] == "user"
+
+    def test_history_cap_and_small_context_untouched(self):
+        history = [{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}] * 10
+        messages = assemble_messages("sys", history, "now", "ls output", 10000, TEMPLATE,
+                                     max_history_messages=4)
+        assert len(messages) == 6
+        assert "ls output" in messages[-1]["content"]
+
+    def test_oversized_system_prompt_and_question_are_trimmed(self):
+        system_prompt = '\n'.join(f"rule {i}: always check the logs first" for i in range(500))
+        question = '\n'.join(f"step {i} printed an error" for i in range(500))
+        messages = assemble_messages(system_prompt, [], question, "ls output", 1000, TEMPLATE)
+        assert total_tokens(messages) <= 1000
+        assert messages[0]["content"].startswith("rule 0:")
+        assert "step 0 printed" in messages[-1]["content"]
+        assert "step 499 printed" in messages[-1]["content"]
+        assert "lines omitted" in messages[-1]["content"]
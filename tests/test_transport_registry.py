@@ -0,0 +1,100 @@
+"""
+Tests for TransportRegistry.
+"""
+import threading
+import paramiko
+import pytest
+from models.transport_registry import TransportRegistry
+
+
+class TestTransportRegistry:
+    """Test suite for TransportRegistry."""
+
+    def _patch_open(self, mocker):
+        """Replace the real handshake with a mock client factory."""
+        def make_client(*args, **kwargs):
+            client = mocker.Mock()
+            client.get_transport.return_value.is_active.return_value = True
+            return client
+        return mocker.patch.object(TransportRegistry, '_open_client', side_effect=make_client)
+
+    def test_same_target_shares_transport(self, mocker):
+        """Second acquire for the same user@host:port reuses the transport."""
+        open_client = self._patch_open(mocker)
+        registry = TransportRegistry()
+
+        first = registry.acquire("10.0.0.1", 22, "admin", "secret")
+        second = registry.acquire("10.0.0.1", 22, "admin", "secret")
+
+        assert first is second
+        assert open_client.call_count == 1
+        assert registry.refcount(TransportRegistry.make_key("10.0.0.1", 22, "admin")) == 2
+
+    def test_wrong_password_does_not_share_transport(self, mocker):
+        """A tab with a different password must not get a channel on the shared transport."""
+        open_client = self._patch_open(mocker)
+        registry = TransportRegistry()
+        key = TransportRegistry.make_key("10.0.0.1", 22, "admin")
+
+        registry.acquire("10.0.0.1", 22, "admin", "secret")
+        with pytest.raises(paramiko.AuthenticationException):
+            registry.acquire("10.0.0.1", 22, "admin", "wrong")
+
+        assert open_client.call_count == 1
+        assert registry.refcount(key) == 1
+
+    def test_different_user_gets_own_transport(self, mocker):
+        open_client = self._patch_open(mocker)
+        registry = TransportRegistry()
+
+        first = registry.acquire("10.0.0.1", 22, "admin")
+        second = registry.acquire("10.0.0.1", 22, "deploy")
+
+        assert first is not second
+        assert open_client.call_count == 2
+
+    def test_closes_after_last_release(self, mocker):
+        open_client = self._patch_open(mocker)
+        registry = TransportRegistry()
+        key = TransportRegistry.make_key("10.0.0.1", 22, "admin")
+
+        transport = registry.acquire("10.0.0.1", 22, "admin")
+        registry.acquire("10.0.0.1", 22, "admin")
+
+        registry.release(key)
+        assert registry.get_transport(key) is transport
+
+        registry.release(key)
+        assert registry.get_transport(key) is None
+        assert registry.refcount(key) == 0
+        assert open_client.call_count == 1
+
+    def test_failed_handshake_releases_reservation(self, mocker):
+        mocker.patch.object(TransportRegistry, '_open_client', side_effect=OSError("refused"))
+        registry = TransportRegistry()
+        key = TransportRegistry.make_key("10.0.0.1", 22, "admin")
+
+        try:
+            registry.acquire("10.0.0.1", 22, "admin")
+        except OSError:
+            pass
+
+        assert registry.refcount(key) == 0
+
+    def test_concurrent_acquire_handshakes_once(self, mocker):
+        """Tabs opened at the same time wait for one handshake."""
+        open_client = self._patch_open(mocker)
+        registry = TransportRegistry()
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(registry.acquire("10.0.0.1", 22, "admin")))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert open_client.call_count == 1
+        assert all(r is results[0] for r in results)